@@ -0,0 +1,173 @@
+"""
+Figure benchmark options, baseline checks and JSON report hooks
+
+    pytest benchmarks --json-report --json-report-file=benchmarks/report.json
+    pytest benchmarks --benchmark-margin 0.5            # allow 50% over baseline
+    pytest benchmarks --benchmark-save-baseline         # record current numbers
+
+Baseline CPU times are scaled by how fast the machine was at the time:
+every measurement also times a fixed calibration figure in the same worker
+(see figure_bench), and the expected time grows by the ratio of that
+calibration to the one recorded with the baseline. A slower or briefly
+busier machine then raises the bar instead of failing the suite. The
+factor is never below 1, so a fast calibration cannot tighten a baseline.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# Measurements compared against the baseline; CPU time rather than wall
+# time, which swings with whatever else the machine is running
+CHECKED_METRICS = ('cpu_s', 'peak_rss_mb')
+
+# Allowed slowdown / growth over the baseline before a benchmark fails
+DEFAULT_MARGIN = 0.25
+
+# Absolute slack on top of the margin, so timer noise on sub-second
+# figures does not fail the suite
+MIN_SLACK = {'cpu_s': 0.1, 'peak_rss_mb': 5.0}
+
+# Measurements of this session, keyed by benchmark name
+results = {}
+
+# The generators and analysis modules are flat scripts, not a package
+sys.path[:0] = [BENCHMARK_DIR, os.path.join(REPO_DIR, 'images'),
+                os.path.join(REPO_DIR, 'quantum_computing')]
+
+from render_pool import FigureJob  # noqa: E402
+
+# A throwaway generator module for the build cache and render service tests
+PROBE_MODULE = '''
+import json
+import os
+
+import figure_output
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'probe.json')
+
+
+def create_probe(path=DATA_PATH):
+    import matplotlib.pyplot as plt
+
+    with open(path) as f:
+        value = json.load(f)['value']
+    fig, ax = plt.subplots(figsize=(2, 1))
+    ax.bar([0], [value])
+    figure_output.save_figure(fig, 'probe.png')
+    return True
+'''
+
+PROBE_JOB = FigureJob('Probe', None, 'probe_figures', 'create_probe', (), 'probe')
+
+
+@pytest.fixture
+def probe(tmp_path, monkeypatch):
+    """Directory holding probe_figures.py and its probe.json
+
+    The module reads probe.json through a default argument, the way
+    create_fidelity_chart reads hardware_validations.json. Figures, web
+    variants and the build manifest are written to the same directory.
+    """
+    import build_cache
+    import figure_output
+    import web_variants
+
+    (tmp_path / 'probe_figures.py').write_text(PROBE_MODULE)
+    (tmp_path / 'probe.json').write_text(json.dumps({'value': 39}))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(figure_output, 'OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(build_cache, 'OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(web_variants, 'WEB_DIR', str(tmp_path / 'web'))
+    yield tmp_path
+    sys.modules.pop('probe_figures', None)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('figure benchmarks')
+    group.addoption('--benchmark-margin', type=float,
+                    default=float(os.environ.get('BENCHMARK_MARGIN', DEFAULT_MARGIN)),
+                    help='fraction a measurement may exceed its baseline by '
+                         f'(default: $BENCHMARK_MARGIN or {DEFAULT_MARGIN})')
+    group.addoption('--benchmark-rounds', type=int, default=3,
+                    help='runs per benchmark; the fastest one is checked (default: 3)')
+    group.addoption('--benchmark-baseline', default=BASELINE_PATH,
+                    help='baseline JSON file (default: benchmarks/baseline.json)')
+    group.addoption('--benchmark-save-baseline', action='store_true',
+                    help="write this run's measurements as the new baseline")
+
+
+def _load_baseline(path):
+    """Baseline measurements keyed by benchmark name ({} if none yet)"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@pytest.fixture
+def rounds(request):
+    """Number of runs per benchmark"""
+    return request.config.getoption('--benchmark-rounds')
+
+
+def _cpu_scale(result, expected):
+    """Machine-speed factor for a baseline CPU time (at least 1)"""
+    if not expected.get('calibration_s') or not result.get('calibration_s'):
+        return 1.0
+    return max(1.0, result['calibration_s'] / expected['calibration_s'])
+
+
+@pytest.fixture
+def check_benchmark(request):
+    """Record a measurement and fail if it exceeds its scaled baseline plus margin"""
+    config = request.config
+    margin = config.getoption('--benchmark-margin')
+    baseline = _load_baseline(config.getoption('--benchmark-baseline'))
+
+    def check(name, result):
+        results[name] = result
+        for key, value in result.items():
+            request.node.user_properties.append((key, value))
+        expected = baseline.get(name)
+        if expected is None or config.getoption('--benchmark-save-baseline'):
+            return
+        # Memory does not depend on machine speed; only CPU time is scaled
+        scale = {'cpu_s': _cpu_scale(result, expected), 'peak_rss_mb': 1.0}
+        over = [f"{metric} {result[metric]:.3f} > {expected[metric]:.3f} x {scale[metric]:.2f} "
+                f"x {1 + margin:.2f}"
+                for metric in CHECKED_METRICS
+                if metric in expected
+                and result[metric] > (expected[metric] * scale[metric] * (1 + margin)
+                                      + MIN_SLACK[metric])]
+        if over:
+            pytest.fail(f"{name} exceeded its baseline: " + '; '.join(over))
+
+    return check
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not results or not config.getoption('--benchmark-save-baseline'):
+        return
+    path = config.getoption('--benchmark-baseline')
+    baseline = _load_baseline(path)
+    for name, result in results.items():
+        baseline[name] = {metric: round(result[metric], 3)
+                          for metric in CHECKED_METRICS + ('calibration_s',)}
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_modifyreport(json_report):
+    """Add every benchmark's measurements to the pytest-json-report output"""
+    json_report['figure_benchmarks'] = results
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Figure Benchmarks
+Time and peak-memory measurement of one figure function in a fresh process
+
+Every measurement runs in its own spawned worker so that peak RSS belongs
+to that figure alone. Inside the worker the real figure_output.save_figure
+runs with figure_trace enabled, and each figure's time is split by its
+spans into:
+  - construction:  everything the create_* function does outside saving
+  - rasterization: drawing the figure on the 300-dpi Agg canvas ('draw')
+  - encoding:      compressing the canvas into the PNG ('encode')
+  - web variants:  downscaling and encoding the images/web copies
+PNGs and variants are written to a scratch directory, never into images/,
+and the circuit-drawing cache points at an empty scratch directory so
+Qiskit's drawer is always measured. The scratch directory is removed
+when the measurement ends.
+
+Right after the figure, the same worker times a fixed calibration figure
+(calibration_s). Baselines are scaled by that time, so a machine that is
+slower, or busy during this one measurement, does not fail the check
+(see conftest.py).
+"""
+
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(REPO_DIR, 'images')
+ANALYSIS_DIR = os.path.join(REPO_DIR, 'quantum_computing')
+
+# Timed runs of the calibration figure per measurement
+CALIBRATION_REPEATS = 3
+
+
+def _init_worker():
+    """Make the generator modules importable and select the Agg backend"""
+    sys.path[:0] = [IMAGES_DIR, ANALYSIS_DIR]
+    os.environ['MPLBACKEND'] = 'Agg'
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def _span_seconds(events, name):
+    """Total duration of the trace spans called name, in seconds"""
+    return sum(event['dur'] for event in events if event['name'] == name) / 1e6
+
+
+def _measure(module_name, func_name, args, kwargs, requires):
+    """Run one figure function in this worker and return its measurements"""
+    import importlib
+
+    import psutil
+
+    import circuit_diagrams
+    import figure_output
+    import figure_trace
+    import lazy_backends
+    import web_variants
+
+    lazy_backends.require(*requires)
+    figure_trace.enable()
+
+    with tempfile.TemporaryDirectory(prefix='figure-bench-') as scratch:
+        figure_output.OUTPUT_DIR = scratch
+        web_variants.WEB_DIR = os.path.join(scratch, 'web')
+        circuit_diagrams.CACHE_DIR = os.path.join(scratch, 'circuit-cache')
+        module = importlib.import_module(module_name)
+
+        rss_before = psutil.Process().memory_info().rss / 1e6
+        figure_trace.take_events()
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        try:
+            getattr(module, func_name)(*args, **kwargs)
+        finally:
+            sys.stdout = stdout
+        total_s = time.perf_counter() - start
+        cpu_s = time.process_time() - cpu_start
+        events = figure_trace.take_events()
+
+    # Read before calibrating, so the peak belongs to the figure
+    peak_rss_mb = _peak_rss_mb()
+    saves = [event for event in events if event['name'] == 'save']
+    save_s = _span_seconds(events, 'save')
+    web_variants_s = _span_seconds(events, 'web-variants')
+    return dict(construction_s=total_s - save_s - web_variants_s,
+                rasterization_s=_span_seconds(events, 'draw'),
+                encoding_s=_span_seconds(events, 'encode'),
+                web_variants_s=web_variants_s,
+                total_s=total_s,
+                cpu_s=cpu_s,
+                calibration_s=_calibrate(CALIBRATION_REPEATS),
+                figures=len(saves),
+                png_mb=sum(event['args'].get('bytes', 0) for event in saves) / 1e6,
+                rss_before_mb=rss_before,
+                peak_rss_mb=peak_rss_mb)
+
+
+def _calibration_workload():
+    """A fixed figure: a few thousand points and labels, drawn and encoded"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    x = np.linspace(0, 10, 2000)
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for k in range(20):
+        ax.plot(x, np.sin(x * (1 + k / 10)) + k / 5, linewidth=1)
+        ax.text(k / 2, -1.5, f'label {k}', fontsize=8)
+    ax.set_title('Calibration')
+    fig.savefig(io.BytesIO(), format='png', dpi=150)
+    plt.close(fig)
+
+
+def _calibrate(repeats):
+    """Fastest CPU time of the calibration figure in this worker"""
+    _calibration_workload()  # first-use costs the figure already paid
+    times = []
+    for _ in range(repeats):
+        cpu_start = time.process_time()
+        _calibration_workload()
+        times.append(time.process_time() - cpu_start)
+    return min(times)
+
+
+def measure(module_name, func_name, args=(), kwargs=None, requires=('matplotlib',), rounds=1):
+    """Measure one figure function, once per round, each in a fresh process
+
+    Returns the timings of the round fastest relative to its calibration,
+    with the largest round's memory.
+    """
+    runs = []
+    for _ in range(rounds):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn'),
+                                 initializer=_init_worker) as executor:
+            runs.append(executor.submit(_measure, module_name, func_name, tuple(args),
+                                        dict(kwargs or {}), tuple(requires)).result())
+    best = dict(min(runs, key=lambda run: run['cpu_s'] / run['calibration_s']))
+    best['peak_rss_mb'] = max(run['peak_rss_mb'] for run in runs)
+    best['rounds'] = rounds
+    return best
+
+
+def heron_chip_for(min_qubits):
+    """create_ibm_heron_chip on the smallest heavy-hex lattice with min_qubits"""
+    import generate_images
+    import heavy_hex
+
+    return generate_images.create_ibm_heron_chip(
+        lattice=heavy_hex.lattice_for_qubits(min_qubits), filename=f'bench-chip-{min_qubits}.png')
+
+
+def mermin_comparison_for(num_qubits, shots=10_000):
+    """create_mermin_parameter_comparison on synthetic counts for every n-qubit Mermin term"""
+    import generate_bell_inequality_visuals
+    import ghz_sampler
+
+    with tempfile.TemporaryDirectory(prefix='figure-bench-') as scratch:
+        counts_path = os.path.join(scratch, f'mermin-{num_qubits}.json')
+        ghz_sampler.write_mermin_counts(counts_path, num_qubits, shots,
+                                        ghz_sampler.TYPICAL_NOISE, seed=0)
+        return generate_bell_inequality_visuals.create_mermin_parameter_comparison(counts_path)
+
+
+def hash_blocks_for(method, block_bits, megabytes):
+    """qrng_extractor.hash_blocks on megabytes of fixed random raw bytes"""
+    import numpy as np
+
+    import qrng_extractor
+
+    extractor = qrng_extractor.toeplitz_extractor(block_bits, seed=0, min_entropy=0.9,
+                                                  method=method)
+    blocks = np.random.default_rng(0).integers(
+        0, 256, (int(megabytes * 1e6) // (block_bits // 8), block_bits // 8), dtype=np.uint8)
+    return qrng_extractor.hash_blocks(extractor, blocks)
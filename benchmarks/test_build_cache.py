@@ -0,0 +1,37 @@
+"""
+Build cache fingerprints against the probe generator module (see conftest.py)
+"""
+
+import json
+
+import build_cache
+import render_pool
+from conftest import PROBE_JOB
+
+
+def build(probe):
+    """Run the probe job through the build cache; True if it was rendered"""
+    cache = build_cache.BuildCache(str(probe / 'manifest.json'))
+    [result] = render_pool.run_jobs([PROBE_JOB], cache=cache)
+    assert result.success
+    return bool(result.outputs)
+
+
+def test_default_argument_data_file_is_fingerprinted(probe):
+    assert build(probe)
+    assert not build(probe)
+
+    (probe / 'probe.json').write_text(json.dumps({'value': 45}))
+    assert build(probe)
+    assert not build(probe)
+
+
+def test_referenced_calibration_file_is_fingerprinted(probe):
+    calibration = probe / 'calibration.json'
+    calibration.write_text(json.dumps({'p01': [0.01], 'p10': [0.02]}))
+    (probe / 'probe.json').write_text(json.dumps({'value': 39, 'calibration': str(calibration)}))
+    assert build(probe)
+    assert not build(probe)
+
+    calibration.write_text(json.dumps({'p01': [0.01], 'p10': [0.03]}))
+    assert build(probe)
@@ -0,0 +1,67 @@
+"""
+Per-figure time and peak-memory benchmarks for the image generators
+
+Every create_* job of generate_images.py and generate_bell_inequality_visuals.py
+is measured once, and the parametric figures are measured at growing N
+(the Mermin comparison on synthetic counts from ghz_sampler).
+"""
+
+import pytest
+
+from figure_bench import measure
+
+import generate_bell_inequality_visuals
+import generate_images
+from render_pool import job_slug
+
+FIGURE_JOBS = generate_images.FIGURES + generate_bell_inequality_visuals.FIGURES
+
+# Sizes for the scale tests of the N-parametric figures
+SCALE_SIZES = {
+    'create_entanglement_visualization': (12, 100, 1000),
+    'create_multipartite_ghz': (10, 100, 1000),
+}
+
+# Minimum qubit counts for the heavy-hex chip scale test
+CHIP_SIZES = (156, 500, 1000)
+
+# GHZ sizes for the circuit diagram scale test
+CIRCUIT_SIZES = (4, 12, 24)
+
+# GHZ sizes for the Mermin comparison on synthetic counts (2^(n-1) terms)
+MERMIN_SIZES = (3, 5, 7)
+
+
+@pytest.mark.parametrize('job', FIGURE_JOBS, ids=job_slug)
+def test_figure(job, rounds, check_benchmark):
+    result = measure(job.module, job.func, job.args, requires=job.requires, rounds=rounds)
+    assert result['figures'] >= 1
+    check_benchmark(job_slug(job), result)
+
+
+@pytest.mark.parametrize('func, num_qubits',
+                         [(func, n) for func, sizes in SCALE_SIZES.items() for n in sizes])
+def test_graph_scaling(func, num_qubits, rounds, check_benchmark):
+    result = measure('generate_images', func, kwargs={
+        'num_qubits': num_qubits, 'filename': f'bench-{func}-{num_qubits}.png'}, rounds=rounds)
+    check_benchmark(f'{func}[{num_qubits}]', result)
+
+
+@pytest.mark.parametrize('min_qubits', CHIP_SIZES)
+def test_chip_scaling(min_qubits, rounds, check_benchmark):
+    result = measure('figure_bench', 'heron_chip_for', (min_qubits,), rounds=rounds)
+    check_benchmark(f'create_ibm_heron_chip[{min_qubits}]', result)
+
+
+@pytest.mark.parametrize('num_qubits', CIRCUIT_SIZES)
+def test_circuit_scaling(num_qubits, rounds, check_benchmark):
+    result = measure('circuit_diagrams', 'render_ghz_diagram',
+                     (num_qubits, f'bench-ghz-{num_qubits}.png'),
+                     requires=('matplotlib', 'qiskit', 'pylatexenc'), rounds=rounds)
+    check_benchmark(f'render_ghz_diagram[{num_qubits}]', result)
+
+
+@pytest.mark.parametrize('num_qubits', MERMIN_SIZES)
+def test_mermin_scaling(num_qubits, rounds, check_benchmark):
+    result = measure('figure_bench', 'mermin_comparison_for', (num_qubits,), rounds=rounds)
+    check_benchmark(f'create_mermin_parameter_comparison[{num_qubits}]', result)
@@ -0,0 +1,90 @@
+"""
+Hurwitz key order against the JS port, and the .hwzk key tables
+
+The key order is compared with unzipSeed in js/hurwitz-keys.js, run under
+node (skipped where node is not installed). The tables written by
+hurwitz.py are decoded both by read_key_table and by the JS decoder.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+import hurwitz
+from conftest import REPO_DIR
+
+HURWITZ_KEYS_JS = os.path.join(REPO_DIR, 'js', 'hurwitz-keys.js')
+
+# Seed primes plus two that no table or game uses
+PRIMES = (2, 5, 13, 17, 29, 101)
+
+# Evaluates js/hurwitz-keys.js with a bare window and prints doubled keys;
+# argv: script, 'seed' p | 'table' path
+NODE_SCRIPT = """
+const fs = require('fs');
+const vm = require('vm');
+const [script, mode, arg] = process.argv.slice(1);
+const context = { window: {} };
+vm.runInNewContext(fs.readFileSync(script, 'utf8'), context);
+const api = context.window.HurwitzKeys;
+let prime, keys;
+if (mode === 'seed') {
+    prime = Number(arg);
+    keys = api.unzipSeed(prime);
+} else {
+    const data = fs.readFileSync(arg);
+    const table = api.decodeKeyTable(data.buffer.slice(data.byteOffset, data.byteOffset + data.length));
+    prime = table.prime;
+    keys = table.keys;
+}
+console.log(JSON.stringify({ prime: prime, keys: keys.map(q => [2 * q.a, 2 * q.b, 2 * q.c, 2 * q.d]) }));
+"""
+
+
+def run_js(mode, arg):
+    """(prime, doubled keys) from the JS module, or skip without node"""
+    node = shutil.which('node')
+    if node is None:
+        pytest.skip('node is not installed')
+    output = subprocess.run([node, '-e', NODE_SCRIPT, HURWITZ_KEYS_JS, mode, str(arg)],
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+    return result['prime'], np.array(result['keys'], dtype=np.int64).reshape(-1, 4)
+
+
+@pytest.mark.parametrize('p', PRIMES)
+def test_key_order_matches_unzip_seed(p):
+    _, expected = run_js('seed', p)
+    keys = hurwitz.hurwitz_keys(p)
+    assert len(keys) == (24 if p == 2 else 24 * (p + 1))
+    np.testing.assert_array_equal(keys, expected)
+
+
+@pytest.mark.parametrize('p', PRIMES)
+def test_key_table_round_trip(tmp_path, p):
+    path = str(tmp_path / f'p{p}.hwzk')
+    size = hurwitz.write_key_table(path, p)
+    assert os.path.getsize(path) == size
+
+    prime, keys = hurwitz.read_key_table(path)
+    assert prime == p
+    np.testing.assert_array_equal(keys, hurwitz.hurwitz_keys(p))
+
+
+def test_js_decodes_key_table(tmp_path):
+    path = str(tmp_path / 'p101.hwzk')
+    hurwitz.write_key_table(path, 101)
+    prime, keys = run_js('table', path)
+    assert prime == 101
+    np.testing.assert_array_equal(keys, hurwitz.hurwitz_keys(101))
+
+
+@pytest.mark.parametrize('p', hurwitz.SEED_PRIMES)
+def test_committed_tables_are_current(p):
+    prime, keys = hurwitz.read_key_table(os.path.join(hurwitz.TABLE_DIR, f'p{p}.hwzk'))
+    assert prime == p
+    np.testing.assert_array_equal(keys, hurwitz.hurwitz_keys(p))
@@ -0,0 +1,122 @@
+"""
+Job fetcher against a local http.server with canned payloads
+
+Each job's responses are scripted: HTTP error statuses first (429, 503,
+...), then its JSON payload. The cache is written to a temporary
+directory.
+"""
+
+import asyncio
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import job_fetcher
+import packed_counts
+
+GHZ_COUNTS = {'000': 39, '111': 30, '010': 31}
+
+# jobId -> (error statuses returned before the payload, payload)
+SCRIPT = {
+    'job-plain': ([], {'counts': GHZ_COUNTS}),
+    'job-rate-limited': ([429, 429], {'counts': GHZ_COUNTS}),
+    'job-unavailable': ([503], {'results': [{'data': {'counts': {'0x0': 50, '0x7': 50}},
+                                             'header': {'memory_slots': 3}}]}),
+    'job-sampler': ([429, 503], {'results': [{'data': {'c': {'samples': ['0x0', '0x7', '0x7'],
+                                                             'num_bits': 3}}}]}),
+    'job-list': ([], [1, 2]),
+    'job-bad-result': ([], {'results': [5]}),
+    'job-missing': ([404], None),
+    'job-always-busy': ([503] * 10, {'counts': GHZ_COUNTS}),
+}
+
+
+class CannedServer(ThreadingHTTPServer):
+    """Serves SCRIPT at /<jobId>.json and counts the requests per job"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), CannedHandler)
+        self.requests = Counter()
+        self.lock = threading.Lock()
+
+
+class CannedHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        job_id = self.path.strip('/').removesuffix('.json')
+        with self.server.lock:
+            attempt = self.server.requests[job_id]
+            self.server.requests[job_id] += 1
+        errors, payload = SCRIPT.get(job_id, ([404], None))
+        if attempt < len(errors):
+            self.send_error(errors[attempt])
+            return
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(job_fetcher, 'BACKOFF_SECONDS', 0.01)
+    server = CannedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(server, index_path, jobs, **kwargs):
+    url = f'http://127.0.0.1:{server.server_address[1]}/{{job_id}}.json'
+    results = asyncio.run(job_fetcher.fetch_jobs(jobs, url, str(index_path), concurrency=4,
+                                                 retries=3, timeout=5, **kwargs))
+    return {result.job_id: result for result in results}
+
+
+def test_fetch_retries_and_isolates_failures(server, tmp_path):
+    index_path = tmp_path / 'jobs' / 'index.json'
+    results = fetch(server, index_path, {job_id: 3 for job_id in SCRIPT})
+
+    fetched = {'job-plain', 'job-rate-limited', 'job-unavailable', 'job-sampler'}
+    assert {job_id for job_id, result in results.items() if result.status == 'fetched'} == fetched
+    assert {job_id for job_id, result in results.items() if result.status == 'failed'} \
+        == set(SCRIPT) - fetched
+    assert 'list' in results['job-list'].error
+
+    # Transient statuses are retried, others fail at once, and retries stop
+    assert server.requests['job-rate-limited'] == 3
+    assert server.requests['job-sampler'] == 3
+    assert server.requests['job-missing'] == 1
+    assert server.requests['job-always-busy'] == 4
+
+    # The index is written despite the failures; equal counts share an object
+    index = job_fetcher.load_index(str(index_path))
+    assert set(index) == fetched
+    assert index['job-plain']['digest'] == index['job-rate-limited']['digest']
+    counts = job_fetcher.cached_counts('job-plain', str(index_path))
+    assert packed_counts.total_shots(counts) == 100
+    assert packed_counts.ghz_outcome_shots(counts) == (39, 30)
+    assert packed_counts.ghz_outcome_shots(
+        job_fetcher.cached_counts('job-sampler', str(index_path))) == (1, 2)
+
+
+def test_cached_jobs_are_not_fetched_again(server, tmp_path):
+    index_path = tmp_path / 'jobs' / 'index.json'
+    fetch(server, index_path, {'job-plain': 3})
+    results = fetch(server, index_path, {'job-plain': 3})
+    assert results['job-plain'].status == 'cached'
+    assert server.requests['job-plain'] == 1
+
+    results = fetch(server, index_path, {'job-plain': 3}, refresh=True)
+    assert results['job-plain'].status == 'fetched'
+    assert server.requests['job-plain'] == 2
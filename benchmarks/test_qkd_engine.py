@@ -0,0 +1,81 @@
+"""
+QKD post-processing on small fixed-seed batches
+"""
+
+import numpy as np
+import pytest
+
+import qkd_engine
+
+SESSIONS = 8
+KEY_BITS = 4096
+QBER = 0.03
+
+
+def noisy_keys(seed, qber=QBER):
+    """Alice's sifted keys and Bob's copies with about qber errors"""
+    rng = np.random.default_rng(seed)
+    alice = rng.integers(0, 2, (SESSIONS, KEY_BITS), dtype=np.uint8)
+    bob = alice ^ (rng.random(alice.shape) < qber).astype(np.uint8)
+    return alice, bob, (alice != bob).mean(axis=1)
+
+
+def test_cascade_corrects_bob_to_alice():
+    alice, bob, qber = noisy_keys(1)
+    corrected, leaked = qkd_engine.cascade(alice, bob, qber, np.random.default_rng(2))
+    np.testing.assert_array_equal(corrected, alice)
+    # Leak stays below the bits themselves and above the Shannon bound
+    assert np.all(leaked > KEY_BITS * qkd_engine.binary_entropy(qber))
+    assert np.all(leaked < KEY_BITS)
+
+
+def test_ldpc_decode_corrects_bob_to_alice():
+    alice, bob, qber = noisy_keys(3)
+    corrected, leaked, converged = qkd_engine.ldpc_decode(alice, bob, qber, np.random.default_rng(4))
+    assert converged.all()
+    np.testing.assert_array_equal(corrected, alice)
+    assert np.all(leaked < KEY_BITS)
+
+
+@pytest.mark.parametrize('method', qkd_engine.METHODS)
+def test_sessions_above_abort_threshold_are_rejected(method):
+    clean = qkd_engine.simulate_sessions(4, 16384, QBER, seed=5)
+    noisy = qkd_engine.simulate_sessions(4, 16384, 0.2, seed=6)
+    sessions = qkd_engine.QkdSessions(*(np.concatenate(pair) for pair in zip(clean, noisy)))
+    result = qkd_engine.process_batch(sessions, method, seed=7)
+
+    assert np.all(result.qber[4:] > qkd_engine.QBER_ABORT)
+    assert not result.accepted[4:].any()
+    assert result.accepted[:4].all()
+    assert result.keys.shape == (4, result.secret_bits // 8)
+    assert result.secret_bits > 0
+
+
+def test_secret_length_is_never_negative():
+    key_bits = np.array([0, 64, 1024, 65536])
+    for qber_upper in (0.0, 0.05, 0.11, 0.5):
+        for leaked in (0, 1000, 10 ** 6):
+            lengths = qkd_engine.secret_length(key_bits, qber_upper, leaked)
+            assert np.all(lengths >= 0)
+    assert np.all(qkd_engine.secret_length(key_bits[:2], 0.5, 0) == 0)
+
+
+def test_sessions_without_key_bits_are_rejected():
+    # 64 raw bits leave fewer than 64 sifted bits after sampling
+    sessions = qkd_engine.simulate_sessions(4, 64, QBER, seed=8)
+    result = qkd_engine.process_batch(sessions, 'cascade', seed=9)
+    assert result.key_bits == 0
+    assert not result.accepted.any()
+    assert result.secret_bits == 0
+    assert result.keys.size == 0
+
+
+def test_sessions_without_secret_bits_are_rejected():
+    sessions = qkd_engine.simulate_sessions(4, 1024, QBER, seed=8)
+    result = qkd_engine.process_batch(sessions, 'cascade', seed=9)
+    lengths = qkd_engine.secret_length(result.key_bits, result.qber_upper, result.leaked) // 8 * 8
+    # Seeded so that one session leaks too much to keep a byte of key
+    assert (lengths > 0).any() and (lengths <= 0).any()
+    assert not result.accepted[lengths <= 0].any()
+    assert result.secret_bits == lengths[result.accepted].min()
+    assert result.keys.shape == (result.accepted.sum(), result.secret_bits // 8)
@@ -0,0 +1,51 @@
+"""
+Toeplitz extractor: both hashing methods against a direct GF(2) product,
+and their throughput against the baseline
+"""
+
+import numpy as np
+import pytest
+
+import qrng_extractor
+from figure_bench import measure
+
+# (method, block bits, MB hashed) for the throughput check; the FFT path
+# runs at ~2 MB/s per core, so it gets less data
+THROUGHPUT_CASES = [('table', 1024, 8), ('table', 8192, 4), ('fft', 8192, 1),
+                    ('table', 32768, 1), ('fft', 32768, 1)]
+
+
+def toeplitz_product(extractor, block):
+    """y = T x over GF(2) with T[i, j] = seed[i - j + n - 1], packed like hash_blocks"""
+    n, m = extractor.block_bits, extractor.output_bits
+    i, j = np.meshgrid(np.arange(m), np.arange(n), indexing='ij')
+    matrix = extractor.seed[i - j + n - 1].astype(np.int64)
+    return np.packbits((matrix @ np.unpackbits(block).astype(np.int64)) & 1)
+
+
+@pytest.mark.parametrize('method', ['table', 'fft'])
+@pytest.mark.parametrize('block_bits, output_bits', [(64, 8), (128, 64), (512, 448), (1024, 1024)])
+def test_hash_matches_matrix_product(method, block_bits, output_bits):
+    extractor = qrng_extractor.toeplitz_extractor(block_bits, output_bits, seed=7, method=method)
+    blocks = np.random.default_rng(block_bits).integers(0, 256, (5, block_bits // 8),
+                                                         dtype=np.uint8)
+    hashed = qrng_extractor.hash_blocks(extractor, blocks)
+    for block, output in zip(blocks, hashed):
+        assert np.array_equal(output, toeplitz_product(extractor, block))
+
+
+def test_extract_streams_whole_blocks_in_order():
+    extractor = qrng_extractor.toeplitz_extractor(512, 448, seed=3)
+    raw = np.random.default_rng(3).integers(0, 256, 64 * 10 + 17, dtype=np.uint8)
+    chunks = (raw[start:start + 100].tobytes() for start in range(0, len(raw), 100))
+    extracted = b''.join(qrng_extractor.extract(chunks, extractor, chunk_bytes=128, jobs=1))
+    expected = qrng_extractor.hash_blocks(extractor, raw[:640]).tobytes()
+    assert extracted == expected
+
+
+@pytest.mark.parametrize('method, block_bits, megabytes', THROUGHPUT_CASES)
+def test_hash_blocks_throughput(method, block_bits, megabytes, rounds, check_benchmark):
+    result = measure('figure_bench', 'hash_blocks_for', (method, block_bits, megabytes),
+                     rounds=rounds)
+    result['mb_per_s'] = megabytes / result['cpu_s']
+    check_benchmark(f'hash_blocks[{method}-{block_bits}]', result)
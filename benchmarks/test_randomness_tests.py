@@ -0,0 +1,73 @@
+"""
+NIST SP 800-22 battery against the worked examples of SP 800-22 Rev. 1a
+
+Most examples use the first 100 bits of the binary expansion of pi
+(EPSILON_100); the small ones are the 10-bit examples in each test's
+section 2.x.4. p-values are published to six decimals.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+import randomness_tests
+
+EPSILON_100 = ('11001001000011111101101010100010001000010110100011'
+               '00001000110100110001001100011001100010100010111000')
+
+# Section 2.4.8 example for the longest run of ones (n = 128, M = 8)
+EPSILON_128 = ('11001100000101010110110001001100111000000000001001'
+               '00110101010001000100111101011010000000110101111100'
+               '1100111001101101100010110010')
+
+# (section, test function, bits, keyword arguments, published p-values)
+WORKED_EXAMPLES = [
+    ('2.1.4', randomness_tests.frequency, '1011010101', {}, [0.527089]),
+    ('2.1.8', randomness_tests.frequency, EPSILON_100, {}, [0.109599]),
+    ('2.2.4', randomness_tests.block_frequency, '0110011010', {'block_bits': 3}, [0.801252]),
+    ('2.2.8', randomness_tests.block_frequency, EPSILON_100, {'block_bits': 10}, [0.706438]),
+    ('2.3.4', randomness_tests.runs, '1001101011', {}, [0.147232]),
+    ('2.3.8', randomness_tests.runs, EPSILON_100, {}, [0.500798]),
+    ('2.4.8', randomness_tests.longest_run, EPSILON_128, {}, [0.180609]),
+    ('2.11.4', randomness_tests.serial, '0011011101', {'block_bits': 3}, [0.808792, 0.670320]),
+    ('2.12.4', randomness_tests.approximate_entropy, '0100110101', {'block_bits': 3}, [0.261961]),
+    ('2.12.8', randomness_tests.approximate_entropy, EPSILON_100, {'block_bits': 2}, [0.235301]),
+    ('2.13.4', randomness_tests.cumulative_sums, '1011010111', {}, [0.411658, 0.411658]),
+    ('2.13.8', randomness_tests.cumulative_sums, EPSILON_100, {}, [0.219194, 0.114866]),
+]
+
+
+def packed(bits):
+    """(1, bytes) packed row and bit count of a '0101...' string"""
+    return np.packbits(np.array([int(bit) for bit in bits], dtype=np.uint8))[None, :], len(bits)
+
+
+@pytest.mark.parametrize('section, test, bits, kwargs, expected', WORKED_EXAMPLES,
+                         ids=[f'{example[0]}-{example[1].__name__}' for example in WORKED_EXAMPLES])
+def test_worked_example(section, test, bits, kwargs, expected):
+    p_values = np.asarray(test(*packed(bits), **kwargs), dtype=float).ravel()
+    assert p_values == pytest.approx(expected, abs=1e-6)
+
+
+def test_dft_follows_the_reference_code():
+    # Section 2.6.8 publishes N1 = 46 and p = 0.168669 for EPSILON_100, but
+    # counting the moduli |S_j| < T for j = 0 .. n/2 - 1 of that sequence,
+    # which is what the NIST reference implementation (sts-2.1.2, m[0..n/2-1])
+    # does, gives N1 = 48 and p = 0.646355. dft follows the reference code;
+    # the worked example does not follow its own definition. Do not "fix"
+    # dft to reproduce 0.168669.
+    row, n = packed(EPSILON_100)
+    x = 2.0 * np.array([int(bit) for bit in EPSILON_100]) - 1.0
+    j = np.arange(n // 2)[:, None]
+    moduli = np.abs((x * np.exp(-2j * np.pi * j * np.arange(n) / n)).sum(axis=1))
+    threshold = math.sqrt(math.log(1 / 0.05) * n)
+    assert np.count_nonzero(moduli < threshold) == 48
+
+    assert randomness_tests.dft(row, n) == pytest.approx([0.646355], abs=1e-6)
+
+
+def test_igamc_matches_the_chi_square_survival_function():
+    # Q(k/2, x/2) is the chi-square survival function; for k = 2 it is exp(-x/2)
+    for x in (0.1, 1.0, 5.0, 30.0):
+        assert randomness_tests.igamc(1.0, x / 2) == pytest.approx(math.exp(-x / 2), rel=1e-12)
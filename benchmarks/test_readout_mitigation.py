@@ -0,0 +1,78 @@
+"""
+Readout mitigation against a dense inverse of the tensored assignment matrix
+
+On a few qubits the full 2^n x 2^n matrix can be built outright. With
+every outcome observed and every flip coupled, the M3 solve and the
+per-block inverses must reproduce its inverse applied to the counts.
+"""
+
+import numpy as np
+import pytest
+
+import packed_counts
+import readout_mitigation
+
+NUM_QUBITS = 4
+
+# A correlated pair, two single qubits; columns are the prepared state
+CALIBRATION = readout_mitigation.calibration(
+    [(0, 2), (1,), (3,)],
+    [[[0.93, 0.04, 0.05, 0.01],
+      [0.03, 0.90, 0.01, 0.06],
+      [0.03, 0.02, 0.91, 0.05],
+      [0.01, 0.04, 0.03, 0.88]],
+     [[0.97, 0.06], [0.03, 0.94]],
+     [[0.95, 0.08], [0.05, 0.92]]])
+
+
+def dense_matrix(cal):
+    """Full assignment matrix A[measured, prepared] as a tensor product"""
+    states = np.arange(2 ** cal.num_qubits)
+    matrix = np.ones((len(states), len(states)))
+    for block, block_matrix in zip(cal.blocks, cal.matrices):
+        index = sum(((states >> q) & 1) << j for j, q in enumerate(block))
+        matrix *= block_matrix[index[:, None], index[None, :]]
+    return matrix
+
+
+@pytest.fixture
+def counts():
+    """Noisy GHZ-like counts on every one of the 2^n outcomes"""
+    rng = np.random.default_rng(7)
+    ideal = np.full(2 ** NUM_QUBITS, 0.02)
+    ideal[0] = ideal[-1] = 0.5
+    measured = dense_matrix(CALIBRATION) @ (ideal / ideal.sum())
+    shots = rng.multinomial(20000, measured) + 1
+    return packed_counts.from_counts(dict(enumerate(shots.tolist())), NUM_QUBITS)
+
+
+def dense_quasi(counts):
+    """A^-1 applied to the measured distribution, indexed by outcome value"""
+    probabilities = np.zeros(2 ** NUM_QUBITS)
+    probabilities[counts.outcomes[:, 0].astype(int)] = counts.counts / counts.counts.sum()
+    return np.linalg.solve(dense_matrix(CALIBRATION), probabilities)
+
+
+def test_quasi_probabilities_match_dense_inverse(counts):
+    quasi = readout_mitigation.quasi_probabilities(counts, CALIBRATION, distance=NUM_QUBITS)
+    expected = dense_quasi(counts)[quasi.outcomes[:, 0].astype(int)]
+    assert quasi.probabilities == pytest.approx(expected, abs=1e-9)
+
+
+def test_ghz_populations_match_dense_inverse(counts):
+    expected = dense_quasi(counts)
+    zeros, ones = readout_mitigation.mitigated_ghz_populations(counts, CALIBRATION)
+    assert (zeros, ones) == pytest.approx((expected[0], expected[-1]), abs=1e-12)
+
+
+def test_parities_match_dense_inverse(counts):
+    masks = [range(NUM_QUBITS), (0,), (1, 2), (0, 2, 3)]
+    quasi = dense_quasi(counts)
+    states = np.arange(2 ** NUM_QUBITS)
+    expected = []
+    for qubits in masks:
+        mask = sum(1 << q for q in qubits)
+        signs = 1 - 2 * (packed_counts.popcount((states & mask).astype(np.uint64)) & 1)
+        expected.append(signs @ quasi)
+    parities = readout_mitigation.mitigated_parities(counts, CALIBRATION, masks)
+    assert parities == pytest.approx(expected, abs=1e-12)
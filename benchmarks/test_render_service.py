@@ -0,0 +1,36 @@
+"""
+Render service cache keys against the probe generator module (see conftest.py)
+
+Renders run in a real warm worker pool behind the Flask test client.
+"""
+
+import json
+
+import pytest
+
+import render_service
+from conftest import PROBE_JOB
+
+
+@pytest.fixture
+def client(probe):
+    service = render_service.RenderService([PROBE_JOB], workers=1, modules=('probe_figures',))
+    yield render_service.create_app(service).test_client()
+    service.close()
+
+
+def render(client):
+    response = client.post('/render', json={'figure': 'probe'})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_data_edit_invalidates_cached_render(probe, client):
+    first = render(client)
+    assert first['source'] == 'render'
+    assert render(client)['source'] == 'cache'
+
+    (probe / 'probe.json').write_text(json.dumps({'value': 45}))
+    changed = render(client)
+    assert changed['source'] == 'render'
+    assert changed['key'] != first['key']
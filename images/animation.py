@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Animation
+Blitted matplotlib animations streamed straight into an encoder
+
+A figure is drawn once and its static background is saved. Each frame
+restores that background, redraws only the artists the update function
+returns, and passes the raw RGBA canvas buffer to the encoder. No frame is
+written to disk as a PNG, and nothing grows with the frame count.
+
+Frames are piped to a local ffmpeg when one is on PATH. Otherwise they are
+written as an animated PNG, one frame at a time. Each APNG frame after the
+first stores only the rectangle that changed since the previous frame,
+with its unchanged pixels transparent, so a moving wave packet costs a
+strip per frame rather than a full image. Labels that change every frame
+belong next to the moving artists (e.g. under the axes rather than in a
+far corner), or the rectangle grows to span both.
+"""
+
+import os
+import shutil
+import struct
+import subprocess
+import zlib
+
+import numpy as np
+
+import figure_trace
+from figure_output import OUTPUT_DIR, register_output
+
+# Frame rate of the rendered animations
+FPS = 30
+
+# ffmpeg video codec for each container it is asked to write
+FFMPEG_CODECS = {'.mov': 'libx264', '.mp4': 'libx264', '.webm': 'libvpx-vp9'}
+
+# zlib level for APNG frames; level 1 is several times faster than the
+# default and only slightly larger on flat-coloured figures
+APNG_ZLIB_LEVEL = 1
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def ffmpeg_path():
+    """Path of the local ffmpeg, or None"""
+    return shutil.which('ffmpeg')
+
+
+def output_filename(stem):
+    """stem + '.mov' when ffmpeg is available, else stem + '.png' (APNG)"""
+    return stem + ('.mov' if ffmpeg_path() else '.png')
+
+
+def _chunk(kind, data):
+    """A PNG chunk: length, type, data, CRC"""
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+class ApngWriter:
+    """Streaming animated PNG writer for (height, width, 4) uint8 RGBA frames
+
+    The frame count is patched into the acTL chunk on close, so frames can
+    be written without knowing how many will follow. Only the previous
+    frame is kept, to find the changed rectangle. When the first frame is
+    opaque, pixels of that rectangle which did not change are stored
+    transparent and blended over the previous frame, so they compress to
+    almost nothing.
+    """
+
+    def __init__(self, path, width, height, fps=FPS, level=APNG_ZLIB_LEVEL):
+        self.width, self.height, self.fps, self.level = width, height, fps, level
+        self.file = open(path, 'wb')
+        self.file.write(PNG_SIGNATURE)
+        self.file.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        self.actl_offset = self.file.tell()
+        self.file.write(_chunk(b'acTL', struct.pack('>II', 0, 0)))
+        self.previous = np.zeros((height, width), dtype=np.uint32)
+        self.opaque = False
+        self.frames = 0
+        self.sequence = 0
+
+    def _compress(self, region, changed=None):
+        """zlib stream of an RGBA region's scanlines, unchanged pixels zeroed
+
+        Scanlines are left unfiltered (filter type 0): on flat-coloured
+        figures zlib finds the repeats as well without a filter, and
+        filtering costs more than the compression itself.
+        """
+        height, width, _ = region.shape
+        rows = np.empty((height, 1 + 4 * width), dtype=np.uint8)
+        rows[:, 0] = 0
+        if changed is None:
+            rows[:, 1:] = region.reshape(height, 4 * width)
+        else:
+            # Masked as one uint32 per pixel, several times faster than per byte
+            kept = np.multiply(region.view(np.uint32)[:, :, 0], changed, dtype=np.uint32)
+            rows[:, 1:] = kept.view(np.uint8).reshape(height, 4 * width)
+        return zlib.compress(rows.tobytes(), self.level)
+
+    def write(self, frame):
+        """Append one frame"""
+        # One uint32 per pixel makes the change test a single comparison
+        pixels = frame.view(np.uint32)[:, :, 0]
+        if self.frames == 0:
+            top, left, bottom, right = 0, 0, self.height, self.width
+            self.opaque = bool(np.all(frame[:, :, 3] == 255))
+            data = self._compress(frame)
+            np.copyto(self.previous, pixels)
+        else:
+            changed = pixels != self.previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            if len(rows):
+                top, bottom = rows[0], rows[-1] + 1
+                cols = np.flatnonzero(changed[top:bottom].any(axis=0))
+                left, right = cols[0], cols[-1] + 1
+            else:
+                top, left, bottom, right = 0, 0, 1, 1
+            box = np.s_[top:bottom, left:right]
+            data = self._compress(frame[box], changed[box] if self.opaque else None)
+            # Nothing outside the changed rectangle differs from the previous frame
+            np.copyto(self.previous[box], pixels[box])
+
+        # blend_op 1 (over) lets the transparent unchanged pixels show the previous frame
+        blend = 1 if self.opaque and self.frames else 0
+        self.file.write(_chunk(b'fcTL', struct.pack('>IIIIIHHBB', self.sequence, right - left,
+                                                    bottom - top, left, top, 1, self.fps, 0,
+                                                    blend)))
+        self.sequence += 1
+        if self.frames == 0:
+            self.file.write(_chunk(b'IDAT', data))
+        else:
+            self.file.write(_chunk(b'fdAT', struct.pack('>I', self.sequence) + data))
+            self.sequence += 1
+        self.frames += 1
+
+    def close(self):
+        """Write IEND and the final frame count"""
+        self.file.write(_chunk(b'IEND', b''))
+        self.file.seek(self.actl_offset)
+        self.file.write(_chunk(b'acTL', struct.pack('>II', self.frames, 0)))
+        self.file.close()
+
+
+class FfmpegWriter:
+    """Pipe of raw RGBA frames into a local ffmpeg process"""
+
+    def __init__(self, path, width, height, fps=FPS):
+        codec = FFMPEG_CODECS.get(os.path.splitext(path)[1].lower())
+        command = [ffmpeg_path(), '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}',
+                   '-r', str(fps), '-i', '-',
+                   # yuv420p needs even dimensions
+                   '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+        if codec:
+            command += ['-c:v', codec, '-pix_fmt', 'yuv420p']
+        self.process = subprocess.Popen(command + [path], stdin=subprocess.PIPE)
+        self.frames = 0
+
+    def write(self, frame):
+        """Append one frame"""
+        self.process.stdin.write(frame.tobytes())
+        self.frames += 1
+
+    def close(self):
+        """Finish the stream and wait for ffmpeg"""
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+
+def open_writer(path, width, height, fps=FPS):
+    """ApngWriter for .png/.apng paths, FfmpegWriter for anything else"""
+    if os.path.splitext(path)[1].lower() in ('.png', '.apng'):
+        return ApngWriter(path, width, height, fps)
+    if not ffmpeg_path():
+        raise RuntimeError(f"ffmpeg is needed to write {os.path.basename(path)}; "
+                           f"use a .png filename for an animated PNG")
+    return FfmpegWriter(path, width, height, fps)
+
+
+def render_animation(fig, update, num_frames, filename, fps=FPS, animated=()):
+    """Render update(0) ... update(num_frames - 1) into filename in the images directory
+
+    update(i) changes the figure for frame i and returns the artists it
+    changed. Those (and any listed in animated) are left out of the cached
+    background and redrawn on top of it each frame. Returns the output path.
+    """
+    import matplotlib.pyplot as plt
+
+    output_path = os.path.join(OUTPUT_DIR, filename)
+    canvas = fig.canvas
+    with figure_trace.span('animate', filename=filename, frames=num_frames) as record:
+        artists = list(animated) or list(update(0))
+        for artist in artists:
+            artist.set_animated(True)
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+        width, height = canvas.get_width_height(physical=True)
+
+        writer = open_writer(output_path, width, height, fps)
+        try:
+            for i in range(num_frames):
+                canvas.restore_region(background)
+                for artist in update(i):
+                    fig.draw_artist(artist)
+                writer.write(np.asarray(canvas.buffer_rgba()))
+        finally:
+            writer.close()
+        record['bytes'] = os.path.getsize(output_path)
+    plt.close(fig)
+    return register_output(output_path)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Figure Build Cache
+Content-hash manifest that lets the generators skip unchanged figures
+
+A figure's fingerprint covers everything that can change its pixels:
+  - the source of its create_* function and any same-module helpers it calls
+  - module-level data constants it reads and its default argument values,
+    and the contents of any data file such a value names by absolute path
+    (e.g. path=VALIDATIONS_PATH -> hardware_validations.json), plus the
+    calibration and counts files such a JSON file names (DATA_REFERENCE_KEYS)
+  - the full source of local helper modules it uses (e.g. figure_output),
+    and of the local modules those import in turn (ghz_router -> heavy_hex)
+  - its arguments
+  - the matplotlib, NumPy, Qiskit and pylatexenc versions
+"""
+
+import ast
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import types
+from importlib import metadata
+
+# Set output directory
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Helper modules whose source counts as a figure input: this directory and
+# the analysis code in quantum_computing/
+REPO_DIR = os.path.dirname(OUTPUT_DIR)
+LOCAL_DIRS = (OUTPUT_DIR, os.path.join(REPO_DIR, 'quantum_computing'))
+
+# JSON keys whose values name further data files, relative to the repo root
+# (readout calibrations and raw counts of Mermin runs and validation records)
+DATA_REFERENCE_KEYS = ('calibration', 'calibrationPath', 'countsPath')
+
+# Manifest of the last successful render of every figure job
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, '.figure-manifest.json')
+
+# Bump to invalidate every manifest entry after a change to this module
+CACHE_VERSION = 4
+
+# Packages whose version is part of every fingerprint
+VERSIONED_PACKAGES = ('matplotlib', 'numpy', 'qiskit', 'pylatexenc')
+
+
+def job_key(job):
+    """Stable manifest key for a FigureJob"""
+    args = ', '.join(repr(arg) for arg in job.args)
+    return f"{job.module}.{job.func}({args})"
+
+
+def _package_versions():
+    """Installed versions of the packages that affect rendering"""
+    versions = {}
+    for package in VERSIONED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def _code_names(code):
+    """Global names referenced by a code object and its nested code objects"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _is_local_file(path):
+    """Whether a source file is one of the repo's own helper modules"""
+    return path is not None and os.path.dirname(os.path.abspath(path)) in LOCAL_DIRS
+
+
+def _is_local(module):
+    """Whether a module is one of the repo's own helper modules"""
+    return _is_local_file(getattr(module, '__file__', None))
+
+
+def _imported_names(path):
+    """Top-level module names a source file imports, lazy_import('name') included"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+        elif (isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'lazy_import'
+              and node.args and isinstance(node.args[0], ast.Constant)):
+            names.add(str(node.args[0].value).split('.')[0])
+    return names
+
+
+def _local_module_file(name):
+    """Source file of a local helper module, found without importing it (else None)"""
+    module = sys.modules.get(name)
+    if module is not None and getattr(module, '__file__', None):
+        path = module.__file__
+    else:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            return None
+        path = spec.origin if spec is not None else None
+    return path if _is_local_file(path) and path.endswith('.py') else None
+
+
+def _file_digest(path):
+    """SHA-256 of a file's contents"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _referenced_files(path):
+    """Sorted (key, path) of the data files a JSON file names under DATA_REFERENCE_KEYS"""
+    if not path.endswith('.json'):
+        return []
+    try:
+        with open(path) as f:
+            stack = [json.load(f)]
+    except (OSError, ValueError):
+        return []
+    found = set()
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in DATA_REFERENCE_KEYS and isinstance(value, str):
+                    referenced = os.path.join(REPO_DIR, value)
+                    if os.path.isfile(referenced):
+                        found.add((key, os.path.normpath(referenced)))
+                else:
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return sorted(found)
+
+
+def _collect_file(name, path, inputs):
+    """Add a data file's digest and those of the data files it names"""
+    inputs.append(('file', name, _file_digest(path)))
+    for key, referenced in _referenced_files(path):
+        inputs.append(('file', f"{name}[{key}]", os.path.relpath(referenced, REPO_DIR),
+                       _file_digest(referenced)))
+
+
+def _collect_module(name, path, inputs, seen):
+    """Add a local module's digest and those of the local modules it imports"""
+    path = os.path.abspath(path)
+    if path in seen:
+        return
+    seen.add(path)
+    inputs.append(('module', name, _file_digest(path)))
+    for imported in sorted(_imported_names(path)):
+        imported_path = _local_module_file(imported)
+        if imported_path is not None:
+            _collect_module(imported, imported_path, inputs, seen)
+
+
+def _collect(func, module, inputs, seen):
+    """Add the hashable inputs of func (and its helpers) to inputs"""
+    if func in seen:
+        return
+    seen.add(func)
+    inputs.append(('source', func.__qualname__, inspect.getsource(func)))
+
+    for name in sorted(_code_names(func.__code__)):
+        if name in vars(module):
+            _collect_value(name, vars(module)[name], module, inputs, seen)
+
+    # Defaults are bound when the function is defined, so a data path passed
+    # as path=VALIDATIONS_PATH never shows up among the names it reads
+    for name, parameter in inspect.signature(func).parameters.items():
+        if parameter.default is not inspect.Parameter.empty:
+            _collect_value(f"{func.__qualname__}({name}=)", parameter.default,
+                           module, inputs, seen)
+
+
+def _collect_value(name, value, module, inputs, seen):
+    """Add the hashable input behind one name func reads (or one default)"""
+    if isinstance(value, types.ModuleType):
+        if _is_local(value):
+            _collect_module(name, value.__file__, inputs, seen)
+    elif isinstance(value, types.FunctionType):
+        owner = sys.modules.get(value.__module__)
+        if owner is module:
+            _collect(value, module, inputs, seen)
+        elif owner is not None and _is_local(owner):
+            _collect_module(value.__module__, owner.__file__, inputs, seen)
+    elif isinstance(value, str) and os.path.isabs(value) and os.path.isfile(value):
+        _collect_file(name, value, inputs)
+    elif isinstance(value, (bool, int, float, str, tuple, list, dict)):
+        inputs.append(('constant', name, repr(value)))
+
+
+def fingerprint(job):
+    """Content hash of everything that determines a figure job's output"""
+    module = importlib.import_module(job.module)
+    inputs = [('cache', CACHE_VERSION), ('versions', _package_versions()),
+              ('args', [repr(arg) for arg in job.args])]
+    _collect(getattr(module, job.func), module, inputs, set())
+    payload = json.dumps(inputs, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class BuildCache:
+    """Manifest of figure fingerprints and the files each render produced"""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_fresh(self, job, digest):
+        """True if job was last rendered with digest and its files still exist"""
+        entry = self.entries.get(job_key(job))
+        if not entry or entry.get('hash') != digest or not entry.get('outputs'):
+            return False
+        return all(os.path.exists(os.path.join(OUTPUT_DIR, name))
+                   for name in entry['outputs'])
+
+    def outputs(self, job):
+        """Files recorded for job's last render, relative to OUTPUT_DIR"""
+        return self.entries.get(job_key(job), {}).get('outputs', [])
+
+    def record(self, job, digest, output_paths):
+        """Remember a successful render of job"""
+        outputs = sorted(os.path.relpath(path, OUTPUT_DIR) for path in output_paths)
+        self.entries[job_key(job)] = {'hash': digest, 'outputs': outputs}
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Circuit Diagrams
+Parametric GHZ circuit generator with cached Qiskit drawings
+
+Circuits are described as plain gate lists first, so a diagram's cache key
+(a structural hash of the gates plus the drawing options and library
+versions) can be computed without importing Qiskit. Only circuits missing
+from the cache pay for Qiskit's import and its slow matplotlib drawer.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from importlib import metadata
+
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+from matplotlib.patches import Circle, FancyBboxPatch, Rectangle
+
+import figure_trace
+from figure_output import OUTPUT_DIR, copy_output, save_figure
+
+# Rendered diagrams, one PNG per structural hash
+CACHE_DIR = os.path.join(OUTPUT_DIR, '.circuit-cache')
+
+# Entangling layouts understood by ghz_gates
+LAYOUTS = ('chain', 'tree')
+
+# Bump to invalidate every cached drawing after a change to this module
+CACHE_VERSION = 2
+
+
+def ghz_gates(num_qubits, layout='chain', basis=None):
+    """Gate list for an N-qubit GHZ circuit
+
+    layout 'chain' entangles with a linear CX chain (depth N-1); 'tree'
+    doubles the entangled set each layer (depth ceil(log2 N)). basis is an
+    optional Mermin measurement suffix such as 'XYY', one letter per qubit;
+    X adds H, Y adds S†H, Z adds nothing, and all qubits are then measured.
+    Gates are (name, qubits) tuples.
+    """
+    if num_qubits < 2:
+        raise ValueError(f"GHZ circuits need at least 2 qubits, got {num_qubits}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown GHZ layout {layout!r}, expected one of {LAYOUTS}")
+
+    gates = [('h', (0,))]
+    if layout == 'chain':
+        gates += [('cx', (i, i + 1)) for i in range(num_qubits - 1)]
+    else:
+        step = 1
+        while step < num_qubits:
+            gates += [('cx', (i, i + step)) for i in range(min(step, num_qubits - step))]
+            step *= 2
+
+    if basis is not None:
+        basis = basis.upper()
+        if len(basis) != num_qubits or set(basis) - set('XYZ'):
+            raise ValueError(f"Basis {basis!r} must be {num_qubits} letters from X, Y, Z")
+        for i, letter in enumerate(basis):
+            if letter == 'Y':
+                gates.append(('sdg', (i,)))
+            if letter in 'XY':
+                gates.append(('h', (i,)))
+        gates.append(('measure_all', tuple(range(num_qubits))))
+    return gates
+
+
+def ghz_circuit(num_qubits, layout='chain', basis=None):
+    """Qiskit QuantumCircuit for ghz_gates(num_qubits, layout, basis)"""
+    return circuit_from_gates(num_qubits, ghz_gates(num_qubits, layout, basis))
+
+
+def circuit_from_gates(num_qubits, gates):
+    """Build a QuantumCircuit from a gate list"""
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits)
+    for name, qubits in gates:
+        if name == 'measure_all':
+            qc.measure_all()
+        else:
+            getattr(qc, name)(*qubits)
+    return qc
+
+
+def _versions():
+    """Versions of the libraries that affect how a diagram looks"""
+    versions = {}
+    for package in ('qiskit', 'matplotlib', 'pylatexenc'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def circuit_key(num_qubits, gates, title=None, **draw_options):
+    """Structural hash identifying a rendered diagram"""
+    payload = json.dumps({
+        'cache': CACHE_VERSION,
+        'num_qubits': num_qubits,
+        'gates': [[name, list(qubits)] for name, qubits in gates],
+        'title': title,
+        'draw': draw_options,
+        'versions': _versions(),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _schedule(num_qubits, gates):
+    """Assign each gate a column, as early as the qubits it spans allow"""
+    free = [0] * num_qubits
+    columns = []
+    for name, qubits in gates:
+        span = range(min(qubits), max(qubits) + 1)
+        column = max(free[q] for q in span)
+        columns.append(column)
+        for q in span:
+            free[q] = column + 1
+    return columns
+
+
+def draw_concept(num_qubits, gates, title=None):
+    """Conceptual diagram of a gate list, used when Qiskit cannot draw"""
+    columns = _schedule(num_qubits, gates)
+    num_columns = max(columns) + 1
+    width = num_columns + 2
+
+    fig, ax = plt.subplots(figsize=(min(max(8, 1.2 * width), 40), max(4, 0.6 * num_qubits + 2)))
+    ax.set_xlim(-1, width)
+    ax.set_ylim(-1, num_qubits)
+    ax.axis('off')
+
+    # Draw qubits
+    for i in range(num_qubits):
+        y = num_qubits - 1 - i
+        ax.plot([0, width - 0.5], [y, y], 'k-', linewidth=1.5, alpha=0.3)
+        ax.text(-0.3, y, f'q[{i}]', ha='right', va='center', fontsize=9, fontweight='bold')
+        ax.add_patch(Circle((0.2, y), 0.12, color='lightblue', ec='black', linewidth=1.5))
+
+    boxes = {'h': ('H', 'lightgreen'), 'sdg': ('S†', 'lightyellow')}
+    for (name, qubits), column in zip(gates, columns):
+        x = 1.2 + column
+        ys = [num_qubits - 1 - q for q in qubits]
+        if name in boxes:
+            label, color = boxes[name]
+            ax.add_patch(FancyBboxPatch((x - 0.25, ys[0] - 0.2), 0.5, 0.4,
+                                        boxstyle="round,pad=0.05", facecolor=color,
+                                        edgecolor='black', linewidth=1.5))
+            ax.text(x, ys[0], label, ha='center', va='center', fontsize=10, fontweight='bold')
+        elif name == 'cx':
+            y_control, y_target = ys
+            ax.plot([x, x], [y_control, y_target], 'k-', linewidth=2)
+            ax.add_patch(Circle((x, y_control), 0.1, color='black', ec='black', linewidth=2))
+            ax.add_patch(FancyBboxPatch((x - 0.15, y_target - 0.15), 0.3, 0.3,
+                                        boxstyle="round,pad=0.02", facecolor='lightcoral',
+                                        edgecolor='black', linewidth=2))
+            ax.text(x, y_target, '+', ha='center', va='center', fontsize=12, fontweight='bold')
+        elif name == 'measure_all':
+            ax.plot([x - 0.4, x - 0.4], [min(ys) - 0.4, max(ys) + 0.4], color='gray',
+                    linestyle='--', linewidth=1)
+            for y in ys:
+                ax.add_patch(Rectangle((x - 0.2, y - 0.15), 0.4, 0.3, facecolor='lightcoral',
+                                       edgecolor='black', linewidth=1.5))
+                ax.text(x, y, 'M', ha='center', va='center', fontsize=9, fontweight='bold')
+
+    if title:
+        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+
+    legend_elements = [
+        mpatches.Patch(facecolor='lightgreen', edgecolor='black', label='H Gate'),
+        mpatches.Patch(facecolor='lightcoral', edgecolor='black', label='CX Target / Measurement'),
+    ]
+    if any(name == 'sdg' for name, _ in gates):
+        legend_elements.append(mpatches.Patch(facecolor='lightyellow', edgecolor='black', label='S† (Y Basis)'))
+    ax.legend(handles=legend_elements, loc='upper center', bbox_to_anchor=(0.5, 0.02),
+              ncol=len(legend_elements), fontsize=9)
+    return fig
+
+
+def _draw(num_qubits, gates, title, draw_options):
+    """Draw a gate list with Qiskit, falling back to the conceptual diagram
+
+    Returns (figure, whether Qiskit drew it).
+    """
+    try:
+        qc = circuit_from_gates(num_qubits, gates)
+        with figure_trace.span('qiskit-draw', 'qiskit', num_qubits=num_qubits, gates=len(gates)):
+            return qc.draw(output='mpl', style='iqp', **draw_options), True
+    except ImportError:
+        print("⚠️  Qiskit not available, creating conceptual diagram")
+    except Exception as e:
+        print(f"⚠️  Qiskit MPL drawing failed: {e}, creating conceptual diagram")
+    return draw_concept(num_qubits, gates, title), False
+
+
+def render_circuit(num_qubits, gates, filename, title=None, **draw_options):
+    """Save a circuit diagram, reusing the cached drawing when one exists
+
+    draw_options are passed to QuantumCircuit.draw (e.g. scale); title is
+    only used by the conceptual fallback. Only Qiskit drawings are cached,
+    so a fallback drawn after a transient failure is not reused once Qiskit
+    works again. Returns (output path, cache hit).
+    """
+    cache_path = os.path.join(CACHE_DIR, circuit_key(num_qubits, gates, title, **draw_options) + '.png')
+    if os.path.exists(cache_path):
+        return copy_output(cache_path, filename), True
+
+    fig, drawn_by_qiskit = _draw(num_qubits, gates, title, draw_options)
+    output_path = save_figure(fig, filename)
+    if not drawn_by_qiskit:
+        return output_path, False
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    shutil.copyfile(output_path, tmp_path)
+    os.replace(tmp_path, cache_path)
+    return output_path, False
+
+
+def render_ghz_diagram(num_qubits, filename, layout='chain', basis=None, title=None,
+                       **draw_options):
+    """Save a GHZ circuit diagram for any size, layout and Mermin basis"""
+    gates = ghz_gates(num_qubits, layout, basis)
+    if title is None:
+        title = f'{num_qubits}-Qubit GHZ Circuit ({layout} layout)'
+    return render_circuit(num_qubits, gates, filename, title, **draw_options)
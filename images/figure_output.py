@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Figure Output
+Shared savefig step for every generated figure
+
+All figures are written at the same resolution and background, with PNG
+metadata stripped so identical figures always produce byte-identical files.
+Each figure is rasterized once; the web variants (see web_variants.py) are
+downscaled from that same raster, taken from the Agg canvas, rather than
+rendered again or decoded from the PNG.
+"""
+
+import io
+import os
+import shutil
+import struct
+
+import figure_trace
+import web_variants
+
+# Set output directory
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# savefig settings shared by every figure
+SAVEFIG_KWARGS = dict(dpi=300, bbox_inches='tight', facecolor='white')
+
+# Matplotlib stamps its version into the PNG 'Software' chunk; dropping it
+# keeps output identical across patch releases that render the same pixels
+PNG_METADATA = {'Software': None}
+
+# Paths written since the last call to take_written_paths()
+_written = []
+
+
+def save_figure(fig, filename):
+    """Save a figure into the images directory, close it and return its path"""
+    import matplotlib.pyplot as plt
+
+    output_path = os.path.join(OUTPUT_DIR, filename)
+    with figure_trace.span('save', filename=filename, artists=figure_trace.count_artists(fig)) as record:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', metadata=PNG_METADATA, **SAVEFIG_KWARGS)
+        png_bytes = buffer.getvalue()
+        with open(output_path, 'wb') as f:
+            f.write(png_bytes)
+        record['bytes'] = len(png_bytes)
+        raster = _saved_raster(fig, png_bytes)
+    plt.close(fig)
+    _written.append(output_path)
+    _write_web_variants(png_bytes if raster is None else raster, filename)
+    return output_path
+
+
+def _saved_raster(fig, png_bytes):
+    """RGBA array savefig just encoded, or None if the canvas does not hold it
+
+    savefig leaves the tight-bbox render in the Agg canvas; its size is
+    checked against the PNG header in case a non-Agg canvas drew instead.
+    """
+    import numpy as np
+
+    try:
+        raster = np.asarray(fig.canvas.buffer_rgba())
+    except AttributeError:
+        return None
+    width, height = struct.unpack('>II', png_bytes[16:24])
+    return raster if raster.shape[:2] == (height, width) else None
+
+
+def _write_web_variants(source, filename):
+    """Downscale a saved figure (RGBA array or PNG bytes) into its web variants"""
+    with figure_trace.span('web-variants', filename=filename) as record:
+        paths = web_variants.write_variants(source, filename)
+        record['bytes'] = sum(os.path.getsize(path) for path in paths)
+    _written.extend(paths)
+
+
+def copy_output(source_path, filename):
+    """Copy an already rendered file into the images directory"""
+    output_path = os.path.join(OUTPUT_DIR, filename)
+    if os.path.abspath(source_path) != output_path:
+        shutil.copyfile(source_path, output_path)
+    _written.append(output_path)
+    if filename.endswith('.png'):
+        with open(output_path, 'rb') as f:
+            _write_web_variants(f.read(), filename)
+    return output_path
+
+
+def register_output(output_path):
+    """Record a file written directly into the images directory (e.g. an animation)"""
+    _written.append(output_path)
+    return output_path
+
+
+def take_written_paths():
+    """Return and forget the paths saved since the previous call"""
+    paths = list(_written)
+    del _written[:]
+    return paths
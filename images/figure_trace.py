@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Figure Trace
+Nested timing spans for figure rendering, written as Chrome trace events
+
+Every figure job runs inside a 'build' span (see render_pool.run_job). Once
+enable() is called, matplotlib itself is instrumented as well:
+  - layout  Figure.tight_layout and layout-engine passes
+  - draw    Figure.draw, i.e. rendering the artist tree to the canvas
+  - encode  PNG compression (matplotlib.image.imsave)
+and text layout, which runs thousands of times per figure, is folded into
+the enclosing span as a call count and total milliseconds instead of
+becoming spans of its own. figure_output.save_figure adds a 'save' span
+with the number of artists in the figure and the bytes written, plus a
+'web-variants' span for the downscaled copies, and circuit_diagrams wraps
+Qiskit's drawer in a 'qiskit-draw' span.
+
+The events load in chrome://tracing or https://ui.perfetto.dev. With
+--jobs each worker process appears as its own track.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+# Completed trace events of this process, in completion order
+events = []
+
+# Argument dicts of the spans currently open, innermost last
+_open_spans = []
+
+_enabled = False
+
+
+def _now_us():
+    """Monotonic timestamp in microseconds, comparable across processes on Linux"""
+    return time.perf_counter_ns() // 1000
+
+
+def is_enabled():
+    """Whether spans are being recorded"""
+    return _enabled
+
+
+@contextlib.contextmanager
+def span(name, category='figure', **args):
+    """Record a span around a block; yields its args dict for extra counters"""
+    if not _enabled:
+        yield {}
+        return
+    record = dict(args)
+    _open_spans.append(record)
+    start = _now_us()
+    try:
+        yield record
+    finally:
+        end = _now_us()
+        _open_spans.pop()
+        events.append({
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': start, 'dur': end - start,
+            'pid': os.getpid(), 'tid': threading.get_ident() % 2 ** 31,
+            'args': record,
+        })
+
+
+def _spanned(method, name, category='matplotlib'):
+    """Wrap a function so every call is recorded as a span"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with span(name, category):
+            return method(*args, **kwargs)
+    wrapper._figure_trace_original = method
+    return wrapper
+
+
+def _counted(method, counter):
+    """Wrap a function so its calls add to counters on the enclosing span"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not _open_spans:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            record = _open_spans[-1]
+            record[counter] = record.get(counter, 0) + 1
+            record[counter + '_ms'] = round(record.get(counter + '_ms', 0)
+                                            + (time.perf_counter() - start) * 1000, 3)
+    wrapper._figure_trace_original = method
+    return wrapper
+
+
+def _patch(owner, attr, wrap, *wrap_args):
+    """Replace owner.attr with a wrapped version, once"""
+    method = getattr(owner, attr)
+    if not hasattr(method, '_figure_trace_original'):
+        setattr(owner, attr, wrap(method, *wrap_args))
+
+
+def enable():
+    """Start recording spans and instrument matplotlib's layout, draw and encode steps"""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+
+    import matplotlib.image
+    import matplotlib.layout_engine
+    import matplotlib.text
+    from matplotlib.figure import Figure
+
+    _patch(Figure, 'tight_layout', _spanned, 'layout')
+    _patch(Figure, 'draw', _spanned, 'draw')
+    for engine in (matplotlib.layout_engine.TightLayoutEngine,
+                   matplotlib.layout_engine.ConstrainedLayoutEngine):
+        _patch(engine, 'execute', _spanned, 'layout')
+    _patch(matplotlib.image, 'imsave', _spanned, 'encode')
+    _patch(matplotlib.text.Text, '_get_layout', _counted, 'text_layout')
+
+
+def count_artists(fig):
+    """Number of artists in a figure, or None when tracing is off"""
+    if not _enabled:
+        return None
+    return len(fig.findobj())
+
+
+def take_events():
+    """Return and forget the events recorded so far"""
+    taken = list(events)
+    del events[:]
+    return taken
+
+
+def write_chrome_trace(path, trace_events):
+    """Write events in the Chrome trace-event JSON format"""
+    names = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+              'args': {'name': 'generator' if pid == os.getpid() else f'worker {pid}'}}
+             for pid in sorted({event['pid'] for event in trace_events})]
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': names + sorted(trace_events, key=lambda e: e['ts']),
+                   'displayTimeUnit': 'ms'}, f)
+        f.write('\n')
+    return path
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Generate All Visual Assets
+Renders the README visuals and the Bell Inequality visuals as one job set
+
+Usage:
+    python3 generate_all.py --jobs 8
+"""
+
+import argparse
+import sys
+
+import generate_bell_inequality_visuals
+import generate_images
+from render_pool import add_build_arguments, print_job_list, run_from_args
+
+
+def main(argv=None):
+    """Generate every figure from both generator scripts"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_build_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    readme_jobs = generate_images.FIGURES
+    bell_jobs = generate_bell_inequality_visuals.FIGURES
+    
+    if args.list:
+        print_job_list(readme_jobs + bell_jobs)
+        return
+    
+    print("=" * 80)
+    print("GENERATING ALL VISUAL ASSETS")
+    print("=" * 80)
+    print()
+    
+    results = run_from_args(readme_jobs + bell_jobs, args)
+    if results is None:
+        return 2
+    
+    # --only may have dropped jobs, so split the results by generator module
+    for generator in (generate_images, generate_bell_inequality_visuals):
+        generator_results = [result for result in results if result.module == generator.__name__]
+        if generator_results:
+            generator.print_summary(generator_results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
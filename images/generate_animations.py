@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Generate animations for SteadyWatch Quantum Demo
+Renders the validation and tunneling animations with blitting (see animation.py)
+
+Animations are written as .mov through ffmpeg when it is installed and as
+animated PNGs otherwise.
+
+Usage:
+    python3 generate_animations.py [--only tunneling-animation] [--force]
+"""
+
+import argparse
+import os
+import sys
+
+from lazy_backends import lazy_import
+from render_pool import FigureJob, add_build_arguments, print_job_list, run_from_args
+
+plt = lazy_import('matplotlib.pyplot')
+np = lazy_import('numpy')
+animation = lazy_import('animation')
+generate_images = lazy_import('generate_images')
+
+# Set output directory
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(os.path.dirname(OUTPUT_DIR), 'quantum_computing'))
+schrodinger_tunneling = lazy_import('schrodinger_tunneling')
+validation_index = lazy_import('validation_index')
+
+# Frames of the tunneling animation; the simulated time span stays that of
+# the layers-336 export, so more frames means more frequent snapshots
+TUNNELING_FRAMES = 600
+
+# Frames of the GHZ counts animation (shots arrive evenly over them)
+GHZ_FRAMES = 240
+
+# Run whose counts are animated (12-qubit GHZ, same as ghz-fidelity-chart.png)
+GHZ_RECORD = 'qkd-1'
+
+def create_tunneling_animation(num_frames=TUNNELING_FRAMES):
+    """Create the Schrödinger tunneling animation
+
+    The packet is evolved step by step while the frames are encoded, so
+    neither densities nor frames are stored.
+    """
+    p = dict(schrodinger_tunneling.DEFAULT_PARAMS)
+    # Enough split-operator steps per frame to keep dt at most the export's
+    substeps = -(-p['num_steps'] // (num_frames - 1))
+    dt = p['dt'] * p['num_steps'] / ((num_frames - 1) * substeps)
+    x, _ = schrodinger_tunneling.make_grid(p['n_grid'], p['x_min'], p['x_max'])
+    potential = schrodinger_tunneling.barrier_potential(x, p['V0'], p['x_barrier_left'],
+                                                        p['x_barrier_right'])
+    psi0 = schrodinger_tunneling.gaussian_packet(x, p['packet_center'], p['packet_sigma'],
+                                                 p['packet_k'])
+    steps = schrodinger_tunneling.iter_evolution(x, potential, psi0, dt,
+                                                 (num_frames - 1) * substeps)
+
+    fig, ax = plt.subplots(figsize=(10, 5.625), dpi=128)
+    peak = float((np.abs(psi0) ** 2).max())
+    ax.fill_between(x, 0, potential[0] / p['V0'] * peak * 1.1, color='orange', alpha=0.3,
+                    label=f"Barrier (V0 = {p['V0']:g})")
+    line, = ax.plot(x, np.abs(psi0[0]) ** 2, color='darkblue', linewidth=2, label='|ψ(x, t)|²')
+    ax.set_xlim(x[0], x[-1])
+    ax.set_ylim(0, peak * 1.25)
+    ax.set_xlabel('Position x', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Probability density', fontsize=12, fontweight='bold')
+    ax.set_title('Quantum Tunneling Through a Rectangular Barrier', fontsize=14, fontweight='bold')
+    ax.legend(loc='upper right', fontsize=10)
+    ax.grid(alpha=0.3, linestyle='--')
+    # Under the axes, beside the baseline the packet moves along, so the
+    # label does not stretch each frame's changed rectangle to the top
+    label = fig.text(0.01, 0.015, '', fontsize=11, fontweight='bold', va='bottom',
+                     bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.3))
+
+    def update(frame):
+        for _ in range(1 if frame == 0 else substeps):
+            step, psi, _, absorbed_right = next(steps)
+        density = np.abs(psi[0]) ** 2
+        line.set_ydata(density)
+        transmitted = schrodinger_tunneling.transmitted(x, psi[0], absorbed_right[0],
+                                                        p['x_barrier_right'])
+        label.set_text(f't = {step * dt:.2f}    Transmitted: {transmitted:.3f}')
+        return line, label
+
+    output_path = animation.render_animation(fig, update, num_frames,
+                                             animation.output_filename('schrodinger-tunneling-animation'),
+                                             animated=(line, label))
+    print(f"✅ Created: {output_path} ({num_frames} frames)")
+    return True
+
+def create_ghz_counts_animation(record_id=GHZ_RECORD, num_frames=GHZ_FRAMES):
+    """Create the GHZ counts animation
+
+    Shots of a validation run arrive in random order and the all-zeros,
+    all-ones and error bars grow toward the run's final counts. Each
+    frame's shots are drawn from those not yet shown (a multivariate
+    hypergeometric draw), so no shot list is built.
+    """
+    validations = validation_index.load_validations()
+    records = [record for record in validations.records
+               if record['id'] == record_id and generate_images.has_counts(record)]
+    if not records:
+        print(f"❌ No validation record {record_id} with counts")
+        return False
+    record = records[0]
+    final = np.array(generate_images.ghz_outcome_counts(record), dtype=np.int64)
+    shots = int(final.sum())
+    arrivals = np.diff(np.linspace(0, shots, num_frames + 1).round().astype(np.int64))
+    rng = np.random.default_rng(0)
+    remaining = final.copy()
+    shown = np.zeros(3, dtype=np.int64)
+
+    fig, ax = plt.subplots(figsize=(10, 6), dpi=128)
+    categories = ['All-zeros\n(Perfect)', 'All-ones\n(Perfect)', 'Errors']
+    bars = ax.bar(categories, np.zeros(3), color=['green', 'green', 'red'], alpha=0.7,
+                  edgecolor='black', linewidth=2)
+    ax.set_ylim(0, final.max() * 1.2)
+    ax.set_ylabel('Counts', fontsize=12, fontweight='bold')
+    ax.set_title(f"{record['qubits']}-Qubit GHZ State Measurement Results\n"
+                 f"Hardware: {record['backend']}", fontsize=14, fontweight='bold', pad=15)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    labels = [ax.text(bar.get_x() + bar.get_width() / 2, 0, '', ha='center', va='bottom',
+                      fontsize=11, fontweight='bold') for bar in bars]
+    summary = ax.text(0.5, 0.95, '', transform=ax.transAxes, fontsize=13, fontweight='bold',
+                      ha='center', bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
+    fig.tight_layout()
+
+    def update(frame):
+        drawn = rng.multivariate_hypergeometric(remaining, arrivals[frame])
+        remaining[:] -= drawn
+        shown[:] += drawn
+        total = max(int(shown.sum()), 1)
+        for bar, label, count in zip(bars, labels, shown):
+            bar.set_height(count)
+            label.set_y(count + final.max() * 0.025)
+            label.set_text(f'{count}\n({100 * count / total:.1f}%)')
+        fidelity = 100 * (shown[0] + shown[1]) / total
+        summary.set_text(f'Shots: {int(shown.sum()):,} / {shots:,}    Fidelity: {fidelity:.1f}%')
+        return (*bars, *labels, summary)
+
+    output_path = animation.render_animation(fig, update, num_frames,
+                                             animation.output_filename('ghz-counts-animation'),
+                                             animated=(*bars, *labels, summary))
+    print(f"✅ Created: {output_path} ({num_frames} frames)")
+    return True
+
+# Animation jobs in render order
+ANIMATIONS = [
+    FigureJob("Tunneling animation", "1. Creating Schrödinger tunneling animation",
+              "generate_animations", "create_tunneling_animation", (), "tunneling animation"),
+    FigureJob("GHZ counts animation", "2. Creating GHZ counts animation",
+              "generate_animations", "create_ghz_counts_animation", (), "GHZ counts animation"),
+]
+
+
+def print_summary(results):
+    """Print the ✅/❌ summary for a list of JobResults"""
+    print("=" * 60)
+    print("Summary:")
+    print("=" * 60)
+    success_count = sum(1 for result in results if result.success)
+    for result in results:
+        status = "✅" if result.success else "❌"
+        print(f"{status} {result.name}")
+    print()
+    print(f"Successfully created {success_count}/{len(results)} animations")
+    print(f"Animations saved to: {OUTPUT_DIR}")
+    print("=" * 60)
+
+def main(argv=None):
+    """Generate all animations"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_build_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print_job_list(ANIMATIONS)
+        return
+
+    print("=" * 60)
+    print("Generating Animations for SteadyWatch Quantum Demo")
+    print("=" * 60)
+    print()
+
+    results = run_from_args(ANIMATIONS, args)
+    if results is None:
+        return 2
+    print_summary(results)
+
+if __name__ == "__main__":
+    sys.exit(main())
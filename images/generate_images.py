@@ -4,199 +4,111 @@ Generate visual assets for SteadyWatch Quantum Demo README
 Creates circuit diagrams, conceptual illustrations, and data visualizations
 """
 
+import argparse
+import json
 import os
 import sys
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.patches import FancyBboxPatch, FancyArrowPatch, Circle, Rectangle
-import numpy as np
-
-# Try to import Qiskit for circuit diagrams
-try:
-    from qiskit import QuantumCircuit
-    QISKIT_AVAILABLE = True
-except ImportError:
-    QISKIT_AVAILABLE = False
-    print("⚠️  Qiskit not available, will create conceptual diagrams only")
+from collections import Counter
+
+from lazy_backends import lazy_import
+from render_pool import FigureJob, add_build_arguments, print_job_list, run_from_args
+
+# Plotting libraries and helper modules are imported on first use, so
+# listing figures or skipping up-to-date ones never pays for matplotlib
+plt = lazy_import('matplotlib.pyplot')
+mpatches = lazy_import('matplotlib.patches')
+mcm = lazy_import('matplotlib.cm')
+mcolors = lazy_import('matplotlib.colors')
+np = lazy_import('numpy')
+circuit_diagrams = lazy_import('circuit_diagrams')
+figure_output = lazy_import('figure_output')
+graph_render = lazy_import('graph_render')
 
 # Set output directory
 OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Device topology and analysis code lives in quantum_computing/
+sys.path.insert(0, os.path.join(os.path.dirname(OUTPUT_DIR), 'quantum_computing'))
+heavy_hex = lazy_import('heavy_hex')
+ghz_router = lazy_import('ghz_router')
+packed_counts = lazy_import('packed_counts')
+validation_index = lazy_import('validation_index')
+job_fetcher = lazy_import('job_fetcher')
+readout_mitigation = lazy_import('readout_mitigation')
+
+# Hardware validation records (one per IBM Quantum run)
+VALIDATIONS_PATH = os.path.join(os.path.dirname(OUTPUT_DIR), 'hardware_validations.json')
+
+# Run shown in ghz-fidelity-chart.png (12-qubit GHZ, job d5gs5mkpe0pc73alki40)
+FIDELITY_CHART_RECORD = 'qkd-1'
+
+# Index of the job results fetched by job_fetcher.py (see data/README.md)
+JOB_CACHE_INDEX = os.path.join(os.path.dirname(OUTPUT_DIR), 'data', 'jobs', 'index.json')
+
+def _report_circuit(output_path, cached):
+    """Print the result line for a circuit diagram"""
+    suffix = " (cached drawing)" if cached else ""
+    print(f"✅ Created: {output_path}{suffix}")
+
 def create_12qubit_circuit():
     """Create 12-qubit GHZ circuit diagram"""
-    if QISKIT_AVAILABLE:
-        # Create 12-qubit GHZ circuit
-        qc = QuantumCircuit(12)
-        qc.h(0)  # Initialize first qubit
-        for i in range(11):
-            qc.cx(i, i+1)  # Entangle qubits
-        
-        # Draw circuit
-        try:
-            fig = qc.draw('mpl', output='mpl', style='iqp', scale=0.8)
-            output_path = os.path.join(OUTPUT_DIR, 'ghz-circuit-12qubit-linear.png')
-            fig.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
-            print(f"✅ Created: {output_path}")
-            return True
-        except Exception as e:
-            print(f"⚠️  Qiskit MPL drawing failed: {e}, creating conceptual diagram")
-    
-    # Fallback: Create conceptual diagram
-    fig, ax = plt.subplots(figsize=(14, 8))
-    ax.set_xlim(0, 10)
-    ax.set_ylim(0, 12)
-    ax.axis('off')
-    
-    # Draw qubits
-    for i in range(12):
-        y = 11 - i
-        # Qubit line
-        ax.plot([0, 10], [y, y], 'k-', linewidth=1.5, alpha=0.3)
-        # Qubit label
-        ax.text(-0.5, y, f'q[{i}]', ha='right', va='center', fontsize=10, fontweight='bold')
-        # Qubit circle
-        circle = Circle((0.5, y), 0.15, color='lightblue', ec='black', linewidth=1.5)
-        ax.add_patch(circle)
-    
-    # Draw H gate on first qubit
-    h_box = FancyBboxPatch((1.5, 10.85), 0.8, 0.3, boxstyle="round,pad=0.05", 
-                          facecolor='lightgreen', edgecolor='black', linewidth=1.5)
-    ax.add_patch(h_box)
-    ax.text(1.9, 11, 'H', ha='center', va='center', fontsize=12, fontweight='bold')
-    
-    # Draw CNOT gates
-    for i in range(11):
-        y_control = 11 - i
-        y_target = 11 - (i + 1)
-        x_pos = 3 + i * 0.6
-        
-        # Control qubit (circle)
-        control = Circle((x_pos, y_control), 0.1, color='white', ec='black', linewidth=2)
-        ax.add_patch(control)
-        
-        # Target qubit (box with +)
-        target_box = FancyBboxPatch((x_pos - 0.15, y_target - 0.15), 0.3, 0.3,
-                                   boxstyle="round,pad=0.02", facecolor='lightcoral', 
-                                   edgecolor='black', linewidth=2)
-        ax.add_patch(target_box)
-        ax.text(x_pos, y_target, '+', ha='center', va='center', fontsize=14, fontweight='bold')
-        
-        # Connection line
-        ax.plot([x_pos, x_pos], [y_control, y_target], 'k-', linewidth=2)
-    
-    ax.set_title('12-Qubit GHZ Circuit\n(H gate + CX chain entanglement)', 
-                 fontsize=14, fontweight='bold', pad=20)
-    
-    output_path = os.path.join(OUTPUT_DIR, 'ghz-circuit-12qubit-linear.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✅ Created: {output_path}")
+    output_path, cached = circuit_diagrams.render_ghz_diagram(
+        12, 'ghz-circuit-12qubit-linear.png', scale=0.8,
+        title='12-Qubit GHZ Circuit\n(H gate + CX chain entanglement)')
+    _report_circuit(output_path, cached)
     return True
 
 def create_3_6qubit_circuit():
     """Create 3-6 qubit GHZ circuit diagram"""
-    if QISKIT_AVAILABLE:
-        # Create 6-qubit GHZ circuit (extendable to 12)
-        qc = QuantumCircuit(6)
-        qc.h(0)
-        for i in range(5):
-            qc.cx(i, i+1)
-        
-        try:
-            fig = qc.draw('mpl', output='mpl', style='iqp', scale=0.9)
-            output_path = os.path.join(OUTPUT_DIR, 'ghz-experimental-3-6qubit.png')
-            fig.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
-            print(f"✅ Created: {output_path}")
-            return True
-        except Exception as e:
-            print(f"⚠️  Qiskit MPL drawing failed: {e}, creating conceptual diagram")
-    
-    # Fallback: Create conceptual diagram
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.set_xlim(0, 7)
-    ax.set_ylim(0, 6)
-    ax.axis('off')
-    
-    # Draw 6 qubits
-    for i in range(6):
-        y = 5 - i
-        ax.plot([0, 7], [y, y], 'k-', linewidth=1.5, alpha=0.3)
-        ax.text(-0.5, y, f'q[{i}]', ha='right', va='center', fontsize=9, fontweight='bold')
-        circle = Circle((0.5, y), 0.12, color='lightblue', ec='black', linewidth=1.5)
-        ax.add_patch(circle)
-    
-    # H gate
-    h_box = FancyBboxPatch((1.5, 4.85), 0.7, 0.3, boxstyle="round,pad=0.05",
-                          facecolor='lightgreen', edgecolor='black', linewidth=1.5)
-    ax.add_patch(h_box)
-    ax.text(1.85, 5, 'H', ha='center', va='center', fontsize=11, fontweight='bold')
-    
-    # CNOT gates
-    for i in range(5):
-        y_control = 5 - i
-        y_target = 5 - (i + 1)
-        x_pos = 3 + i * 0.7
-        
-        control = Circle((x_pos, y_control), 0.08, color='white', ec='black', linewidth=2)
-        ax.add_patch(control)
-        
-        target_box = FancyBboxPatch((x_pos - 0.12, y_target - 0.12), 0.24, 0.24,
-                                   boxstyle="round,pad=0.02", facecolor='lightcoral',
-                                   edgecolor='black', linewidth=2)
-        ax.add_patch(target_box)
-        ax.text(x_pos, y_target, '+', ha='center', va='center', fontsize=12, fontweight='bold')
-        ax.plot([x_pos, x_pos], [y_control, y_target], 'k-', linewidth=2)
-    
-    ax.set_title('6-Qubit GHZ Circuit\n(Extendable to 12 qubits)', 
-                 fontsize=12, fontweight='bold', pad=15)
-    
-    output_path = os.path.join(OUTPUT_DIR, 'ghz-experimental-3-6qubit.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"✅ Created: {output_path}")
+    # 6-qubit GHZ circuit (extendable to 12)
+    output_path, cached = circuit_diagrams.render_ghz_diagram(
+        6, 'ghz-experimental-3-6qubit.png', scale=0.9,
+        title='6-Qubit GHZ Circuit\n(Extendable to 12 qubits)')
+    _report_circuit(output_path, cached)
     return True
 
-def create_entanglement_visualization():
+def ghz_validation_sizes(path=VALIDATIONS_PATH):
+    """Distinct GHZ qubit counts with a hardware validation record"""
+    with open(path) as f:
+        records = json.load(f)
+    return sorted({record['qubits'] for record in records if record['category'] == 'ghz'})
+
+def create_ghz_circuit_gallery(layout='chain'):
+    """Create a GHZ circuit diagram for every validated GHZ size"""
+    for num_qubits in ghz_validation_sizes():
+        output_path, cached = circuit_diagrams.render_ghz_diagram(
+            num_qubits, f'ghz-circuit-{num_qubits}qubit-{layout}.png', layout=layout,
+            scale=0.8, fold=-1)
+        _report_circuit(output_path, cached)
+    return True
+
+def create_entanglement_visualization(num_qubits=12, filename='ghz-entanglement-multipartite.png'):
     """Create GHZ entanglement visualization"""
     fig, ax = plt.subplots(figsize=(12, 8))
     ax.set_xlim(-1, 11)
     ax.set_ylim(-1, 7)
     ax.axis('off')
     
-    # Draw 12 qubits in a circle
-    num_qubits = 12
+    # Draw qubits in a circle
     center_x, center_y = 5, 3
     radius = 3
-    
-    qubit_positions = []
-    for i in range(num_qubits):
-        angle = 2 * np.pi * i / num_qubits - np.pi/2
-        x = center_x + radius * np.cos(angle)
-        y = center_y + radius * np.sin(angle)
-        qubit_positions.append((x, y))
-        
-        # Draw qubit
-        circle = Circle((x, y), 0.3, color='lightblue', ec='darkblue', linewidth=2.5)
-        ax.add_patch(circle)
-        ax.text(x, y, f'q{i}', ha='center', va='center', fontsize=8, fontweight='bold')
+    qubit_positions = graph_render.circle_layout(num_qubits, (center_x, center_y), radius)
+    qubit_radius = min(0.3, 0.4 * graph_render.circle_spacing(num_qubits, radius))
+    graph_render.draw_nodes(ax, qubit_positions, qubit_radius, facecolor='lightblue',
+               edgecolor='darkblue', linewidth=min(2.5, 30 / num_qubits),
+               labels=[f'q{i}' for i in range(num_qubits)], fontsize=8)
     
     # Draw entanglement connections (all-to-all for GHZ)
-    for i in range(num_qubits):
-        for j in range(i + 1, num_qubits):
-            x1, y1 = qubit_positions[i]
-            x2, y2 = qubit_positions[j]
-            ax.plot([x1, x2], [y1, y2], 'r-', linewidth=1, alpha=0.3, linestyle='--')
+    graph_render.draw_edges(ax, qubit_positions, colors=('red',), linewidth=1, alpha=0.3, linestyle='--')
     
     # Highlight center (entangled state)
-    center_circle = Circle((center_x, center_y), 0.5, color='yellow', 
-                          ec='orange', linewidth=3, alpha=0.7)
+    center_circle = mpatches.Circle((center_x, center_y), 0.5, color='yellow', 
+                          ec='orange', linewidth=3, alpha=0.7, zorder=4)
     ax.add_patch(center_circle)
     ax.text(center_x, center_y, 'GHZ\nState', ha='center', va='center', 
-           fontsize=10, fontweight='bold')
+           fontsize=10, fontweight='bold', zorder=5)
     
-    ax.set_title('12-Qubit GHZ Entanglement\nPerfect Correlation Across All Qubits', 
+    ax.set_title(f'{num_qubits}-Qubit GHZ Entanglement\nPerfect Correlation Across All Qubits', 
                  fontsize=14, fontweight='bold', pad=20)
     
     # Add legend
@@ -207,13 +119,27 @@ def create_entanglement_visualization():
     ]
     ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
     
-    output_path = os.path.join(OUTPUT_DIR, 'ghz-entanglement-multipartite.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    output_path = figure_output.save_figure(fig, filename)
     print(f"✅ Created: {output_path}")
     return True
 
-def create_multipartite_ghz():
+def _multipartite_layout(num_qubits):
+    """Qubit positions in three rows, the top row size and the closest spacing"""
+    top = max(1, round(0.3 * num_qubits))
+    middle = max(0, round(0.4 * num_qubits))
+    bottom = num_qubits - top - middle
+    rows = [(top, 5, 2, 8), (middle, 3, 1, 9), (bottom, 1, 2, 8)]
+    
+    positions = []
+    spacing = 2.0
+    for count, y, x_min, x_max in rows:
+        xs = np.linspace(x_min, x_max, count) if count > 1 else np.full(count, 5.0)
+        positions.append(np.column_stack([xs, np.full(count, float(y))]))
+        if count > 1:
+            spacing = min(spacing, (x_max - x_min) / (count - 1))
+    return np.concatenate(positions), top, spacing
+
+def create_multipartite_ghz(num_qubits=10, filename='multipartite-ghz-entanglement.png'):
     """Create multipartite GHZ entanglement illustration"""
     fig, ax = plt.subplots(figsize=(12, 8))
     ax.set_xlim(-1, 11)
@@ -221,33 +147,20 @@ def create_multipartite_ghz():
     ax.axis('off')
     
     # Draw qubits in a network pattern
-    positions = [
-        (2, 5), (5, 5), (8, 5),  # Top row
-        (1, 3), (3.5, 3), (6.5, 3), (9, 3),  # Middle row
-        (2, 1), (5, 1), (8, 1)  # Bottom row
-    ]
-    
-    qubits = []
-    for i, (x, y) in enumerate(positions):
-        circle = Circle((x, y), 0.35, color='lightblue', ec='darkblue', linewidth=2.5)
-        ax.add_patch(circle)
-        ax.text(x, y, f'q{i}', ha='center', va='center', fontsize=9, fontweight='bold')
-        qubits.append((x, y))
+    positions, group_size, spacing = _multipartite_layout(num_qubits)
+    graph_render.draw_nodes(ax, positions, min(0.35, 0.4 * spacing), facecolor='lightblue',
+               edgecolor='darkblue', linewidth=min(2.5, 25 / num_qubits),
+               labels=[f'q{i}' for i in range(num_qubits)], fontsize=9)
     
     # Draw entanglement connections (GHZ pattern)
-    # Connect all qubits to show multipartite entanglement
-    for i in range(len(qubits)):
-        for j in range(i + 1, len(qubits)):
-            x1, y1 = qubits[i]
-            x2, y2 = qubits[j]
-            # Use different colors for different entanglement groups
-            if i < 3 and j < 3:
-                color = 'red'
-            elif i >= 3 and j >= 3:
-                color = 'green'
-            else:
-                color = 'purple'
-            ax.plot([x1, x2], [y1, y2], color=color, linewidth=1.5, alpha=0.4, linestyle='--')
+    # Connect all qubits to show multipartite entanglement, coloured by
+    # group: 0 = within the top row, 1 = within the rest, 2 = across
+    def entanglement_group(i, j):
+        in_top_i, in_top_j = i < group_size, j < group_size
+        return np.where(in_top_i & in_top_j, 0, np.where(~in_top_i & ~in_top_j, 1, 2))
+    
+    graph_render.draw_edges(ax, positions, edge_class=entanglement_group,
+               colors=('red', 'green', 'purple'), linewidth=1.5, alpha=0.4, linestyle='--')
     
     ax.set_title('Multipartite GHZ Entanglement\nMultiple Qubits in Correlated States', 
                  fontsize=14, fontweight='bold', pad=20)
@@ -261,9 +174,7 @@ def create_multipartite_ghz():
     ]
     ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
     
-    output_path = os.path.join(OUTPUT_DIR, 'multipartite-ghz-entanglement.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    output_path = figure_output.save_figure(fig, filename)
     print(f"✅ Created: {output_path}")
     return True
 
@@ -287,12 +198,12 @@ def create_network_diagram():
     for name, (x, y) in nodes.items():
         if name.startswith('Relay'):
             # Relay nodes (smaller)
-            circle = Circle((x, y), 0.4, color='lightyellow', ec='orange', linewidth=2.5)
+            circle = mpatches.Circle((x, y), 0.4, color='lightyellow', ec='orange', linewidth=2.5)
             ax.add_patch(circle)
             ax.text(x, y, name[-1], ha='center', va='center', fontsize=10, fontweight='bold')
         else:
             # Alice and Bob (larger)
-            circle = Circle((x, y), 0.5, color='lightblue', ec='darkblue', linewidth=3)
+            circle = mpatches.Circle((x, y), 0.5, color='lightblue', ec='darkblue', linewidth=3)
             ax.add_patch(circle)
             ax.text(x, y, name, ha='center', va='center', fontsize=11, fontweight='bold')
         
@@ -316,7 +227,7 @@ def create_network_diagram():
         dx, dy = x2 - x1, y2 - y1
         length = np.sqrt(dx**2 + dy**2)
         dx_norm, dy_norm = dx/length, dy/length
-        arrow = FancyArrowPatch((x1 + dx_norm*0.5, y1 + dy_norm*0.5),
+        arrow = mpatches.FancyArrowPatch((x1 + dx_norm*0.5, y1 + dy_norm*0.5),
                                (x2 - dx_norm*0.5, y2 - dy_norm*0.5),
                                arrowstyle='->', mutation_scale=20, 
                                color='darkgreen', linewidth=2)
@@ -338,95 +249,321 @@ def create_network_diagram():
     ]
     ax.legend(handles=legend_elements, loc='lower right', fontsize=10)
     
-    output_path = os.path.join(OUTPUT_DIR, 'long-range-ghz-preparation.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    output_path = figure_output.save_figure(fig, 'long-range-ghz-preparation.png')
+    print(f"✅ Created: {output_path}")
+    return True
+
+def create_ghz_routing_diagram(lattice=None, qubits=None, filename='ghz-routing-heavy-hex.png'):
+    """Create the heavy-hex GHZ routing diagram
+
+    Plans the fan-out tree from quantum_computing/ghz_router.py on the
+    lattice (Heron r2 by default) for `qubits` (default: all of them) and
+    colours each CX and qubit by the layer that entangles it.
+    """
+    lattice = heavy_hex.heron_r2() if lattice is None else lattice
+    plan = ghz_router.plan_ghz(lattice.edges, qubits)
+    num_layers = len(plan.layers)
+    
+    fig, ax = plt.subplots(figsize=(14, 8))
+    ax.set_xlim(-0.5, 12.5)
+    ax.set_ylim(-0.6, 7.2)
+    ax.axis('off')
+    
+    positions, spacing = _fit_to_box(lattice.positions, 0.5, 12.0, 0.3, 6.0)
+    qubit_size = min(0.15, 0.35 * spacing)
+    graph_render.draw_edges(ax, positions, lattice.edges, colors=('#cccccc',),
+               linewidth=1.0, alpha=0.8, linestyle='-', max_edges=None, zorder=1)
+    
+    # CX layers and entangling layer of every qubit in the plan
+    cmap = plt.get_cmap('viridis')
+    norm = mcolors.Normalize(0, max(num_layers, 1))
+    tree_edges = np.array([pair for layer in plan.layers for pair in layer])
+    edge_layers = np.concatenate([np.full(len(layer), i + 1) for i, layer in enumerate(plan.layers)])
+    graph_render.draw_edges(ax, positions, tree_edges, edge_class=lambda i, j: np.arange(len(i)),
+               colors=cmap(norm(edge_layers)), linewidth=3, alpha=0.9, linestyle='-',
+               max_edges=None, zorder=2)
+    
+    in_plan = np.zeros(len(positions), dtype=bool)
+    in_plan[plan.root] = True
+    in_plan[tree_edges[:, 1]] = True
+    qubit_layers = np.zeros(len(positions))
+    qubit_layers[tree_edges[:, 1]] = edge_layers
+    graph_render.draw_nodes(ax, positions[~in_plan], qubit_size, facecolor='white',
+               edgecolor='#999999', linewidth=0.5)
+    graph_render.draw_nodes(ax, positions[in_plan], qubit_size, facecolor=cmap(norm(qubit_layers[in_plan])),
+               edgecolor='black', linewidth=0.5)
+    root = mpatches.Circle(positions[plan.root], 2 * qubit_size, fill=False, ec='red',
+                           linewidth=2.5, zorder=4)
+    ax.add_patch(root)
+    
+    colorbar = fig.colorbar(mcm.ScalarMappable(norm=norm, cmap=cmap), ax=ax, shrink=0.6, pad=0.01)
+    colorbar.set_label('CX layer', fontsize=10)
+    
+    num_qubits = plan.cx_count + 1
+    ax.set_title(f'Long-Range GHZ Preparation on Heavy-Hex\n'
+                 f'{num_qubits}-qubit fan-out tree from the graph centre (qubit {plan.root})',
+                 fontsize=14, fontweight='bold', pad=20)
+    ax.text(6.25, -0.3,
+            f'Fan-out tree: depth {plan.depth}, {plan.cx_count} CX    |    '
+            f'Linear CX chain: depth {plan.chain_depth}, {plan.chain_cx_count} CX',
+            ha='center', va='center', fontsize=11, fontweight='bold',
+            bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.3))
+    
+    legend_elements = [
+        plt.Line2D([0], [0], marker='o', color='w', markeredgecolor='red', markeredgewidth=2,
+                   markersize=12, label='Root (H gate)'),
+        plt.Line2D([0], [0], color=cmap(0.5), linewidth=3, label='CX (coloured by layer)'),
+        plt.Line2D([0], [0], color='#cccccc', linewidth=1, label='Unused coupler'),
+    ]
+    ax.legend(handles=legend_elements, loc='upper right', fontsize=9)
+    
+    output_path = figure_output.save_figure(fig, filename)
     print(f"✅ Created: {output_path}")
     return True
 
-def create_fidelity_chart():
-    """Create GHZ fidelity bar chart"""
+def has_counts(record):
+    """Whether ghz_outcome_counts can read counts for a validation record"""
+    return ('countsPath' in record or 'ghzCounts' in record
+            or job_fetcher.cached_counts_path(record['jobId'], JOB_CACHE_INDEX) is not None)
+
+def record_counts(record):
+    """PackedCounts of a validation record's raw counts, or None
+
+    Counts at the record's countsPath (a Qiskit counts JSON or a
+    packed_counts .npz) come first, then the job's fetched counts in the
+    job_fetcher cache.
+    """
+    if 'countsPath' in record:
+        return packed_counts.load_counts(os.path.join(os.path.dirname(OUTPUT_DIR),
+                                                      record['countsPath']),
+                                         record['qubits'])
+    return job_fetcher.cached_counts(record['jobId'], JOB_CACHE_INDEX)
+
+def ghz_outcome_counts(record):
+    """All-zeros, all-ones and error shot counts of a validation record
+
+    Raw counts (see record_counts) come first, then the record's ghzCounts
+    summary.
+    """
+    counts = record_counts(record)
+    if counts is not None:
+        shots = packed_counts.total_shots(counts)
+        zeros, ones = packed_counts.ghz_outcome_shots(counts)
+    else:
+        ghz_counts = record['ghzCounts']
+        zeros, ones, shots = ghz_counts['allZeros'], ghz_counts['allOnes'], ghz_counts['shots']
+    return zeros, ones, shots - zeros - ones
+
+def mitigated_outcome_counts(record):
+    """Readout-mitigated all-zeros, all-ones and error shots, or None
+
+    Needs raw counts (record_counts) and the readout calibration at the
+    record's calibrationPath (see readout_mitigation.load_calibration).
+    """
+    if 'calibrationPath' not in record:
+        return None
+    counts = record_counts(record)
+    if counts is None:
+        return None
+    cal = readout_mitigation.load_calibration(os.path.join(os.path.dirname(OUTPUT_DIR),
+                                                           record['calibrationPath']))
+    if cal.num_qubits != counts.num_qubits:
+        raise ValueError(f"Calibration of {record['id']} covers {cal.num_qubits} qubits, "
+                         f"its counts {counts.num_qubits}")
+    shots = packed_counts.total_shots(counts)
+    zeros, ones = readout_mitigation.mitigated_ghz_populations(counts, cal)
+    return zeros * shots, ones * shots, (1 - zeros - ones) * shots
+
+def create_fidelity_chart(record_id=FIDELITY_CHART_RECORD, path=VALIDATIONS_PATH):
+    """Create GHZ fidelity bar chart
+
+    Plots the all-zeros / all-ones / error split of a validation record's
+    counts (see ghz_outcome_counts). When the record has raw counts and a
+    calibrationPath, the readout-mitigated split is drawn beside the raw
+    one. With record_id=None the first record that has counts is used.
+    """
+    validations = validation_index.load_validations(path)
+    with_counts = [record for record in validations.records
+                   if has_counts(record) and record_id in (None, record['id'])]
+    if not with_counts:
+        print(f"❌ No validation record {record_id or ''} with counts in {path}")
+        return False
+    record = with_counts[0]
+
     fig, ax = plt.subplots(figsize=(10, 6))
     
     # Data from hardware validation
     categories = ['All-zeros\n(Perfect)', 'All-ones\n(Perfect)', 'Errors']
-    counts = [39, 30, 31]
-    percentages = [39.0, 30.0, 31.0]
+    counts = list(ghz_outcome_counts(record))
+    percentages = [100 * count / sum(counts) for count in counts]
+    fidelity = percentages[0] + percentages[1]
     colors = ['green', 'green', 'red']
-    
-    # Create bar chart
-    bars = ax.bar(categories, counts, color=colors, alpha=0.7, edgecolor='black', linewidth=2)
-    
-    # Add value labels on bars
-    for i, (bar, count, pct) in enumerate(zip(bars, counts, percentages)):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 1,
-               f'{count}\n({pct:.1f}%)',
-               ha='center', va='bottom', fontsize=11, fontweight='bold')
+    mitigated = mitigated_outcome_counts(record)
+    
+    # Create bar chart (raw and mitigated side by side when there is a calibration)
+    positions = np.arange(len(categories))
+    width = 0.8 if mitigated is None else 0.4
+    offset = 0 if mitigated is None else -width / 2
+    series = [(counts, '', None, 'Raw')]
+    if mitigated is not None:
+        mitigated = list(mitigated)
+        mitigated_fidelity = 100 * (mitigated[0] + mitigated[1]) / sum(mitigated)
+        series.append((mitigated, '//', 0.4, 'Readout-mitigated'))
+    tallest = max(max(values) for values, _, _, _ in series)
+    for k, (values, hatch, alpha, label) in enumerate(series):
+        bars = ax.bar(positions + offset + k * width, values, width, color=colors,
+                      alpha=alpha or 0.7, hatch=hatch, edgecolor='black', linewidth=2,
+                      label=label)
+        
+        # Add value labels on bars
+        for bar, count in zip(bars, values):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., max(height, 0) + tallest * 0.025,
+                   f'{count:.0f}\n({100 * count / sum(values):.1f}%)',
+                   ha='center', va='bottom', fontsize=11, fontweight='bold')
+    ax.set_xticks(positions)
+    ax.set_xticklabels(categories)
     
     # Customize chart
     ax.set_ylabel('Counts', fontsize=12, fontweight='bold')
-    ax.set_title('12-Qubit GHZ State Measurement Results\n69% Fidelity (Hardware: ibm_fez)', 
+    ax.set_title(f"{record['qubits']}-Qubit GHZ State Measurement Results\n"
+                 f"{fidelity:.0f}% Fidelity (Hardware: {record['backend']})",
                  fontsize=14, fontweight='bold', pad=15)
-    ax.set_ylim(0, max(counts) * 1.2)
+    ax.set_ylim(0, tallest * 1.2)
     ax.grid(axis='y', alpha=0.3, linestyle='--')
     
     # Add fidelity annotation
-    ax.text(0.5, 0.95, 'Total Fidelity: 69.0%', transform=ax.transAxes,
+    annotation = f'Total Fidelity: {fidelity:.1f}%'
+    if mitigated is not None:
+        annotation += f'  (mitigated: {mitigated_fidelity:.1f}%)'
+        ax.legend(loc='upper right', bbox_to_anchor=(1, 0.88))
+    ax.text(0.5, 0.95, annotation, transform=ax.transAxes,
            fontsize=13, fontweight='bold', ha='center',
            bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
     
     plt.tight_layout()
-    output_path = os.path.join(OUTPUT_DIR, 'ghz-fidelity-chart.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    output_path = figure_output.save_figure(fig, 'ghz-fidelity-chart.png')
+    print(f"✅ Created: {output_path}")
+    return True
+
+def create_validation_summary(path=VALIDATIONS_PATH):
+    """Create hardware validation summary: best fidelity per GHZ size and runs over time"""
+    validations = validation_index.load_validations(path)
+    if validations.errors:
+        print(f"❌ {len(validations.errors)} invalid records in {path} "
+              f"(run quantum_computing/validation_index.py --check)")
+        return False
+    summary = validation_index.summarize(validations.records)
+    records = validations.records
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), gridspec_kw={'width_ratios': [1, 1.2]})
+    backends = sorted({record['backend'] for record in records})
+    backend_colors = dict(zip(backends, mcm.tab10.colors))
+
+    # Best fidelity per qubit count, coloured by the backend that achieved it
+    best = summary['bestFidelityByQubits']
+    sizes = [entry['qubits'] for entry in best]
+    values = [entry['fidelity'] for entry in best]
+    bars = ax1.bar(range(len(sizes)), values, alpha=0.8, edgecolor='black', linewidth=1.5,
+                   color=[backend_colors[entry['backend']] for entry in best])
+    for bar, value in zip(bars, values):
+        ax1.text(bar.get_x() + bar.get_width()/2., value + 1.5, f'{value:g}%',
+                 ha='center', va='bottom', fontsize=10, fontweight='bold')
+    ax1.set_xticks(range(len(sizes)))
+    ax1.set_xticklabels(sizes)
+    ax1.set_xlabel('Qubits', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Best Fidelity (%)', fontsize=12, fontweight='bold')
+    ax1.set_title('Best Measured Fidelity per Circuit Size', fontsize=13, fontweight='bold')
+    ax1.set_ylim(0, 110)
+    ax1.grid(axis='y', alpha=0.3, linestyle='--')
+    ax1.legend(handles=[mpatches.Patch(color=backend_colors[b], label=b) for b in backends],
+               loc='lower right', fontsize=9)
+
+    # Runs per month, stacked by category
+    months = list(summary['months'])
+    categories = sorted({record['category'] for record in records})
+    bottom = np.zeros(len(months))
+    for color, category in zip(mcm.Set2.colors, categories):
+        per_month = Counter(record['date'][:7] for record in records
+                            if record['category'] == category)
+        heights = np.array([per_month.get(month, 0) for month in months])
+        ax2.bar(months, heights, bottom=bottom, color=color, edgecolor='black',
+                linewidth=1, label=f'{category} ({heights.sum()})')
+        bottom += heights
+    for i, total in enumerate(bottom):
+        ax2.text(i, total + 0.5, f'{int(total)}', ha='center', va='bottom',
+                 fontsize=10, fontweight='bold')
+    ax2.set_ylabel('Hardware Runs', fontsize=12, fontweight='bold')
+    ax2.set_title(f"{summary['total']} Validated Runs on {len(backends)} Backends",
+                  fontsize=13, fontweight='bold')
+    ax2.set_ylim(0, bottom.max() * 1.15)
+    ax2.grid(axis='y', alpha=0.3, linestyle='--')
+    ax2.legend(loc='upper right', fontsize=9)
+
+    plt.tight_layout()
+    output_path = figure_output.save_figure(fig, 'hardware-validation-summary.png')
     print(f"✅ Created: {output_path}")
     return True
 
-def create_ibm_heron_chip():
-    """Create IBM Heron R2 chip visualization"""
+def _fit_to_box(positions, x_min, x_max, y_min, y_max):
+    """Scale layout coordinates into a box, returning them and the unit spacing"""
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    scale = np.array([x_max - x_min, y_max - y_min]) / np.maximum(high - low, 1e-9)
+    return np.array([x_min, y_min]) + (positions - low) * scale, scale.min()
+
+def create_ibm_heron_chip(lattice=None, overlay=None, overlay_label=None,
+                          backend='ibm_fez', filename='ibm-heron-r2-chip.png'):
+    """Create IBM Heron R2 chip visualization
+
+    lattice defaults to the 156-qubit Heron r2 heavy-hex layout. overlay is
+    an optional per-qubit value (e.g. T1, T2 or readout error) used to colour
+    the qubits, with overlay_label naming it on the colour bar.
+    """
+    lattice = heavy_hex.heron_r2() if lattice is None else lattice
+    num_qubits = len(lattice.positions)
+    is_heron_r2 = (lattice.rows, lattice.cols) == heavy_hex.HERON_R2_SHAPE
+    
     fig, ax = plt.subplots(figsize=(12, 8))
     ax.set_xlim(-1, 11)
     ax.set_ylim(-1, 7)
     ax.axis('off')
     
     # Draw chip outline
-    chip = FancyBboxPatch((1, 1), 9, 5, boxstyle="round,pad=0.2",
+    chip = mpatches.FancyBboxPatch((1, 1), 9, 5, boxstyle="round,pad=0.2",
                          facecolor='#1a1a1a', edgecolor='#00d4ff', linewidth=3)
     ax.add_patch(chip)
     
-    # Draw qubit grid (156 qubits in a grid pattern)
-    num_qubits = 156
-    rows, cols = 12, 13  # Approximate grid for 156 qubits
-    
-    qubit_size = 0.15
-    spacing_x = 8.5 / cols
-    spacing_y = 4.5 / rows
-    
-    qubits_drawn = 0
-    for row in range(rows):
-        for col in range(cols):
-            if qubits_drawn >= num_qubits:
-                break
-            x = 1.5 + col * spacing_x
-            y = 1.5 + row * spacing_y
-            
-            # Draw qubit
-            circle = Circle((x, y), qubit_size, color='#00d4ff', 
-                          ec='#00a8cc', linewidth=0.5, alpha=0.8)
-            ax.add_patch(circle)
-            qubits_drawn += 1
-        if qubits_drawn >= num_qubits:
-            break
+    # Draw the heavy-hex lattice: one collection for couplers, one for qubits
+    positions, spacing = _fit_to_box(lattice.positions, 1.5, 9.5, 1.4, 5.2)
+    qubit_size = min(0.15, 0.35 * spacing)
+    graph_render.draw_edges(ax, positions, lattice.edges, colors=('#00a8cc',),
+               linewidth=min(1.5, 40 * qubit_size), alpha=0.6, linestyle='-',
+               max_edges=None, zorder=2)
+    
+    if overlay is None:
+        facecolors = '#00d4ff'
+    else:
+        overlay = np.asarray(overlay, dtype=float)
+        if overlay.shape != (num_qubits,):
+            raise ValueError(f"overlay needs one value per qubit ({num_qubits}), got shape {overlay.shape}")
+        norm = mcolors.Normalize(np.nanmin(overlay), np.nanmax(overlay))
+        facecolors = plt.get_cmap('plasma')(norm(overlay))
+        colorbar = fig.colorbar(mcm.ScalarMappable(norm=norm, cmap='plasma'), ax=ax,
+                                shrink=0.6, pad=0.01)
+        colorbar.set_label(overlay_label or 'Per-qubit value', fontsize=10)
+    graph_render.draw_nodes(ax, positions, qubit_size, facecolor=facecolors, edgecolor='#00a8cc',
+               linewidth=0.5)
     
     # Add chip label
-    ax.text(5.5, 6.2, 'IBM Heron R2 Quantum Processor', 
+    chip_name = 'IBM Heron R2 Quantum Processor' if is_heron_r2 else \
+        f'Heavy-Hex Processor ({lattice.rows}x{lattice.cols} lattice)'
+    ax.text(5.5, 6.2, chip_name, 
            ha='center', va='center', fontsize=16, fontweight='bold', color='#00d4ff')
-    ax.text(5.5, 5.7, '156 Qubits | ibm_fez', 
+    ax.text(5.5, 5.7, f'{num_qubits} Qubits | {backend}', 
            ha='center', va='center', fontsize=12, color='#00d4ff', style='italic')
     
     # Add IBM logo area
-    logo_box = FancyBboxPatch((8.5, 5.5), 1.2, 0.4, boxstyle="round,pad=0.05",
+    logo_box = mpatches.FancyBboxPatch((8.5, 5.5), 1.2, 0.4, boxstyle="round,pad=0.05",
                              facecolor='white', edgecolor='#00d4ff', linewidth=2)
     ax.add_patch(logo_box)
     ax.text(9.1, 5.7, 'IBM', ha='center', va='center', 
@@ -434,8 +571,8 @@ def create_ibm_heron_chip():
     
     # Add specifications
     specs = [
-        'Architecture: Heron R2',
-        'Qubits: 156',
+        f'Architecture: {"Heron R2" if is_heron_r2 else "Heavy-hex"}',
+        f'Qubits: {num_qubits} | Couplers: {len(lattice.edges)}',
         'Coherence Time: ~100μs',
         'Gate Fidelity: >99%'
     ]
@@ -443,9 +580,7 @@ def create_ibm_heron_chip():
     for i, spec in enumerate(specs):
         ax.text(0.2, y_start - i*0.3, spec, fontsize=9, color='#666666')
     
-    output_path = os.path.join(OUTPUT_DIR, 'ibm-heron-r2-chip.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    output_path = figure_output.save_figure(fig, filename)
     print(f"✅ Created: {output_path}")
     return True
 
@@ -458,7 +593,7 @@ def create_dilution_refrigerator():
     
     # Draw refrigerator structure (cylindrical)
     # Outer shell
-    outer = FancyBboxPatch((1, 0.5), 7, 9.5, boxstyle="round,pad=0.3",
+    outer = mpatches.FancyBboxPatch((1, 0.5), 7, 9.5, boxstyle="round,pad=0.3",
                           facecolor='#e0e0e0', edgecolor='#333333', linewidth=3)
     ax.add_patch(outer)
     
@@ -472,14 +607,14 @@ def create_dilution_refrigerator():
     ]
     
     for x, y, w, h, color, label in stages:
-        stage = FancyBboxPatch((x, y), w, h, boxstyle="round,pad=0.1",
+        stage = mpatches.FancyBboxPatch((x, y), w, h, boxstyle="round,pad=0.1",
                               facecolor=color, edgecolor='black', linewidth=1.5, alpha=0.7)
         ax.add_patch(stage)
         ax.text(x + w/2, y + h/2, label, ha='center', va='center', 
                fontsize=8, fontweight='bold')
     
     # Add quantum processor at bottom (coldest point)
-    processor = Circle((4.5, 9.5), 0.8, color='#00d4ff', ec='#006699', linewidth=2)
+    processor = mpatches.Circle((4.5, 9.5), 0.8, color='#00d4ff', ec='#006699', linewidth=2)
     ax.add_patch(processor)
     ax.text(4.5, 9.5, 'Qubits', ha='center', va='center', 
            fontsize=9, fontweight='bold', color='white')
@@ -496,66 +631,79 @@ def create_dilution_refrigerator():
     ax.text(0.2, 5, 'Cooling\nStages\n↓', ha='center', va='center',
            fontsize=10, fontweight='bold', color='#666666', rotation=90)
     
-    output_path = os.path.join(OUTPUT_DIR, 'dilution-refrigerator.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    output_path = figure_output.save_figure(fig, 'dilution-refrigerator.png')
     print(f"✅ Created: {output_path}")
     return True
 
-def main():
-    """Generate all images"""
+# Backends loaded up front for Qiskit-drawn circuit figures
+CIRCUIT_BACKENDS = ('matplotlib', 'qiskit', 'pylatexenc')
+
+# Figure jobs in render order; generate_all.py renders these together with
+# the Bell inequality visuals
+FIGURES = [
+    FigureJob("IBM Heron chip", "1. Creating IBM Heron R2 chip visualization",
+              "generate_images", "create_ibm_heron_chip", (), "IBM Heron chip"),
+    FigureJob("Dilution refrigerator", "2. Creating dilution refrigerator visualization",
+              "generate_images", "create_dilution_refrigerator", (), "dilution refrigerator"),
+    FigureJob("12-qubit circuit", "3. Creating 12-qubit GHZ circuit diagram",
+              "generate_images", "create_12qubit_circuit", (), "12-qubit circuit",
+              requires=CIRCUIT_BACKENDS),
+    FigureJob("3-6 qubit circuit", "4. Creating 3-6 qubit GHZ circuit diagram",
+              "generate_images", "create_3_6qubit_circuit", (), "3-6 qubit circuit",
+              requires=CIRCUIT_BACKENDS),
+    FigureJob("Entanglement viz", "5. Creating GHZ entanglement visualization",
+              "generate_images", "create_entanglement_visualization", (), "entanglement viz"),
+    FigureJob("Multipartite GHZ", "6. Creating multipartite GHZ illustration",
+              "generate_images", "create_multipartite_ghz", (), "multipartite GHZ"),
+    FigureJob("Network diagram", "7. Creating long-range GHZ network diagram",
+              "generate_images", "create_network_diagram", (), "network diagram"),
+    FigureJob("Fidelity chart", "8. Creating fidelity bar chart",
+              "generate_images", "create_fidelity_chart", (), "fidelity chart"),
+    FigureJob("GHZ circuit gallery", "9. Creating GHZ circuit diagrams for every validated size",
+              "generate_images", "create_ghz_circuit_gallery", (), "GHZ circuit gallery",
+              requires=CIRCUIT_BACKENDS),
+    FigureJob("Validation summary", "10. Creating hardware validation summary charts",
+              "generate_images", "create_validation_summary", (), "validation summary"),
+    FigureJob("GHZ routing", "11. Creating heavy-hex GHZ routing diagram",
+              "generate_images", "create_ghz_routing_diagram", (), "GHZ routing"),
+]
+
+
+def print_summary(results):
+    """Print the ✅/❌ summary for a list of JobResults"""
     print("=" * 60)
-    print("Generating Visual Assets for SteadyWatch Quantum Demo")
+    print("Summary:")
     print("=" * 60)
+    success_count = sum(1 for result in results if result.success)
+    for result in results:
+        status = "✅" if result.success else "❌"
+        print(f"{status} {result.name}")
     print()
+    print(f"Successfully created {success_count}/{len(results)} images")
+    print(f"Images saved to: {OUTPUT_DIR}")
+    print("=" * 60)
+
+def main(argv=None):
+    """Generate all images"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_build_arguments(parser)
+    args = parser.parse_args(argv)
     
-    results = []
-    
-    print("1. Creating IBM Heron R2 chip visualization...")
-    results.append(("IBM Heron chip", create_ibm_heron_chip()))
-    print()
-    
-    print("2. Creating dilution refrigerator visualization...")
-    results.append(("Dilution refrigerator", create_dilution_refrigerator()))
-    print()
-    
-    print("3. Creating 12-qubit GHZ circuit diagram...")
-    results.append(("12-qubit circuit", create_12qubit_circuit()))
-    print()
-    
-    print("4. Creating 3-6 qubit GHZ circuit diagram...")
-    results.append(("3-6 qubit circuit", create_3_6qubit_circuit()))
-    print()
-    
-    print("5. Creating GHZ entanglement visualization...")
-    results.append(("Entanglement viz", create_entanglement_visualization()))
-    print()
-    
-    print("6. Creating multipartite GHZ illustration...")
-    results.append(("Multipartite GHZ", create_multipartite_ghz()))
-    print()
+    if args.list:
+        print_job_list(FIGURES)
+        return
     
-    print("7. Creating long-range GHZ network diagram...")
-    results.append(("Network diagram", create_network_diagram()))
+    print("=" * 60)
+    print("Generating Visual Assets for SteadyWatch Quantum Demo")
+    print("=" * 60)
     print()
     
-    print("8. Creating fidelity bar chart...")
-    results.append(("Fidelity chart", create_fidelity_chart()))
-    print()
+    results = run_from_args(FIGURES, args)
+    if results is None:
+        return 2
     
     # Summary
-    print("=" * 60)
-    print("Summary:")
-    print("=" * 60)
-    success_count = sum(1 for _, success in results if success)
-    for name, success in results:
-        status = "✅" if success else "❌"
-        print(f"{status} {name}")
-    print()
-    print(f"Successfully created {success_count}/{len(results)} images")
-    print(f"Images saved to: {OUTPUT_DIR}")
-    print("=" * 60)
+    print_summary(results)
 
 if __name__ == "__main__":
-    main()
-
+    sys.exit(main())
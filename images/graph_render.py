@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Graph Render
+Batched node/edge drawing for qubit connectivity figures
+
+Nodes are drawn as one EllipseCollection and edges as one LineCollection, so
+the artist count stays constant however many qubits a figure shows. Above
+LOD_MAX_EDGES edges, edges switch to alpha-density shading: a fixed-size
+random sample of edges is drawn as thin, nearly transparent solid lines
+whose overlap builds up the density. Draw time and memory stay roughly flat
+from a dozen qubits to thousands.
+"""
+
+import numpy as np
+from matplotlib.collections import EllipseCollection, LineCollection
+from matplotlib.colors import to_rgba_array
+
+# Above this many edges, draw edge density instead of individual segments
+LOD_MAX_EDGES = 2000
+
+# Edges sampled when shading edge density, and how each one is drawn
+DENSITY_EDGE_SAMPLES = 4000
+DENSITY_LINEWIDTH = 0.4
+DENSITY_ALPHA = 0.06
+
+# Above this many nodes, per-node text labels are left out
+LABEL_MAX_NODES = 32
+
+
+def circle_layout(num_nodes, center=(0.0, 0.0), radius=1.0, start_angle=-np.pi / 2):
+    """Positions of num_nodes evenly spaced on a circle, as an (N, 2) array"""
+    angles = start_angle + 2 * np.pi * np.arange(num_nodes) / num_nodes
+    return np.column_stack([center[0] + radius * np.cos(angles),
+                            center[1] + radius * np.sin(angles)])
+
+
+def circle_spacing(num_nodes, radius=1.0):
+    """Distance between neighbouring nodes of circle_layout"""
+    return 2 * radius * np.sin(np.pi / max(num_nodes, 2))
+
+
+def draw_nodes(ax, positions, radius, facecolor='lightblue', edgecolor='darkblue',
+               linewidth=2.5, labels=None, fontsize=8, zorder=3):
+    """Draw every node as one collection, with optional text labels"""
+    positions = np.asarray(positions, dtype=float)
+    diameters = np.full(len(positions), 2 * radius)
+    nodes = EllipseCollection(diameters, diameters, np.zeros(len(positions)),
+                              units='xy', offsets=positions,
+                              offset_transform=ax.transData,
+                              facecolors=facecolor, edgecolors=edgecolor,
+                              linewidths=linewidth, zorder=zorder)
+    ax.add_collection(nodes)
+
+    if labels is not None and len(positions) <= LABEL_MAX_NODES:
+        for (x, y), label in zip(positions, labels):
+            ax.text(x, y, label, ha='center', va='center', fontsize=fontsize,
+                    fontweight='bold', zorder=zorder + 1)
+    return nodes
+
+
+def complete_edge_count(num_nodes):
+    """Number of edges in the all-to-all graph on num_nodes nodes"""
+    return num_nodes * (num_nodes - 1) // 2
+
+
+def _sample_pairs(num_nodes, count, rng):
+    """count uniformly random distinct node pairs, without building all pairs"""
+    i = rng.integers(0, num_nodes, count)
+    j = rng.integers(0, num_nodes - 1, count)
+    j += j >= i
+    return np.column_stack([i, j])
+
+
+def _sample_edges(num_nodes, edges, rng):
+    """Edges to rasterize in density mode, at most DENSITY_EDGE_SAMPLES of them"""
+    if edges is None:
+        return _sample_pairs(num_nodes, DENSITY_EDGE_SAMPLES, rng)
+    if len(edges) <= DENSITY_EDGE_SAMPLES:
+        return edges
+    return edges[rng.choice(len(edges), DENSITY_EDGE_SAMPLES, replace=False)]
+
+
+def draw_edges(ax, positions, edges=None, edge_class=None, colors=('red',),
+               linewidth=1, alpha=0.3, linestyle='--', seed=0, zorder=1,
+               max_edges=LOD_MAX_EDGES):
+    """Draw graph edges as one LineCollection and return it
+
+    edges is an (E, 2) array of node index pairs, or None for the all-to-all
+    graph. edge_class maps index arrays (i, j) to an index into colors for
+    each edge. Above max_edges edges a fixed random sample (from seed, so
+    output is reproducible) is drawn as density shading instead; pass None
+    to always draw every edge, as device maps must.
+    """
+    positions = np.asarray(positions, dtype=float)
+    num_nodes = len(positions)
+    if edges is not None:
+        edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+    edge_count = complete_edge_count(num_nodes) if edges is None else len(edges)
+
+    if max_edges is None or edge_count <= max_edges:
+        if edges is None:
+            edges = np.column_stack(np.triu_indices(num_nodes, 1))
+    else:
+        # Level of detail: shade the density of a fixed-size edge sample
+        edges = _sample_edges(num_nodes, edges, np.random.default_rng(seed))
+        linewidth, alpha, linestyle = DENSITY_LINEWIDTH, DENSITY_ALPHA, '-'
+
+    classes = (np.zeros(len(edges), dtype=np.intp) if edge_class is None
+               else np.asarray(edge_class(edges[:, 0], edges[:, 1])))
+    lines = LineCollection(positions[edges], colors=to_rgba_array(colors)[classes],
+                           linewidths=linewidth, alpha=alpha, linestyles=linestyle,
+                           zorder=zorder)
+    ax.add_collection(lines)
+    return lines
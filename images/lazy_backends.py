@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Lazy Backends
+Deferred imports for the heavy libraries the figure generators use
+
+The generator scripts bind matplotlib, NumPy and their helper modules to
+LazyModule stand-ins, which import the real module on first attribute
+access. Listing figures, parsing arguments and checking the build cache
+therefore never pay for matplotlib or Qiskit, and a single-figure rebuild
+only imports what that figure touches. Every first import is timed so the
+--startup-report option can show where startup time went.
+"""
+
+import importlib
+import importlib.util
+import time
+import types
+
+# Reference point for the startup report: when the generators began importing
+STARTED = time.perf_counter()
+
+# Figure backends and the module whose import makes each one ready
+BACKENDS = {
+    'matplotlib': 'matplotlib.pyplot',
+    'numpy': 'numpy',
+    'qiskit': 'qiskit',
+    'pylatexenc': 'pylatexenc',
+}
+
+# Backends a figure can render without (e.g. Qiskit has a fallback diagram)
+OPTIONAL_BACKENDS = {'qiskit', 'pylatexenc'}
+
+# Seconds spent on each first import, keyed by module name, in import order
+import_times = {}
+
+
+def _timed_import(name):
+    """Import a module, recording how long it took if it was not yet loaded"""
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+    if name not in import_times and elapsed > 1e-4:
+        import_times[name] = elapsed
+    return module
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__file__ = None
+        if '.' not in name:
+            # Top-level specs can be found without importing anything, which
+            # lets the build cache fingerprint local helper modules unloaded
+            spec = importlib.util.find_spec(name)
+            if spec is not None and spec.origin:
+                self.__file__ = spec.origin
+
+    def __getattr__(self, attr):
+        module = _timed_import(self.__name__)
+        # Later lookups hit the copied namespace instead of this method
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """Return a LazyModule for name"""
+    return LazyModule(name)
+
+
+def require(*backends):
+    """Import the named backends now, returning those that are unavailable
+
+    Missing optional backends are reported rather than raised; a missing
+    required backend raises ImportError.
+    """
+    missing = []
+    for backend in backends:
+        try:
+            _timed_import(BACKENDS.get(backend, backend))
+        except ImportError:
+            if backend not in OPTIONAL_BACKENDS:
+                raise
+            missing.append(backend)
+    return missing
+
+
+def take_import_times():
+    """Return and forget the import timings recorded so far"""
+    times = dict(import_times)
+    import_times.clear()
+    return times
+
+
+def elapsed_ms():
+    """Milliseconds since the generators started importing"""
+    return (time.perf_counter() - STARTED) * 1000
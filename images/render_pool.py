@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Figure Render Pool
+Runs create_* figure functions serially or across a process pool
+
+Each job names its module and function so it can be shipped to a worker
+process. Workers are spawned fresh and pinned to the Agg backend, so no
+pyplot state is shared between figures or with the parent process.
+
+Given a BuildCache, jobs whose fingerprint matches the manifest are skipped
+without being dispatched at all.
+
+Jobs declare the backends they need (see lazy_backends); those are imported
+right before the job runs, so rendering one figure with --only imports
+nothing the figure does not use.
+
+Every job runs inside a figure_trace 'build' span. --trace writes the spans
+of all jobs (and workers) as one Chrome trace; --profile additionally runs
+each job under cProfile and prints its hottest functions.
+"""
+
+import contextlib
+import cProfile
+import fnmatch
+import functools
+import importlib
+import io
+import multiprocessing
+import os
+import pstats
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import figure_trace
+import lazy_backends
+
+# A single figure to render:
+#   name    - label used in the ✅/❌ summary
+#   message - progress line printed before the figure's own output
+#   module  - importable module holding the create_* function
+#   func    - name of the create_* function
+#   args    - positional arguments for the function
+#   error   - what to call the figure in "❌ Error creating ..." lines
+#   requires - lazy_backends names the figure needs
+FigureJob = namedtuple('FigureJob', 'name message module func args error requires',
+                       defaults=(('matplotlib',),))
+
+# Outcome of a job: log holds everything the function printed, outputs the
+# paths it saved through figure_output.save_figure, imports the seconds
+# spent on first imports while it ran, trace its figure_trace events and
+# profile the cProfile hot-spot table (with --trace / --profile)
+JobResult = namedtuple('JobResult', 'name module success log outputs imports trace profile',
+                       defaults=({}, (), ''))
+
+# Functions listed per figure by --profile
+PROFILE_TOP = 15
+
+
+def job_slug(job):
+    """Name used to pick a job with --only, e.g. 'fidelity-chart'"""
+    parts = [job.func[len('create_'):] if job.func.startswith('create_') else job.func]
+    parts += [str(arg) for arg in job.args]
+    return '-'.join(parts).replace('_', '-').lower()
+
+
+def select_jobs(jobs, patterns):
+    """Jobs whose slug matches any of the (glob) patterns, in job order"""
+    patterns = [pattern.strip().lower() for value in patterns
+                for pattern in value.split(',') if pattern.strip()]
+    unmatched = [pattern for pattern in patterns
+                 if not any(fnmatch.fnmatchcase(job_slug(job), pattern) for job in jobs)]
+    if unmatched:
+        raise ValueError(f"No figure matches {', '.join(unmatched)} "
+                         f"(use --list to see figure names)")
+    return [job for job in jobs
+            if any(fnmatch.fnmatchcase(job_slug(job), pattern) for pattern in patterns)]
+
+
+def print_job_list(jobs):
+    """Print each job's --only name and the backends it needs"""
+    width = max(len(job_slug(job)) for job in jobs)
+    for job in jobs:
+        print(f"  {job_slug(job):<{width}}  {job.name}  [{', '.join(job.requires)}]")
+
+
+def default_jobs():
+    """Number of worker processes to use for --jobs 0"""
+    return os.cpu_count() or 1
+
+
+def _init_worker():
+    """Give each worker process its own Agg backend before pyplot loads"""
+    os.environ['MPLBACKEND'] = 'Agg'
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _hot_spots(profile, top=PROFILE_TOP):
+    """cProfile table of the functions with the most time spent in themselves"""
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.strip_dirs().sort_stats('tottime').print_stats(top)
+    lines = stream.getvalue().strip().splitlines()
+    # Drop pstats' banner, keep the summary line and the table
+    table = [line for line in lines if line.strip() and 'Ordered by' not in line
+             and 'List reduced' not in line]
+    return '\n'.join(table) + '\n'
+
+
+def run_job(job, trace=False, profile=False):
+    """Run one figure job, capturing its output instead of printing it"""
+    import figure_output
+
+    if trace:
+        figure_trace.enable()
+    log = io.StringIO()
+    figure_output.take_written_paths()
+    lazy_backends.take_import_times()
+    figure_trace.take_events()
+    profiler = cProfile.Profile() if profile else None
+    with contextlib.redirect_stdout(log):
+        with figure_trace.span('build', figure=job.name, func=job.func) as record:
+            try:
+                missing = lazy_backends.require(*job.requires)
+                if missing:
+                    print(f"⚠️  Optional backend not available: {', '.join(missing)}")
+                module = importlib.import_module(job.module)
+                if profiler:
+                    profiler.enable()
+                try:
+                    success = bool(getattr(module, job.func)(*job.args))
+                finally:
+                    if profiler:
+                        profiler.disable()
+            except Exception as e:
+                print(f"❌ Error creating {job.error}: {e}")
+                success = False
+            outputs = figure_output.take_written_paths()
+            record['files'] = len(outputs)
+            record['bytes'] = sum(os.path.getsize(path) for path in outputs if os.path.exists(path))
+    return JobResult(job.name, job.module, success, log.getvalue(), outputs,
+                     lazy_backends.take_import_times(), figure_trace.take_events(),
+                     _hot_spots(profiler) if profiler else '')
+
+
+def _skipped(job, cache):
+    """Result for a job whose outputs are already up to date"""
+    import build_cache
+
+    log = ''.join(f"⏭️  Up to date: {os.path.join(build_cache.OUTPUT_DIR, name)}\n"
+                  for name in cache.outputs(job))
+    return JobResult(job.name, job.module, True, log, [])
+
+
+def _report(job, result):
+    """Print a job's progress line and captured output"""
+    if job.message:
+        print(f"{job.message}...")
+    if result.log:
+        print(result.log, end='')
+    if result.profile:
+        print(f"🔥 Hot spots for {result.name}:")
+        print(result.profile, end='')
+    if job.message:
+        print()
+
+
+def _render(jobs, num_jobs, trace=False, profile=False):
+    """Yield a result for each job in order, rendering serially or in a pool"""
+    run = functools.partial(run_job, trace=trace, profile=profile)
+    if num_jobs == 1:
+        for job in jobs:
+            yield run(job)
+        return
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=num_jobs, mp_context=context,
+                             initializer=_init_worker) as executor:
+        yield from executor.map(run, jobs)
+
+
+def run_jobs(jobs, num_jobs=1, cache=None, force=False, trace=False, profile=False):
+    """Render every job and return their results in job order
+
+    With num_jobs == 1 jobs run in this process one after another. Otherwise
+    they are spread across a spawned process pool and each job's output is
+    printed as soon as it and all jobs before it have finished.
+
+    With a cache, jobs whose fingerprint is unchanged are skipped (unless
+    force is set) and every successful render is recorded in the manifest.
+    trace and profile are passed on to run_job.
+    """
+    jobs = list(jobs)
+    digests = {}
+    if cache is not None:
+        import build_cache
+        digests = {job: build_cache.fingerprint(job) for job in jobs}
+    stale = [job for job in jobs
+             if force or cache is None or not cache.is_fresh(job, digests[job])]
+
+    if num_jobs <= 0:
+        num_jobs = default_jobs()
+    num_jobs = min(num_jobs, len(stale)) or 1
+
+    rendered = _render(stale, num_jobs, trace, profile)
+    results = []
+    for job in jobs:
+        if job in stale:
+            result = next(rendered)
+            if cache is not None and result.success and result.outputs:
+                cache.record(job, digests[job], result.outputs)
+        else:
+            result = _skipped(job, cache)
+        _report(job, result)
+        results.append(result)
+    rendered.close()
+
+    if cache is not None:
+        cache.save()
+    return results
+
+
+def print_startup_report(results, ready_ms):
+    """Print where time went before and during rendering"""
+    print("=" * 60)
+    print("Startup report:")
+    print("=" * 60)
+    print(f"Ready to render after {ready_ms:.0f} ms (script imports, arguments, job selection)")
+    for result in results:
+        for module, seconds in result.imports.items():
+            print(f"  import {module:<24} {seconds * 1000:8.0f} ms  (first used by {result.name})")
+    print("For a per-module breakdown run: python3 -X importtime <script> --only <figure>")
+    print()
+
+
+def add_build_arguments(parser):
+    """Add the shared build options to a generator's argument parser"""
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='render figures in N worker processes '
+                             '(0 = one per CPU, default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render figures even if their inputs are unchanged')
+    parser.add_argument('--only', action='append', default=[], metavar='NAME',
+                        help='render only the named figures (comma-separated, glob '
+                             'patterns allowed, e.g. fidelity-chart or mermin-*)')
+    parser.add_argument('--list', action='store_true',
+                        help='list figure names and the backends each needs, then exit')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='report startup and backend import times')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='write build/layout/draw/encode spans of every rendered '
+                             'figure as Chrome trace-event JSON (add --force to '
+                             'include up-to-date figures)')
+    parser.add_argument('--profile', action='store_true',
+                        help='run each figure under cProfile and print its hot spots')
+
+
+def run_from_args(jobs, args):
+    """Render jobs with the options parsed by add_build_arguments
+
+    Returns the JobResults, or None when --only names a figure that does
+    not exist (the generators then exit with status 2).
+    """
+    import build_cache
+
+    if args.only:
+        try:
+            jobs = select_jobs(jobs, args.only)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+    ready_ms = lazy_backends.elapsed_ms()
+    results = run_jobs(jobs, args.jobs, cache=build_cache.BuildCache(), force=args.force,
+                       trace=bool(args.trace), profile=args.profile)
+    rendered = [path for result in results if result.success for path in result.outputs]
+    if rendered:
+        import web_variants
+        web_variants.update_manifest(rendered)
+    if args.startup_report:
+        print_startup_report(results, ready_ms)
+    if args.trace:
+        events = [event for result in results for event in result.trace]
+        figure_trace.write_chrome_trace(args.trace, events)
+        print(f"📈 Trace of {sum(bool(result.trace) for result in results)} figures "
+              f"written to {args.trace}")
+        print()
+    return results
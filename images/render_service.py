@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Figure Render Service
+Long-lived Flask service that renders figures on demand from warm workers
+
+Each generator run pays for importing matplotlib and Qiskit, building the
+font cache and setting up the backend before drawing anything. The service
+does that once per worker process: workers are spawned at startup with the
+Agg backend set, every figure backend imported, the generator modules
+loaded and a text figure drawn. A render request then costs only the
+create_* call itself.
+
+A request names a figure by its --only name (e.g. fidelity-chart) and may
+pass the positional arguments its create_* function allows in
+FIGURE_PARAMETERS: typed values such as a qubit count or a record id, never
+a path or filename. Any other argument is rejected with a 400.
+
+Results are keyed by the figure, its arguments and its build_cache
+fingerprint, which covers the function source and the data files it reads,
+including those passed as default arguments (path=VALIDATIONS_PATH). A new
+hardware run in hardware_validations.json therefore changes the key
+and triggers a fresh render. Every render writes into its own temporary
+directory, so the committed images/*.png and the build manifest are never
+touched. Identical requests in flight share one render, and finished
+results are kept in an LRU cache bounded by bytes.
+
+Endpoints:
+    GET  /figures                    figure names and the backends each needs
+    POST /render                     {"figure": "fidelity-chart", "args": ["qkd-1"]}
+    GET  /figures/<name>.png         the figure's main PNG (?args=["qkd-1"])
+    GET  /files/<key>/<path>         any file a render wrote
+    GET  /metrics                    queue depth, cache and latency figures
+    GET  /healthz
+
+Usage:
+    python3 render_service.py [--port 8765] [--workers 2] [--cache-mb 256]
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import lazy_backends
+import render_pool
+from render_pool import job_slug
+
+# Set output directory
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Generator modules whose FIGURES the service renders
+GENERATOR_MODULES = ('generate_images', 'generate_bell_inequality_visuals')
+
+# Default bound on the bytes of rendered files kept in the result cache
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Latencies kept for the percentiles in /metrics
+LATENCY_WINDOW = 1000
+
+# Largest qubit count a request may ask the N-parametric figures for
+MAX_REQUEST_QUBITS = 1000
+
+_RECORD_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def _qubit_count(value):
+    if isinstance(value, bool) or not isinstance(value, int) or not 2 <= value <= MAX_REQUEST_QUBITS:
+        raise ValueError(f"must be an integer from 2 to {MAX_REQUEST_QUBITS}")
+    return value
+
+
+def _record_id(value):
+    if not isinstance(value, str) or not _RECORD_ID_RE.match(value):
+        raise ValueError("must be a validation record id such as qkd-1")
+    return value
+
+
+def _one_of(*options):
+    def check(value):
+        if value not in options:
+            raise ValueError(f"must be one of {', '.join(map(str, options))}")
+        return value
+    return check
+
+
+# Positional arguments a request may pass to each create_* function, as
+# (name, check) pairs; functions not listed take none. Parameters naming
+# files or paths are deliberately left out.
+FIGURE_PARAMETERS = {
+    'create_entanglement_visualization': (('num_qubits', _qubit_count),),
+    'create_multipartite_ghz': (('num_qubits', _qubit_count),),
+    'create_fidelity_chart': (('record_id', _record_id),),
+    'create_ghz_circuit_gallery': (('layout', _one_of('chain', 'tree')),),
+    'create_mermin_circuit_diagram': (('observable', _one_of('XXX', 'XYY', 'YXY', 'YYX')),),
+}
+
+
+def check_args(job, args):
+    """Validated argument tuple for a job (ValueError if any is not allowed)"""
+    if not isinstance(args, (list, tuple)):
+        raise ValueError("args must be a JSON list")
+    parameters = FIGURE_PARAMETERS.get(job.func, ())
+    if len(args) > len(parameters):
+        allowed = ', '.join(name for name, _ in parameters) or 'none'
+        raise ValueError(f"{job.func} takes at most {len(parameters)} arguments ({allowed})")
+    checked = []
+    for (name, check), value in zip(parameters, args):
+        try:
+            checked.append(check(value))
+        except ValueError as e:
+            raise ValueError(f"{name} {e}") from None
+    return tuple(checked)
+
+# key     - hex digest identifying the render (figure, args, fingerprint)
+# figure  - --only name of the figure
+# args    - positional arguments passed to its create_* function
+# success - whether the create_* function reported success
+# log     - everything it printed
+# files   - {path relative to the images directory: bytes} of every file it wrote
+# seconds - render time in the worker
+RenderResult = namedtuple('RenderResult', 'key figure args success log files seconds')
+
+
+def _warm_worker(modules):
+    """Set up a worker so its first render pays no import or font cost"""
+    render_pool._init_worker()
+    lazy_backends.require(*lazy_backends.BACKENDS)
+    for module in modules:
+        importlib.import_module(module)
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(2, 1))
+    fig.text(0.5, 0.5, 'Warm-up 0.5', fontweight='bold', ha='center')
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def _worker_ready():
+    """No-op task used to start every worker up front"""
+    return os.getpid()
+
+
+def _render_job(job):
+    """Run one job in a worker and return (success, log, files, seconds)
+
+    Figures are written into a temporary directory that is removed once
+    their bytes have been read, never into the images directory.
+    """
+    import figure_output
+    import web_variants
+
+    start = time.perf_counter()
+    saved = figure_output.OUTPUT_DIR, web_variants.WEB_DIR
+    with tempfile.TemporaryDirectory(prefix='render-') as output_dir:
+        figure_output.OUTPUT_DIR = output_dir
+        web_variants.WEB_DIR = os.path.join(output_dir, 'web')
+        try:
+            result = render_pool.run_job(job)
+        finally:
+            figure_output.OUTPUT_DIR, web_variants.WEB_DIR = saved
+        files = {}
+        for path in result.outputs:
+            name = os.path.relpath(path, output_dir)
+            if name.startswith(os.pardir) or not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                files[name] = f.read()
+    return result.success, result.log, files, time.perf_counter() - start
+
+
+def _percentiles(values):
+    """p50/p95/max of a latency window, in milliseconds"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {'count': len(ordered), 'p50_ms': round(pick(0.5), 1), 'p95_ms': round(pick(0.95), 1),
+            'max_ms': round(ordered[-1] * 1000, 1)}
+
+
+class RenderService:
+    """Warm worker pool with in-flight deduplication and an LRU result cache"""
+
+    def __init__(self, jobs, workers=2, cache_max_bytes=CACHE_MAX_BYTES,
+                 modules=GENERATOR_MODULES):
+        self.jobs = {job_slug(job): job for job in jobs}
+        self.workers = workers
+        self.cache_max_bytes = cache_max_bytes
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_warm_worker, initargs=(tuple(modules),))
+        # Spawn every worker now rather than on the first requests
+        self.ready = [self.executor.submit(_worker_ready) for _ in range(workers)]
+
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.counters = defaultdict(int)
+        self.render_latency = deque(maxlen=LATENCY_WINDOW)
+        self.request_latency = deque(maxlen=LATENCY_WINDOW)
+
+    def close(self):
+        """Stop the worker processes"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def job_for(self, figure, args=()):
+        """FigureJob for a figure name and argument list
+
+        KeyError if the figure is unknown, ValueError if an argument is not
+        one check_args allows.
+        """
+        job = self.jobs[figure]
+        return job._replace(args=check_args(job, args) if args else job.args)
+
+    def render_key(self, job):
+        """Cache key of a job: figure, arguments and input fingerprint"""
+        import build_cache
+
+        payload = json.dumps([job.module, job.func, list(job.args), build_cache.fingerprint(job)],
+                             default=repr)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key):
+        with self.lock:
+            result = self.cache.get(key)
+            if result is not None:
+                self.cache.move_to_end(key)
+            return result
+
+    def _cache_put(self, result):
+        size = sum(len(data) for data in result.files.values())
+        if size > self.cache_max_bytes:
+            return
+        with self.lock:
+            if result.key in self.cache:
+                return
+            self.cache[result.key] = result
+            self.cache_bytes += size
+            while self.cache_bytes > self.cache_max_bytes:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_bytes -= sum(len(data) for data in evicted.files.values())
+                self.counters['cache_evictions'] += 1
+
+    def _run(self, figure, job, key):
+        """Render a job in the pool"""
+        success, log, files, seconds = self.executor.submit(_render_job, job).result()
+        result = RenderResult(key, figure, list(job.args), success, log, files, seconds)
+        with self.lock:
+            self.counters['renders'] += 1
+            self.counters['render_failures'] += not success
+            self.render_latency.append(seconds)
+        if success:
+            self._cache_put(result)
+        return result
+
+    def render(self, figure, args=()):
+        """Render (or fetch) a figure; returns (RenderResult, source)
+
+        source is 'cache' for a cache hit, 'shared' when the request joined
+        an identical render already in flight, and 'render' otherwise.
+        """
+        start = time.perf_counter()
+        job = self.job_for(figure, args)
+        key = self.render_key(job)
+
+        result = self._cache_get(key)
+        if result is not None:
+            source = 'cache'
+        else:
+            with self.lock:
+                entry = self.inflight.get(key)
+                owner = entry is None
+                if owner:
+                    entry = self.inflight[key] = {'done': threading.Event(), 'result': None,
+                                                  'error': None, 'started': time.perf_counter()}
+            if owner:
+                try:
+                    entry['result'] = self._run(figure, job, key)
+                except Exception as e:
+                    entry['error'] = e
+                finally:
+                    with self.lock:
+                        del self.inflight[key]
+                    entry['done'].set()
+            else:
+                entry['done'].wait()
+            if entry['error'] is not None:
+                raise entry['error']
+            result, source = entry['result'], 'render' if owner else 'shared'
+
+        with self.lock:
+            self.counters['requests'] += 1
+            self.counters[f'requests_{source}'] += 1
+            self.request_latency.append(time.perf_counter() - start)
+        return result, source
+
+    def cached_result(self, key):
+        """A finished result by key, or None"""
+        return self._cache_get(key)
+
+    def metrics(self):
+        """Counters, queue depth, cache occupancy and latency percentiles"""
+        with self.lock:
+            inflight = len(self.inflight)
+            counters = dict(self.counters)
+            cache = {'entries': len(self.cache), 'bytes': self.cache_bytes,
+                     'max_bytes': self.cache_max_bytes}
+            render_latency = list(self.render_latency)
+            request_latency = list(self.request_latency)
+        lookups = counters.get('requests', 0)
+        return {
+            'workers': self.workers,
+            'workers_ready': sum(future.done() for future in self.ready),
+            'inflight': inflight,
+            # Renders waiting for a worker beyond those being drawn
+            'queue_depth': max(0, inflight - self.workers),
+            'counters': counters,
+            'cache': dict(cache, hit_ratio=round(counters.get('requests_cache', 0) / lookups, 3)
+                          if lookups else None),
+            'render_latency': _percentiles(render_latency),
+            'request_latency': _percentiles(request_latency),
+        }
+
+
+def _main_png(result):
+    """The main PNG a render wrote (web variants excluded)"""
+    for name in result.files:
+        if name.endswith('.png') and not name.startswith('web' + os.sep):
+            return name
+    return None
+
+
+def create_app(service):
+    """Flask app exposing a RenderService"""
+    from flask import Flask, Response, abort, jsonify, request
+
+    app = Flask(__name__)
+
+    def parse_args(raw):
+        if raw is None:
+            return []
+        args = json.loads(raw) if isinstance(raw, str) else raw
+        if not isinstance(args, list):
+            raise ValueError("args must be a JSON list")
+        return args
+
+    def render_or_error(figure, args):
+        if figure not in service.jobs:
+            return None, (jsonify(error=f"Unknown figure {figure!r}"), 404)
+        try:
+            result, source = service.render(figure, args)
+        except ValueError as e:
+            return None, (jsonify(error=str(e)), 400)
+        if not result.success:
+            return None, (jsonify(error=f"Rendering {figure} failed", log=result.log), 500)
+        return (result, source), None
+
+    @app.get('/healthz')
+    def healthz():
+        return jsonify(status='ok')
+
+    @app.get('/figures')
+    def figures():
+        return jsonify({name: {'title': job.name, 'requires': list(job.requires)}
+                        for name, job in service.jobs.items()})
+
+    @app.post('/render')
+    def render():
+        body = request.get_json(silent=True) or {}
+        try:
+            args = parse_args(body.get('args'))
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        rendered, error = render_or_error(body.get('figure'), args)
+        if error:
+            return error
+        result, source = rendered
+        return jsonify(figure=result.figure, args=result.args, key=result.key, source=source,
+                       render_seconds=round(result.seconds, 3), log=result.log,
+                       files={name: {'bytes': len(data), 'url': f'/files/{result.key}/{name}'}
+                              for name, data in result.files.items()})
+
+    @app.get('/figures/<figure>.png')
+    def figure_png(figure):
+        try:
+            args = parse_args(request.args.get('args'))
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        rendered, error = render_or_error(figure, args)
+        if error:
+            return error
+        result, source = rendered
+        name = _main_png(result)
+        if name is None:
+            return jsonify(error=f"{figure} wrote no PNG"), 500
+        return Response(result.files[name], mimetype='image/png',
+                        headers={'X-Render-Source': source, 'ETag': result.key})
+
+    @app.get('/files/<key>/<path:name>')
+    def files(key, name):
+        result = service.cached_result(key)
+        if result is None or name not in result.files:
+            abort(404)
+        mimetype = 'image/png' if name.endswith('.png') else 'application/octet-stream'
+        return Response(result.files[name], mimetype=mimetype)
+
+    @app.get('/metrics')
+    def metrics():
+        return jsonify(service.metrics())
+
+    return app
+
+
+def all_jobs():
+    """Figure jobs of every generator module"""
+    return [job for module in GENERATOR_MODULES
+            for job in importlib.import_module(module).FIGURES]
+
+
+def main(argv=None):
+    """Start the render service"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2, help='warm worker processes')
+    parser.add_argument('--cache-mb', type=float, default=CACHE_MAX_BYTES / 2 ** 20,
+                        help='result cache size in MB')
+    args = parser.parse_args(argv)
+
+    service = RenderService(all_jobs(), workers=max(1, args.workers),
+                            cache_max_bytes=int(args.cache_mb * 2 ** 20))
+    print(f"✅ Render service on http://{args.host}:{args.port} "
+          f"({len(service.jobs)} figures, {service.workers} workers)")
+    try:
+        create_app(service).run(host=args.host, port=args.port, threaded=True)
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Web Variants
+Downscaled, palette-quantized copies of every figure for the web pages
+
+figure_output.save_figure renders a figure once, at print resolution, and
+hands the Agg canvas's RGBA raster to write_variants, which resizes it to
+each width in WEB_WIDTHS and stores 256-colour palette PNGs under
+images/web/. No figure code runs again per size. The manifest at
+images/web/manifest.json maps each original path to its variants, so
+pages can build an <img srcset> (see js/figure-srcset.js).
+
+Existing, hand-made images can be converted too, and --validation-media
+converts every screenshot the validation page shows:
+    python3 web_variants.py seed_18.png hurwitz_p13.png
+    python3 web_variants.py --validation-media
+
+images/web/ is committed: the site is served as-is, with no build step, so
+rerun the second command after adding a validation screenshot and commit
+the variants and manifest with it.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+
+# Set output directory
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(OUTPUT_DIR)
+
+# Variants live next to the originals, in their own directory
+WEB_DIR = os.path.join(OUTPUT_DIR, 'web')
+MANIFEST_PATH = os.path.join(WEB_DIR, 'manifest.json')
+
+# Validation records, whose media screenshots fill hardware-validation.html
+VALIDATIONS_PATH = os.path.join(REPO_DIR, 'hardware_validations.json')
+
+# Target widths in pixels: retina displays, regular pages, thumbnails
+WEB_WIDTHS = {'retina': 1600, 'web': 800, 'thumb': 320}
+
+# Palette size for the quantized variants
+PALETTE_COLORS = 256
+
+
+def variant_path(filename, width):
+    """Where the variant of filename at width pixels is written"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(WEB_DIR, f'{stem}-{width}w.png')
+
+
+def _encode(image):
+    """Encode an RGB image as a palette PNG"""
+    from PIL import Image
+
+    quantized = image.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE,
+                               dither=Image.Dither.NONE)
+    buffer = io.BytesIO()
+    # zlib's default level: optimize=True costs several times the encode for
+    # a few percent on these flat-colour figures
+    quantized.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _rgb_image(source):
+    """RGB Pillow image of a rendered figure (PNG bytes or an RGBA array)"""
+    from PIL import Image
+
+    if isinstance(source, (bytes, bytearray)):
+        with Image.open(io.BytesIO(source)) as original:
+            if original.mode not in ('RGBA', 'LA', 'P'):
+                return original.convert('RGB')
+            rgba = original.convert('RGBA')
+    elif source[..., 3].min() == 255:
+        return Image.fromarray(source[..., :3], 'RGB')
+    else:
+        rgba = Image.fromarray(source, 'RGBA')
+    # Flatten onto white, as the figures are saved with a white face
+    image = Image.new('RGB', rgba.size, 'white')
+    image.paste(rgba, mask=rgba.getchannel('A'))
+    return image
+
+
+def write_variants(source, filename):
+    """Write the web variants of a rendered figure and return their paths
+
+    source is the figure's PNG bytes or, straight from the Agg canvas, its
+    RGBA array, which spares decoding the PNG that was just encoded. Each
+    width is resized from the next larger variant rather than from the
+    full raster. Only widths smaller than the original are produced.
+    """
+    from PIL import Image
+
+    image = _rgb_image(source)
+    original_width, original_height = image.size
+    os.makedirs(WEB_DIR, exist_ok=True)
+    paths = []
+    for width in sorted(set(WEB_WIDTHS.values()), reverse=True):
+        if width >= original_width:
+            continue
+        height = max(1, round(original_height * width / original_width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        path = variant_path(filename, width)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_encode(image))
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def _site_path(path):
+    """Path as the web pages reference it, relative to the repository root"""
+    return os.path.relpath(os.path.abspath(path), REPO_DIR).replace(os.sep, '/')
+
+
+def update_manifest(paths, manifest_path=MANIFEST_PATH):
+    """Add or refresh manifest entries for original image paths
+
+    Variant paths in the list are ignored; each original's variants are
+    found from WEB_WIDTHS. Entries for other images are kept.
+    """
+    from PIL import Image
+
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    originals = [path for path in paths
+                 if os.path.dirname(os.path.abspath(path)) != WEB_DIR and os.path.exists(path)]
+    for path in originals:
+        with Image.open(path) as image:
+            width, height = image.size
+        variants = []
+        for target in sorted(set(WEB_WIDTHS.values())):
+            variant = variant_path(path, target)
+            if target < width and os.path.exists(variant):
+                variants.append({
+                    'path': _site_path(variant),
+                    'width': target,
+                    'height': max(1, round(height * target / width)),
+                    'bytes': os.path.getsize(variant),
+                })
+        manifest[_site_path(path)] = {
+            'width': width,
+            'height': height,
+            'bytes': os.path.getsize(path),
+            'variants': variants,
+        }
+
+    if not originals:
+        return manifest
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def validation_media(path=VALIDATIONS_PATH):
+    """Existing image files the validation records show as their media"""
+    with open(path) as f:
+        records = json.load(f)
+    paths = sorted({os.path.join(REPO_DIR, record['media']['path'])
+                    for record in records if record.get('media', {}).get('path')})
+    return [path for path in paths if path.lower().endswith('.png') and os.path.exists(path)]
+
+
+def main(argv=None):
+    """Write web variants for existing images and add them to the manifest"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', help='images to convert')
+    parser.add_argument('--validation-media', action='store_true',
+                        help='also convert every screenshot hardware-validation.html shows')
+    args = parser.parse_args(argv)
+    paths = args.paths + (validation_media() if args.validation_media else [])
+    if not paths:
+        parser.print_help()
+        return 1
+    for path in paths:
+        with open(path, 'rb') as f:
+            written = write_variants(f.read(), path)
+        print(f"✅ {path}: {len(written)} variants")
+    manifest = update_manifest(paths)
+    original = sum(manifest[_site_path(path)]['bytes'] for path in paths)
+    smallest = sum(min([v['bytes'] for v in manifest[_site_path(path)]['variants']]
+                       or [manifest[_site_path(path)]['bytes']]) for path in paths)
+    print(f"   {original:,} bytes at full size, {smallest:,} bytes as the smallest variants")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
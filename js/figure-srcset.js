@@ -0,0 +1,61 @@
+/**
+ * FigureSrcset — responsive sources for the generated figures.
+ * images/web/manifest.json (written by images/web_variants.py) lists, per
+ * original image, its downscaled palette-PNG variants. apply() gives every
+ * <img> under a root whose src is in the manifest a srcset of those
+ * variants plus the original, so browsers fetch the smallest one that fits.
+ * Images without variants, or a missing manifest, are left untouched.
+ * Exposes window.FigureSrcset = { load, srcset, apply }.
+ */
+(function () {
+    'use strict';
+
+    var MANIFEST_URL = 'images/web/manifest.json';
+    var DEFAULT_SIZES = '(max-width: 600px) 100vw, 50vw';
+
+    var manifest = null;
+    var pending = null;
+
+    function load(url) {
+        if (manifest) return Promise.resolve(manifest);
+        if (!pending) {
+            pending = fetch(url || MANIFEST_URL)
+                .then(function (response) { return response.ok ? response.json() : {}; })
+                .catch(function () { return {}; })
+                .then(function (data) { manifest = data; return data; });
+        }
+        return pending;
+    }
+
+    function normalize(path) {
+        return String(path || '').replace(/^\.?\//, '').split(/[?#]/)[0];
+    }
+
+    function srcset(path) {
+        var entry = manifest && manifest[normalize(path)];
+        if (!entry || !entry.variants || !entry.variants.length) return '';
+        var sources = entry.variants.map(function (variant) {
+            return variant.path + ' ' + variant.width + 'w';
+        });
+        sources.push(normalize(path) + ' ' + entry.width + 'w');
+        return sources.join(', ');
+    }
+
+    function apply(root, sizes) {
+        return load().then(function () {
+            var images = (root || document).querySelectorAll('img');
+            Array.prototype.forEach.call(images, function (img) {
+                var path = img.getAttribute('src');
+                var sources = srcset(path);
+                if (!sources || img.hasAttribute('srcset')) return;
+                var entry = manifest[normalize(path)];
+                img.setAttribute('width', entry.width);
+                img.setAttribute('height', entry.height);
+                img.setAttribute('sizes', sizes || img.getAttribute('sizes') || DEFAULT_SIZES);
+                img.setAttribute('srcset', sources);
+            });
+        });
+    }
+
+    window.FigureSrcset = { load: load, srcset: srcset, apply: apply };
+})();
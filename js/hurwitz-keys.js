@@ -1,7 +1,9 @@
 /**
  * Hurwitz key list for game and viz.
  * Port from layers-336-three.js (test_hurwitz_quaternion_sieve.py).
- * No Three.js dependency. Exposes window.HurwitzKeys = { unzipSeed, getKey }.
+ * No Three.js dependency. Exposes window.HurwitzKeys = { unzipSeed, getKey, loadSeed, decodeKeyTable }.
+ * Keys are cached per prime; loadSeed reads the binary tables written by
+ * quantum_computing/hurwitz.py (data/hurwitz/p{p}.hwzk), same order as unzipSeed.
  */
 (function () {
     'use strict';
@@ -165,9 +167,55 @@
         return primes;
     }
 
+    var keyCache = {};
+
     function unzipSeed(primeP) {
-        if (primeP === 2) return generateHurwitzPrimesNorm2();
-        return generateHurwitzPrimesNormP(primeP);
+        if (!keyCache[primeP]) {
+            keyCache[primeP] = primeP === 2 ? generateHurwitzPrimesNorm2() : generateHurwitzPrimesNormP(primeP);
+        }
+        return keyCache[primeP];
+    }
+
+    function decodeKeyTable(buffer) {
+        var view = new DataView(buffer);
+        var magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+        if (magic !== 'HWZK' || view.getUint8(4) !== 1) {
+            throw new Error('Not a Hurwitz key table');
+        }
+        var itemSize = view.getUint8(5);
+        var prime = view.getUint32(8, true);
+        var count = view.getUint32(12, true);
+        var read = itemSize === 1 ? view.getInt8.bind(view)
+            : itemSize === 2 ? function (offset) { return view.getInt16(offset, true); }
+            : function (offset) { return view.getInt32(offset, true); };
+        var keys = [];
+        for (var i = 0; i < count; i++) {
+            var offset = 16 + i * 4 * itemSize;
+            keys.push(new HurwitzQuaternion(
+                read(offset) / 2, read(offset + itemSize) / 2,
+                read(offset + 2 * itemSize) / 2, read(offset + 3 * itemSize) / 2
+            ));
+        }
+        return { prime: prime, keys: keys };
+    }
+
+    function loadSeed(primeP, baseUrl) {
+        if (keyCache[primeP]) return Promise.resolve(keyCache[primeP]);
+        var url = (baseUrl || 'data/hurwitz/') + 'p' + primeP + '.hwzk';
+        return fetch(url)
+            .then(function (response) {
+                if (!response.ok) throw new Error('HTTP ' + response.status);
+                return response.arrayBuffer();
+            })
+            .then(function (buffer) {
+                var table = decodeKeyTable(buffer);
+                if (table.prime !== primeP) throw new Error('Key table is for p=' + table.prime);
+                keyCache[primeP] = table.keys;
+                return table.keys;
+            })
+            .catch(function () {
+                return unzipSeed(primeP);
+            });
     }
 
     function getKey(prime, keyIndex) {
@@ -179,6 +227,8 @@
 
     window.HurwitzKeys = {
         unzipSeed: unzipSeed,
-        getKey: getKey
+        getKey: getKey,
+        loadSeed: loadSeed,
+        decodeKeyTable: decodeKeyTable
     };
 })();
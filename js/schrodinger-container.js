@@ -0,0 +1,175 @@
+/**
+ * SchrodingerContainer — decoder for the binary tunneling export (.swtn).
+ * Written by quantum_computing/tunneling_container.py: magic 'SWTN', uint32
+ * header length, JSON header (metadata, times, array offsets, frame chunks),
+ * then x / potential (float32) and the density frames (float16 or float32).
+ * Frames are returned as typed-array views on the fetched bytes; float16
+ * frames are viewed as Float16Array where supported, else decoded once.
+ * Exposes window.SchrodingerContainer = { parse, load }.
+ */
+(function () {
+    'use strict';
+
+    var MAGIC = 'SWTN';
+    var VERSION = 1;
+    var HEAD_BYTES = 16384;
+    // Extra attempts for a frame chunk before falling back to the JSON export
+    var CHUNK_RETRIES = 2;
+
+    function readHeader(buffer) {
+        var bytes = new Uint8Array(buffer, 0, 8);
+        var magic = String.fromCharCode(bytes[0], bytes[1], bytes[2], bytes[3]);
+        if (magic !== MAGIC) throw new Error('Not a tunneling container');
+        var length = new DataView(buffer).getUint32(4, true);
+        if (buffer.byteLength < 8 + length) return { length: length, header: null };
+        var header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, length)));
+        if (header.version !== VERSION) throw new Error('Unsupported container version ' + header.version);
+        return { length: length, header: header };
+    }
+
+    function decodeFloat16(bits) {
+        var out = new Float32Array(bits.length);
+        for (var i = 0; i < bits.length; i++) {
+            var h = bits[i];
+            var sign = h & 0x8000 ? -1 : 1;
+            var exp = (h >> 10) & 0x1f;
+            var frac = h & 0x3ff;
+            if (exp === 0) out[i] = sign * frac * Math.pow(2, -24);
+            else if (exp === 31) out[i] = frac ? NaN : sign * Infinity;
+            else out[i] = sign * (1 + frac / 1024) * Math.pow(2, exp - 15);
+        }
+        return out;
+    }
+
+    // View `count` values of `dtype` at byteOffset in buffer without copying
+    function view(buffer, byteOffset, count, dtype) {
+        if (dtype === 'float32') return new Float32Array(buffer, byteOffset, count);
+        if (typeof Float16Array !== 'undefined') return new Float16Array(buffer, byteOffset, count);
+        return decodeFloat16(new Uint16Array(buffer, byteOffset, count));
+    }
+
+    function emptyData(header) {
+        var frames = header.arrays.frames;
+        return {
+            metadata: header.metadata,
+            times: header.times,
+            x: null,
+            potential: null,
+            probability_density: new Array(frames.shape[0]).fill(null)
+        };
+    }
+
+    // Fill frames [start, stop) from a buffer whose byte 0 is file offset base
+    function addFrames(data, header, buffer, base, start, stop) {
+        var spec = header.arrays.frames;
+        var points = spec.shape[1];
+        var itemBytes = spec.dtype === 'float16' ? 2 : 4;
+        for (var f = start; f < stop; f++) {
+            var offset = spec.offset + f * points * itemBytes - base;
+            data.probability_density[f] = view(buffer, offset, points, spec.dtype);
+        }
+    }
+
+    function addAxes(data, header, buffer, base) {
+        data.x = view(buffer, header.arrays.x.offset - base, header.arrays.x.shape[0], 'float32');
+        data.potential = view(buffer, header.arrays.potential.offset - base,
+            header.arrays.potential.shape[0], 'float32');
+    }
+
+    /** Decode a whole container held in an ArrayBuffer. */
+    function parse(buffer) {
+        var header = readHeader(buffer).header;
+        if (!header) throw new Error('Truncated container header');
+        var data = emptyData(header);
+        addAxes(data, header, buffer, 0);
+        addFrames(data, header, buffer, 0, 0, data.probability_density.length);
+        return data;
+    }
+
+    function fetchRange(url, start, end) {
+        return fetch(url, { headers: { Range: 'bytes=' + start + '-' + (end - 1) } })
+            .then(function (r) {
+                if (!r.ok) throw new Error('HTTP ' + r.status);
+                return r.arrayBuffer().then(function (b) { return { partial: r.status === 206, buffer: b }; });
+            });
+    }
+
+    // Fetch a byte range, retrying up to `retries` more times after a failure
+    function fetchRangeRetry(url, start, end, retries) {
+        return fetchRange(url, start, end).catch(function (error) {
+            if (retries <= 0) throw error;
+            return fetchRangeRetry(url, start, end, retries - 1);
+        });
+    }
+
+    // Fill frames [start, stop) from the JSON export's arrays
+    function addJsonFrames(data, json, start, stop) {
+        for (var f = start; f < stop; f++) {
+            data.probability_density[f] = Float32Array.from(json.probability_density[f]);
+        }
+    }
+
+    /**
+     * Stream a container chunk by chunk with HTTP Range requests. Resolves
+     * once the header and axes are in, with probability_density entries
+     * null until their chunk arrives; onChunk(data, chunk, error) is called
+     * per chunk. A chunk whose range still fails after CHUNK_RETRIES retries
+     * is filled from the JSON export at fallbackUrl (fetched once, only if
+     * needed); if that fails too, its frames stay null and onChunk gets the
+     * error. Servers that ignore Range get the whole file parsed at once.
+     */
+    function load(url, onChunk, fallbackUrl) {
+        var fallback = null;
+        function fallbackJson() {
+            if (!fallback) {
+                fallback = fallbackUrl
+                    ? fetch(fallbackUrl).then(function (r) {
+                        if (!r.ok) throw new Error('HTTP ' + r.status);
+                        return r.json();
+                    })
+                    : Promise.reject(new Error('No fallback for missing frames'));
+            }
+            return fallback;
+        }
+
+        return fetchRange(url, 0, HEAD_BYTES).then(function (head) {
+            if (!head.partial) {
+                var whole = parse(head.buffer);
+                if (onChunk) onChunk(whole, null, null);
+                return whole;
+            }
+            var info = readHeader(head.buffer);
+            var headerReady = info.header
+                ? Promise.resolve(info.header)
+                : fetchRange(url, 0, 8 + info.length).then(function (r) { return readHeader(r.buffer).header; });
+            return headerReady.then(function (header) {
+                var data = emptyData(header);
+                var axesEnd = header.arrays.frames.offset;
+                var axesStart = header.arrays.x.offset;
+                return fetchRange(url, axesStart, axesEnd).then(function (axes) {
+                    addAxes(data, header, axes.buffer, axesStart);
+                    header.chunks.forEach(function (chunk) {
+                        var start = chunk.frames[0];
+                        var stop = chunk.frames[1];
+                        fetchRangeRetry(url, chunk.offset, chunk.offset + chunk.length, CHUNK_RETRIES)
+                            .then(function (r) {
+                                addFrames(data, header, r.buffer, chunk.offset, start, stop);
+                            }, function () {
+                                return fallbackJson().then(function (json) {
+                                    addJsonFrames(data, json, start, stop);
+                                });
+                            })
+                            .then(function () {
+                                if (onChunk) onChunk(data, chunk, null);
+                            }, function (error) {
+                                if (onChunk) onChunk(data, chunk, error);
+                            });
+                    });
+                    return data;
+                });
+            });
+        });
+    }
+
+    window.SchrodingerContainer = { parse: parse, load: load };
+})();
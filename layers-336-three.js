@@ -533,6 +533,19 @@ scene.add(rightPlane);
 var schrodingerMode = false;
 var schrodingerData = null;
 var schrodingerDataUrl = 'data/schrodinger_tunneling_export.json';
+// Binary export (js/schrodinger-container.js); frames stream in chunk by chunk
+var schrodingerContainerUrl = 'data/schrodinger_tunneling_export.swtn';
+
+function loadSchrodingerData() {
+if (window.SchrodingerContainer) {
+// Chunks that fail to stream are filled from the JSON export
+return window.SchrodingerContainer.load(schrodingerContainerUrl, function (data, chunk, error) {
+if (error) console.warn('Schrödinger frames ' + chunk.frames[0] + '-' + chunk.frames[1] + ' unavailable:', error);
+}, schrodingerDataUrl)
+.catch(function () { return fetch(schrodingerDataUrl).then(function (r) { return r.json(); }); });
+}
+return fetch(schrodingerDataUrl).then(function (r) { return r.json(); });
+}
 
 function smoothstepSchrod(t) {
 t = Math.max(0, Math.min(1, t));
@@ -634,8 +647,7 @@ rightKeys[ri].material.opacity = 0.9;
 window.toggleLayers336SchrodingerMode = function () {
 schrodingerMode = !schrodingerMode;
 if (schrodingerMode && !schrodingerData) {
-fetch(schrodingerDataUrl)
-.then(function (r) { return r.json(); })
+loadSchrodingerData()
 .then(function (d) {
 schrodingerData = d;
 var cap = document.getElementById('layers-336-caption');
@@ -1,5 +1,7 @@
 // NIST-PQC Comparison Visualization with D3.js - FIXED VERSION
-function initNISTComparison(containerId) {
+// randomnessReport (optional) is the NIST SP 800-22 report written by
+// quantum_computing/randomness_tests.py; it adds a randomness-test card
+function initNISTComparison(containerId, randomnessReport) {
     const container = document.getElementById(containerId);
     if (!container) {
         console.error('Container not found:', containerId);
@@ -13,7 +15,6 @@ function initNISTComparison(containerId) {
     }
 
     const width = Math.min(container.clientWidth || 1000, 1200);
-    const height = 800; // Increased height for text cards
     const margin = { top: 80, right: 100, bottom: 120, left: 220 };
 
     // Data
@@ -57,6 +58,21 @@ function initNISTComparison(containerId) {
         }
     ];
 
+    if (randomnessReport && randomnessReport.summary) {
+        const summary = randomnessReport.summary;
+        const bits = randomnessReport.sequence_bits * randomnessReport.num_sequences;
+        data.push({
+            aspect: "Randomness Tests",
+            nist: "Software DRBG (SP 800-90A)",
+            hybrid: `${summary.passed}/${summary.total} NIST SP 800-22 tests passed (${(bits / 1e6).toLocaleString()} Mbit QRNG)`,
+            category: "text"
+        });
+    }
+
+    // Text cards stack downwards, so each card beyond five adds to the height
+    const textCards = data.filter(d => d.category === "text").length;
+    const height = 800 + Math.max(0, textCards - 5) * 105; // Increased height for text cards
+
     container.innerHTML = '';
 
     const svg = d3.select(container)
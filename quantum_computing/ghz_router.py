@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+GHZ Router
+Minimum-depth GHZ preparation on a device coupling map
+
+A CX chain entangles one more qubit per layer (depth N). Once a qubit
+holds the GHZ state it can act as a control, so every entangled qubit can
+fan out to a coupled neighbour in the same layer. The number of entangled
+qubits then grows each layer, and depth follows the graph radius and the
+branching of the coupling map.
+
+The planner builds a BFS tree rooted at a centre of the coupling graph,
+which has the smallest possible eccentricity. Each qubit is assigned to the
+least-loaded parent in the previous BFS level, and each parent fires its
+children in order of decreasing subtree time. That order gives the fewest
+layers for the tree. Every CX acts on a coupler, so no SWAPs are needed,
+and the gate count stays N - 1.
+
+Usage:
+    python3 ghz_router.py                  # all 156 qubits of Heron r2
+    python3 ghz_router.py --qubits 0-11    # a subset, e.g. the 12-qubit runs
+    python3 ghz_router.py --rows 14 --cols 28
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import networkx as nx
+
+import heavy_hex
+
+# root      - physical qubit that gets the H gate
+# parents   - {qubit: control it is entangled from}, root excluded
+# layers    - list of CX layers, each a list of (control, target) pairs that
+#             act on disjoint qubits
+# depth     - circuit depth: 1 (H) + len(layers)
+# cx_count  - two-qubit gates, N - 1
+# chain_depth, chain_cx_count - the same figures for the linear CX chain
+GhzPlan = namedtuple('GhzPlan', 'root parents layers depth cx_count chain_depth chain_cx_count')
+
+
+def coupling_graph(edges, qubits=None):
+    """networkx Graph of a coupling map, restricted to `qubits` if given"""
+    graph = nx.Graph()
+    graph.add_edges_from((int(a), int(b)) for a, b in edges)
+    if qubits is not None:
+        qubits = [int(q) for q in qubits]
+        missing = set(qubits) - set(graph)
+        if missing:
+            raise ValueError(f"Qubits {sorted(missing)} are not on the coupling map")
+        graph = graph.subgraph(qubits).copy()
+        if len(qubits) == 1:
+            graph.add_node(qubits[0])
+    if len(graph) < 2:
+        raise ValueError("GHZ preparation needs at least 2 coupled qubits")
+    if not nx.is_connected(graph):
+        raise ValueError("Qubits must form a connected subgraph of the coupling map")
+    return graph
+
+
+def _bfs_parents(graph, root):
+    """BFS tree from root, assigning each qubit to its least-loaded parent"""
+    levels = nx.single_source_shortest_path_length(graph, root)
+    by_level = {}
+    for qubit, level in levels.items():
+        by_level.setdefault(level, []).append(qubit)
+
+    parents, load = {}, dict.fromkeys(graph, 0)
+    for level in range(1, max(by_level) + 1):
+        # Qubits with the fewest candidate parents choose first
+        candidates = {qubit: [n for n in graph[qubit] if levels[n] == level - 1]
+                      for qubit in by_level[level]}
+        for qubit in sorted(candidates, key=lambda q: (len(candidates[q]), q)):
+            parent = min(candidates[qubit], key=lambda n: (load[n], n))
+            parents[qubit] = parent
+            load[parent] += 1
+    return parents
+
+
+def _schedule(root, parents):
+    """CX layers for a tree: each qubit fires its slowest subtree first"""
+    children = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+
+    # Post-order: time for a subtree to be fully entangled once its root is
+    order, stack = [], [root]
+    while stack:
+        qubit = stack.pop()
+        order.append(qubit)
+        stack.extend(children.get(qubit, ()))
+    finish = {}
+    for qubit in reversed(order):
+        kids = sorted(children.get(qubit, ()), key=lambda c: (-finish[c], c))
+        children[qubit] = kids
+        finish[qubit] = max((i + 1 + finish[c] for i, c in enumerate(kids)), default=0)
+
+    # Children are entangled one per layer, starting the layer after their parent
+    layers = [[] for _ in range(finish[root])]
+    start = {root: 0}
+    for qubit in order:
+        for i, child in enumerate(children.get(qubit, ())):
+            layer = start[qubit] + i
+            layers[layer].append((qubit, child))
+            start[child] = layer + 1
+    return layers
+
+
+def plan_ghz(edges, qubits=None, root=None):
+    """Plan a minimum-depth GHZ preparation on a coupling map
+
+    edges is a coupling list ((E, 2) array or pairs, either direction) and
+    qubits an optional subset, which must be connected on its own. Every
+    centre of the graph is tried as the root unless root is given.
+    """
+    graph = coupling_graph(edges, qubits)
+    roots = [root] if root is not None else sorted(nx.center(graph))
+    best = None
+    for candidate in roots:
+        parents = _bfs_parents(graph, candidate)
+        layers = _schedule(candidate, parents)
+        if best is None or len(layers) < len(best[2]):
+            best = (candidate, parents, layers)
+
+    candidate, parents, layers = best
+    n = len(graph)
+    return GhzPlan(candidate, parents, layers, 1 + len(layers), n - 1, n, n - 1)
+
+
+def ghz_circuit(plan, num_qubits=None, measure=False):
+    """QuantumCircuit for a plan, on physical qubit indices
+
+    The register spans every physical qubit up to the largest one used (or
+    num_qubits), so the circuit maps onto the device without routing.
+    """
+    from qiskit import QuantumCircuit
+
+    used = [plan.root, *plan.parents]
+    qc = QuantumCircuit(num_qubits or max(used) + 1)
+    qc.h(plan.root)
+    for layer in plan.layers:
+        for control, target in layer:
+            qc.cx(control, target)
+    if measure:
+        qc.measure_all()
+    return qc
+
+
+def _parse_qubits(text):
+    """'0-11,14' -> [0, ..., 11, 14]"""
+    qubits = []
+    for part in text.split(','):
+        low, _, high = part.partition('-')
+        qubits.extend(range(int(low), int(high or low) + 1))
+    return qubits
+
+
+def main(argv=None):
+    """Plan GHZ preparation on a heavy-hex lattice and compare with the chain"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=heavy_hex.HERON_R2_SHAPE[0])
+    parser.add_argument('--cols', type=int, default=heavy_hex.HERON_R2_SHAPE[1])
+    parser.add_argument('--qubits', type=_parse_qubits, help="subset such as 0-11,14 (default: all)")
+    args = parser.parse_args(argv)
+
+    lattice = heavy_hex.heavy_hex_lattice(args.rows, args.cols)
+    start = time.perf_counter()
+    try:
+        plan = plan_ghz(lattice.edges, args.qubits)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    n = plan.cx_count + 1
+    print(f"✅ {n}-qubit GHZ on a {args.rows}x{args.cols} heavy-hex lattice "
+          f"(root {plan.root}, planned in {elapsed * 1000:.0f} ms)")
+    print(f"   Fan-out tree: depth {plan.depth}, {plan.cx_count} CX")
+    print(f"   Linear chain: depth {plan.chain_depth}, {plan.chain_cx_count} CX")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
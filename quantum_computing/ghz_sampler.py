@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+GHZ Sampler
+Analytic noisy-GHZ expectation values and shot sampling for 2-1000+ qubits
+
+An n-qubit GHZ state (|0...0> + |1...1>)/sqrt(2) has two amplitudes, so
+its noisy measurement statistics have closed forms and no 2^n
+statevector is needed. The noise model acts on every qubit in order:
+
+    depolarizing p   - X, Y or Z with probability p/3 each
+    dephasing q      - Z with probability q
+    T1 decay gamma   - amplitude damping, |1> -> |0> with probability gamma
+    readout p01, p10 - P(read 1 | 0) and P(read 0 | 1)
+
+Z basis: given the branch (all 0 or all 1, each with probability 1/2),
+every bit independently ends up flipped with a per-qubit probability
+that folds depolarizing, decay and readout together; dephasing has no
+effect.
+
+X/Y bases: the state is a mixture of computational basis states, which
+give uniform X/Y outcomes, plus the GHZ coherence, which biases the
+parity. Each qubit scales that coherence by (1 - 4p/3)(1 - 2q)sqrt(1 - gamma),
+so the outcome parity has expectation sign * C, where sign is the ideal
+term value (0 for an odd number of Ys), and the bits are uniform given
+their parity. Readout error is applied to those bits.
+
+Bit flips are placed sparsely: the number of hits per (shot, qubit) cell
+is drawn as Poisson(-ln(1 - p)) by scattering a Poisson total of random
+positions, so each cell is selected independently with probability
+exactly p, and the cost is proportional to the number of flips rather
+than shots x qubits. Counts are returned as packed_counts.PackedCounts;
+mermin_counts gives the {basis: {bitstring: count}} dicts that mermin.py
+and the Mermin figures read.
+
+Usage:
+    python3 ghz_sampler.py 28 --shots 1000000 --output ../data/ghz28_synthetic.npz
+    python3 ghz_sampler.py 3 --mermin --shots 10000 --output mermin_synthetic.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import packed_counts
+from mermin import mermin_terms, term_labels
+
+# Shots generated per batch, which bounds the temporary arrays
+BATCH_SHOTS = 1 << 18
+
+# Per-qubit noise; each field is a probability, scalar or one per qubit
+NoiseModel = namedtuple('NoiseModel', 'depolarizing dephasing t1_decay readout_p01 readout_p10',
+                        defaults=(0.0, 0.0, 0.0, 0.0, 0.0))
+
+# Noise of the ibm_fez Mermin run's order of magnitude, for benchmarks
+TYPICAL_NOISE = NoiseModel(depolarizing=0.01, dephasing=0.01, t1_decay=0.005,
+                           readout_p01=0.01, readout_p10=0.02)
+
+# num_qubits       - GHZ size
+# p_zeros, p_ones  - probabilities of measuring |0...0> and |1...1>
+# fidelity         - their sum (GHZ population fidelity)
+# coherence        - C, the factor every ideal X/Y correlator is scaled by
+#                    before readout
+# readout_offset   - the product of (p10 - p01), added to every X/Y
+#                    expectation by asymmetric readout
+# readout_scale    - the product of (1 - p01 - p10)
+# mermin_value     - noisy Mermin parameter over all 2^(n-1) terms
+# quantum_bound    - ideal |M| = 2^(n-1)
+GhzExpectations = namedtuple('GhzExpectations', 'num_qubits p_zeros p_ones fidelity coherence '
+                                                'readout_offset readout_scale mermin_value quantum_bound')
+
+
+def from_coherence_times(t1, t2, duration, depolarizing=0.0, readout_p01=0.0, readout_p10=0.0):
+    """NoiseModel from T1, T2 and the time the state is held (same units)
+
+    gamma = 1 - exp(-t/T1); pure dephasing at rate 1/T2 - 1/(2 T1) gives
+    q = (1 - exp(-t/T_phi)) / 2.
+    """
+    t1, t2 = np.asarray(t1, dtype=float), np.asarray(t2, dtype=float)
+    if np.any(t2 > 2 * t1):
+        raise ValueError("T2 cannot exceed 2 T1")
+    dephasing_rate = 1 / t2 - 1 / (2 * t1)
+    return NoiseModel(depolarizing=depolarizing,
+                      dephasing=(1 - np.exp(-duration * dephasing_rate)) / 2,
+                      t1_decay=1 - np.exp(-duration / t1),
+                      readout_p01=readout_p01, readout_p10=readout_p10)
+
+
+def _rates(noise, num_qubits):
+    """Per-qubit arrays of every NoiseModel field"""
+    noise = noise or NoiseModel()
+    rates = {}
+    for field, value in noise._asdict().items():
+        value = np.broadcast_to(np.asarray(value, dtype=float), (num_qubits,))
+        if np.any((value < 0) | (value > 1)):
+            raise ValueError(f"{field} must be a probability in [0, 1]")
+        rates[field] = value
+    return rates
+
+
+def _z_flip_rates(rates):
+    """Per-qubit probability of reading the wrong value on the 0 and 1 branch"""
+    flip = 2 * rates['depolarizing'] / 3
+    keep = 1 - rates['t1_decay']
+    p01, p10 = rates['readout_p01'], rates['readout_p10']
+    one_from_zero = flip * keep                 # bit is 1 after noise on the 0 branch
+    one_from_one = (1 - flip) * keep            # bit is 1 after noise on the 1 branch
+    wrong_zero = one_from_zero * (1 - p10) + (1 - one_from_zero) * p01
+    wrong_one = one_from_one * p10 + (1 - one_from_one) * (1 - p01)
+    return wrong_zero, wrong_one
+
+
+def _coherence(rates):
+    """Per-qubit factor on the GHZ coherence"""
+    return ((1 - 4 * rates['depolarizing'] / 3) * (1 - 2 * rates['dephasing'])
+            * np.sqrt(1 - rates['t1_decay']))
+
+
+def expectations(num_qubits, noise=None):
+    """Exact GHZ statistics under a noise model (ideal when noise is None)
+
+    The Mermin value sums offset + sign * scale * C over the 2^(n-1) terms;
+    their signs add up to 2^(n/2) cos(n pi / 4).
+    """
+    rates = _rates(noise, num_qubits)
+    wrong_zero, wrong_one = _z_flip_rates(rates)
+    p_zeros = 0.5 * np.prod(1 - wrong_zero) + 0.5 * np.prod(wrong_one)
+    p_ones = 0.5 * np.prod(wrong_zero) + 0.5 * np.prod(1 - wrong_one)
+    coherence = float(np.prod(_coherence(rates)))
+    offset = float(np.prod(rates['readout_p10'] - rates['readout_p01']))
+    scale = float(np.prod(1 - rates['readout_p01'] - rates['readout_p10']))
+    quantum_bound = 2.0 ** (num_qubits - 1)
+    sign_sum = 2.0 ** (num_qubits / 2) * math.cos(num_qubits * math.pi / 4)
+    return GhzExpectations(
+        num_qubits=num_qubits,
+        p_zeros=float(p_zeros),
+        p_ones=float(p_ones),
+        fidelity=float(p_zeros + p_ones),
+        coherence=coherence,
+        readout_offset=offset,
+        readout_scale=scale,
+        mermin_value=offset * round(sign_sum) + quantum_bound * scale * coherence,
+        quantum_bound=quantum_bound,
+    )
+
+
+def _bernoulli_cells(rng, shots, probabilities):
+    """(shot, qubit) indices of cells selected independently with the qubit's probability
+
+    Hits per cell are Poisson(-ln(1 - p)), so a cell is hit at least once
+    with probability exactly p; hit cells are returned once each.
+    """
+    num_qubits = len(probabilities)
+    rates = -np.log1p(-np.minimum(probabilities, 1 - 1e-12))
+    hits = rng.poisson(shots * rates)
+    qubits = np.repeat(np.arange(num_qubits, dtype=np.int64), hits)
+    cells = np.sort(rng.integers(0, shots, len(qubits), dtype=np.int64) * num_qubits + qubits)
+    cells = cells[np.diff(cells, prepend=-1) != 0]
+    return cells // num_qubits, cells % num_qubits
+
+
+def _flip(outcomes, shot_index, qubit_index):
+    """XOR single bits into packed outcome rows"""
+    width = outcomes.dtype.itemsize * 8
+    bits = np.left_shift(1, qubit_index % width).astype(outcomes.dtype)
+    np.bitwise_xor.at(outcomes, (shot_index, qubit_index // width), bits)
+
+
+def _all_ones(num_qubits, dtype):
+    """Packed row with every qubit set"""
+    return packed_counts.pack_bits(np.ones((1, num_qubits), dtype=bool), dtype)[0]
+
+
+def _random_rows(rng, shots, num_qubits, dtype, words):
+    """Uniformly random packed outcomes"""
+    rows = rng.integers(0, np.iinfo(dtype).max, (shots, words), dtype=dtype, endpoint=True)
+    return rows & _all_ones(num_qubits, dtype)
+
+
+def _batches(shots):
+    """Shot counts of successive batches"""
+    for start in range(0, shots, BATCH_SHOTS):
+        yield min(BATCH_SHOTS, shots - start)
+
+
+def sample_z(num_qubits, shots, noise=None, seed=None):
+    """Z-basis counts of a noisy n-qubit GHZ state as PackedCounts"""
+    rng = np.random.default_rng(seed)
+    rates = _rates(noise, num_qubits)
+    wrong = _z_flip_rates(rates)
+    dtype, _, words = packed_counts.word_layout(num_qubits)
+    ones = _all_ones(num_qubits, dtype)
+    parts = []
+    for batch in _batches(shots):
+        branch_ones = rng.binomial(batch, 0.5)
+        outcomes = np.zeros((batch, words), dtype=dtype)
+        outcomes[batch - branch_ones:] = ones
+        for branch, (first, count) in enumerate(((0, batch - branch_ones),
+                                                 (batch - branch_ones, branch_ones))):
+            if count:
+                shot_index, qubit_index = _bernoulli_cells(rng, count, wrong[branch])
+                _flip(outcomes, first + shot_index, qubit_index)
+        parts.append(outcomes)
+    return packed_counts._aggregate(num_qubits, np.concatenate(parts), np.ones(shots, dtype=np.int64))
+
+
+def _readout(rng, outcomes, rates):
+    """Apply asymmetric readout error to packed outcomes in place
+
+    Candidate cells are drawn at max(p01, p10) and kept with probability
+    p01 / max or p10 / max according to the bit's current value.
+    """
+    p01, p10 = rates['readout_p01'], rates['readout_p10']
+    top = np.maximum(p01, p10)
+    if not np.any(top):
+        return
+    shot_index, qubit_index = _bernoulli_cells(rng, len(outcomes), top)
+    width = outcomes.dtype.itemsize * 8
+    words = outcomes[shot_index, qubit_index // width]
+    is_one = ((words >> (qubit_index % width).astype(outcomes.dtype)) & 1).astype(bool)
+    keep_rate = np.where(is_one, p10[qubit_index], p01[qubit_index]) / top[qubit_index]
+    keep = rng.random(len(keep_rate)) < keep_rate
+    _flip(outcomes, shot_index[keep], qubit_index[keep])
+
+
+def sample_basis(basis, shots, noise=None, seed=None):
+    """Counts of a noisy GHZ state measured in an X/Y basis string
+
+    Letter i of basis measures qubit i, as in mermin.py.
+    """
+    basis = basis.upper()
+    if set(basis) - set('XY'):
+        raise ValueError("Bases may only contain X and Y")
+    num_qubits = len(basis)
+    num_y = basis.count('Y')
+    sign = 0 if num_y % 2 else 1 - 2 * ((num_y // 2) % 2)
+    rng = np.random.default_rng(seed)
+    rates = _rates(noise, num_qubits)
+    parity_expectation = sign * float(np.prod(_coherence(rates)))
+    dtype, _, words = packed_counts.word_layout(num_qubits)
+    parts = []
+    for batch in _batches(shots):
+        outcomes = _random_rows(rng, batch, num_qubits, dtype, words)
+        odd = (packed_counts.popcount(outcomes).sum(axis=1) & 1).astype(bool)
+        want_odd = rng.random(batch) < (1 - parity_expectation) / 2
+        # Flipping qubit 0 moves a uniform row to the wanted parity and
+        # keeps it uniform within that parity
+        outcomes[odd != want_odd, 0] ^= dtype.type(1)
+        _readout(rng, outcomes, rates)
+        parts.append(outcomes)
+    return packed_counts._aggregate(num_qubits, np.concatenate(parts), np.ones(shots, dtype=np.int64))
+
+
+def mermin_counts(num_qubits, shots, noise=None, seed=None):
+    """{basis: {bitstring: count}} for every Mermin term, as mermin.mermin_value reads"""
+    rng = np.random.default_rng(seed)
+    y_masks, _ = mermin_terms(num_qubits)
+    return {basis: packed_counts.to_counts(sample_basis(basis, shots, noise, rng))
+            for basis in term_labels(y_masks, num_qubits)}
+
+
+def write_mermin_counts(path, num_qubits, shots, noise=None, seed=None):
+    """Write Mermin-term counts in the layout of data/mermin_ghz3_ibm_fez.json
+
+    The noise model's readout rates are stored as the "calibration" entry,
+    so the Mermin figures mitigate the counts with readout_mitigation.
+    Returns the counts.
+    """
+    counts = mermin_counts(num_qubits, shots, noise, seed)
+    rates = _rates(noise, num_qubits)
+    with open(path, 'w') as f:
+        json.dump({'metadata': {'description': f'Synthetic {num_qubits}-qubit GHZ Mermin counts, '
+                                               f'{shots} shots per term',
+                                'noise': {field: value.tolist() for field, value in rates.items()},
+                                'expected_mermin_value': expectations(num_qubits, noise).mermin_value},
+                   'raw': counts,
+                   'calibration': {'p01': rates['readout_p01'].tolist(),
+                                   'p10': rates['readout_p10'].tolist()}},
+                  f, indent=2)
+    return counts
+
+
+def main(argv=None):
+    """Write synthetic GHZ counts for benchmarks and figure tests"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('num_qubits', type=int)
+    parser.add_argument('--shots', type=int, default=100_000)
+    parser.add_argument('--mermin', action='store_true',
+                        help='sample every Mermin term instead of the Z basis (JSON output)')
+    parser.add_argument('--ideal', action='store_true', help='no noise (default: TYPICAL_NOISE)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True,
+                        help='.npz for Z-basis counts, .json for Qiskit-style counts')
+    args = parser.parse_args(argv)
+
+    noise = None if args.ideal else TYPICAL_NOISE
+    exact = expectations(args.num_qubits, noise)
+    start = time.perf_counter()
+    if args.mermin:
+        counts = write_mermin_counts(args.output, args.num_qubits, args.shots, noise, args.seed)
+        print(f"✅ Wrote {args.output}: {len(counts)} Mermin terms x {args.shots:,} shots "
+              f"in {time.perf_counter() - start:.2f}s, expected M = {exact.mermin_value:.4f}")
+        return 0
+
+    counts = sample_z(args.num_qubits, args.shots, noise, args.seed)
+    if args.output.endswith('.npz'):
+        packed_counts.save_counts(args.output, counts)
+    else:
+        with open(args.output, 'w') as f:
+            json.dump({'num_qubits': args.num_qubits, 'counts': packed_counts.to_counts(counts)}, f)
+    zeros, ones = packed_counts.ghz_populations(counts)
+    print(f"✅ Wrote {args.output}: {args.shots:,} shots, {len(counts.counts):,} distinct outcomes "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(f"   GHZ fidelity {zeros + ones:.4f} (exact {exact.fidelity:.4f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Heavy-Hex Topology
+Coupling maps for IBM Heron-class heavy-hex processors as NumPy arrays
+
+A Heron lattice is `rows` lines of `cols` qubits, coupled left to right,
+with a row of bridge qubits between each pair of lines. Bridges sit every
+fourth column, starting at column 3 below even lines and column 1 below odd
+lines. Qubits are numbered line by line with each bridge row following its
+line, matching IBM's numbering:
+
+    Heron r2 (ibm_fez, ibm_marrakesh): 8 lines x 16 = 128 + 7 x 4 bridges = 156
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Heron r2 lattice shape (156 qubits)
+HERON_R2_SHAPE = (8, 16)
+
+# positions - (N, 2) float array of (column, -row) layout coordinates, with
+#             bridge qubits half way between the lines they join
+# edges     - (E, 2) int32 array of coupled qubit pairs, lower index first
+# is_bridge - (N,) bool array marking bridge qubits
+HeavyHexLattice = namedtuple('HeavyHexLattice', 'rows cols positions edges is_bridge')
+
+
+def _bridge_columns(gap, cols):
+    """Columns holding bridge qubits between line `gap` and line `gap + 1`"""
+    return np.arange(3 if gap % 2 == 0 else 1, cols, 4)
+
+
+@lru_cache(maxsize=None)
+def heavy_hex_lattice(rows, cols):
+    """Build (and cache) the heavy-hex lattice with `rows` lines of `cols` qubits"""
+    if rows < 1 or cols < 2:
+        raise ValueError(f"heavy-hex lattice needs rows >= 1 and cols >= 2, got {rows}x{cols}")
+
+    positions, edges, is_bridge = [], [], []
+    line_start = 0
+    for row in range(rows):
+        columns = np.arange(cols)
+        line = line_start + columns
+        positions.append(np.column_stack([columns, np.full(cols, -2.0 * row)]))
+        is_bridge.append(np.zeros(cols, dtype=bool))
+        edges.append(np.column_stack([line[:-1], line[1:]]))
+        next_index = line_start + cols
+
+        if row < rows - 1:
+            bridge_cols = _bridge_columns(row, cols)
+            bridges = next_index + np.arange(len(bridge_cols))
+            next_line_start = next_index + len(bridge_cols)
+            positions.append(np.column_stack([bridge_cols, np.full(len(bridge_cols), -2.0 * row - 1)]))
+            is_bridge.append(np.ones(len(bridge_cols), dtype=bool))
+            edges.append(np.column_stack([line_start + bridge_cols, bridges]))
+            edges.append(np.column_stack([bridges, next_line_start + bridge_cols]))
+            next_index = next_line_start
+
+        line_start = next_index
+
+    lattice = HeavyHexLattice(rows, cols,
+                              np.concatenate(positions).astype(float),
+                              np.concatenate(edges).astype(np.int32),
+                              np.concatenate(is_bridge))
+    # Cached arrays are shared between callers, so keep them read-only
+    for array in lattice[2:]:
+        array.flags.writeable = False
+    return lattice
+
+
+def heron_r2():
+    """The 156-qubit Heron r2 lattice (ibm_fez, ibm_marrakesh)"""
+    return heavy_hex_lattice(*HERON_R2_SHAPE)
+
+
+def num_qubits(lattice):
+    """Number of qubits in a lattice"""
+    return len(lattice.positions)
+
+
+def lattice_for_qubits(min_qubits, aspect=2.0):
+    """Smallest Heron-style lattice with at least min_qubits qubits
+
+    Lines are kept to a multiple of 4 qubits and about `aspect` times as long
+    as the lattice is tall, like the Heron chips.
+    """
+    rows = 1
+    while True:
+        cols = max(4, 4 * int(np.ceil(aspect * rows / 4)))
+        count = rows * cols + (rows - 1) * (cols // 4)
+        if count >= min_qubits:
+            return heavy_hex_lattice(rows, cols)
+        rows += 1
+
+
+def coupling_map(lattice):
+    """Bidirectional coupling list in the form Qiskit's CouplingMap accepts"""
+    pairs = np.concatenate([lattice.edges, lattice.edges[:, ::-1]])
+    return pairs.tolist()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Hurwitz Keys
+Vectorized enumeration of Hurwitz quaternions of a given norm
+
+A Hurwitz quaternion a + bi + cj + dk has a, b, c, d all integers or all
+half-integers. Every array here holds doubled coordinates
+(A, B, C, D) = 2 (a, b, c, d), so elements are plain integer rows whose
+entries share one parity, and norm p means A^2 + B^2 + C^2 + D^2 = 4p.
+There are 24 (p + 1) of them for an odd prime p (144 for p = 5, 336 for
+p = 13) and 24 for p = 2.
+
+Enumeration joins pairs: every (A, B) with A^2 + B^2 = s is matched with
+every (C, D) with C^2 + D^2 = 4p - s. Only same-parity pairs take part,
+and the join is a sort and searchsorted over about 3 pi p pairs, so it
+costs O(p) rather than the O(p^1.5) triple loop of the JS port.
+
+hurwitz_keys returns the elements in the order of unzipSeed in
+js/hurwitz-keys.js and layers-336-three.js, so key indices agree between
+Python, the front end and the binary tables. The JS order lists each
+element where it first appears in (solution x unit) products. Here the
+first position is found for every element at once, from its 24 possible
+sources e * conj(u).
+
+Key tables (.hwzk) store that list for the front end:
+
+    offset 0   4 bytes   magic b'HWZK'
+    offset 4   uint8     version
+    offset 5   uint8     bytes per coordinate (1, 2 or 4)
+    offset 6   uint16    reserved (0)
+    offset 8   uint32    norm p
+    offset 12  uint32    number of keys
+    offset 16  keys x 4  doubled coordinates, signed little endian
+
+Usage:
+    python3 hurwitz.py [p ...]     # default: the seed primes 2 5 13 17
+"""
+
+import argparse
+import functools
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+MAGIC = b'HWZK'
+VERSION = 1
+
+# Primes of the seed validations and the games (24, 144, 336, 432 keys)
+SEED_PRIMES = (2, 5, 13, 17)
+
+# Exported tables, one per prime
+TABLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'hurwitz')
+
+# Elements handled per chunk when ordering, which bounds the (chunk, 24, 4)
+# product arrays
+ORDER_CHUNK = 1 << 16
+
+
+def _js_units():
+    """The 24 units in the order of generate24Units, doubled"""
+    integer = [[2, 0, 0, 0], [-2, 0, 0, 0], [0, 2, 0, 0], [0, -2, 0, 0],
+               [0, 0, 2, 0], [0, 0, -2, 0], [0, 0, 0, 2], [0, 0, 0, -2]]
+    signs = [-1, 1]
+    half = [[sa, sb, sc, sd] for sa in signs for sb in signs for sc in signs for sd in signs]
+    return np.array(integer + half, dtype=np.int64)
+
+
+UNITS = _js_units()
+
+
+def multiply(q, u):
+    """Hamilton product of doubled quaternions, broadcasting over leading axes
+
+    With Q = 2q and U = 2u, the doubled product 2qu is QU / 2, which is
+    exact for Hurwitz quaternions.
+    """
+    q, u = np.asarray(q), np.asarray(u)
+    a1, b1, c1, d1 = (q[..., i] for i in range(4))
+    a2, b2, c2, d2 = (u[..., i] for i in range(4))
+    return np.stack([
+        a1 * a2 - b1 * b2 - c1 * c2 - d1 * d2,
+        a1 * b2 + b1 * a2 + c1 * d2 - d1 * c2,
+        a1 * c2 - b1 * d2 + c1 * a2 + d1 * b2,
+        a1 * d2 + b1 * c2 - c1 * b2 + d1 * a2,
+    ], axis=-1) // 2
+
+
+def conjugate(q):
+    """Quaternion conjugate (also the inverse of a unit)"""
+    return np.asarray(q) * np.array([1, -1, -1, -1])
+
+
+def norms(q):
+    """Norm of doubled quaternions: (A^2 + B^2 + C^2 + D^2) / 4"""
+    q = np.asarray(q, dtype=np.int64)
+    return (q * q).sum(axis=-1) // 4
+
+
+def _square_pairs(limit):
+    """Same-parity (X, Y) with X^2 + Y^2 <= limit, sorted by X^2 + Y^2"""
+    radius = int(np.sqrt(limit))
+    values = np.arange(-radius, radius + 1, dtype=np.int64)
+    x, y = np.meshgrid(values, values, indexing='ij')
+    x, y = x.ravel(), y.ravel()
+    sums = x * x + y * y
+    keep = (sums <= limit) & ((x - y) % 2 == 0)
+    x, y, sums = x[keep], y[keep], sums[keep]
+    order = np.argsort(sums, kind='stable')
+    return x[order], y[order], sums[order]
+
+
+def _pack(q, radius):
+    """One int64 per doubled quaternion whose order is lexicographic order"""
+    q = np.asarray(q, dtype=np.int64) + radius
+    base = 2 * radius + 1
+    return ((q[..., 0] * base + q[..., 1]) * base + q[..., 2]) * base + q[..., 3]
+
+
+def norm_elements(p):
+    """All Hurwitz quaternions of norm p, doubled, in lexicographic order"""
+    if p < 1:
+        raise ValueError(f"Norm must be a positive integer, got {p}")
+    target = 4 * p
+    x, y, sums = _square_pairs(target)
+    lo = np.searchsorted(sums, target - sums, side='left')
+    hi = np.searchsorted(sums, target - sums, side='right')
+    matches = hi - lo
+    first = np.repeat(np.arange(len(sums)), matches)
+    # Index of each match within its [lo, hi) range of second pairs
+    offsets = np.arange(matches.sum()) - np.repeat(np.cumsum(matches) - matches, matches)
+    second = np.repeat(lo, matches) + offsets
+    elements = np.stack([x[first], y[first], x[second], y[second]], axis=1)
+    radius = int(np.sqrt(target))
+    return elements[np.argsort(_pack(elements, radius))]
+
+
+def _norm_two_js_order():
+    """The 24 norm-2 keys in the order of generateHurwitzPrimesNorm2, doubled"""
+    import itertools
+
+    forms = [[2, 2, 0, 0], [2, 0, 2, 0], [2, 0, 0, 2], [0, 2, 2, 0], [0, 2, 0, 2], [0, 0, 2, 2]]
+    signs = [-1, 1]
+    candidates = np.array([[sa * form[perm[0]], sb * form[perm[1]], sc * form[perm[2]], sd * form[perm[3]]]
+                           for form in forms for perm in itertools.permutations(range(4))
+                           for sa in signs for sb in signs for sc in signs for sd in signs])
+    _, first = np.unique(_pack(candidates, 2), return_index=True)
+    return candidates[np.sort(first)]
+
+
+def _js_order(elements, p):
+    """Sort elements into the first-appearance order of the JS unzipSeed
+
+    The JS lists 'solutions' (integer points by (a, b, c) with -d before
+    +d, then every point by (a, b, c) with +d before -d) and appends s * u
+    for each solution s and unit u in turn, skipping repeats. Element e
+    first appears at the smallest (position of s, unit index k) with
+    s = e * conj(u_k).
+    """
+    radius = int(np.sqrt(4 * p))
+    integer = elements[np.all(elements % 2 == 0, axis=1)]
+    # Block 1 order is (A, B, C, D ascending); block 2 is D descending
+    block1 = _pack(integer, radius)
+    flipped = elements * np.array([1, 1, 1, -1])
+    block2_order = np.argsort(_pack(flipped, radius))
+    block2 = _pack(elements[block2_order], radius)
+
+    keys = np.concatenate([block1, block2])
+    positions = np.arange(len(keys))
+    order = np.argsort(keys, kind='stable')
+    keys, positions = keys[order], positions[order]
+    # First position of each key (integer points appear in both blocks)
+    first = np.diff(keys, prepend=keys[0] - 1) != 0
+    keys, positions = keys[first], positions[first]
+
+    inverse_units = conjugate(UNITS)
+    rank = np.empty(len(elements), dtype=np.int64)
+    for start in range(0, len(elements), ORDER_CHUNK):
+        chunk = elements[start:start + ORDER_CHUNK]
+        sources = multiply(chunk[:, None, :], inverse_units[None, :, :])
+        packed = _pack(sources, radius).ravel()
+        # searchsorted is several times faster on sorted queries
+        query_order = np.argsort(packed)
+        found = np.empty_like(query_order)
+        found[query_order] = np.searchsorted(keys, packed[query_order])
+        source_positions = positions[found].reshape(sources.shape[:2])
+        rank[start:start + len(chunk)] = (source_positions * len(UNITS)
+                                          + np.arange(len(UNITS))).min(axis=1)
+    return elements[np.argsort(rank)]
+
+
+@functools.lru_cache(maxsize=None)
+def hurwitz_keys(p):
+    """Doubled Hurwitz quaternions of norm p in JS unzipSeed order (cached, read-only)"""
+    keys = _norm_two_js_order() if p == 2 else _js_order(norm_elements(p), p)
+    keys = keys.astype(np.int64)
+    keys.setflags(write=False)
+    return keys
+
+
+def associate_classes(keys):
+    """Right-associate classes q ~ q u of an array of doubled quaternions
+
+    Multiplies every key by the 24 units at once and takes the
+    lexicographically largest associate as the class representative.
+    Returns (representatives, class index of each key); an odd prime p
+    has p + 1 classes and p = 2 has one.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    associates = multiply(keys[:, None, :], UNITS[None, :, :])
+    radius = int(np.abs(keys).max(initial=0))
+    packed = _pack(associates, radius)
+    best = packed.argmax(axis=1)
+    canonical = associates[np.arange(len(keys)), best]
+    _, first, classes = np.unique(packed[np.arange(len(keys)), best],
+                                  return_index=True, return_inverse=True)
+    return canonical[first], classes.ravel()
+
+
+def write_key_table(path, p, keys=None):
+    """Write the .hwzk key table of norm p; returns its size in bytes"""
+    keys = hurwitz_keys(p) if keys is None else np.asarray(keys)
+    largest = int(np.abs(keys).max(initial=0))
+    itemsize = next(size for size in (1, 2, 4) if largest < 2 ** (8 * size - 1))
+    header = MAGIC + struct.pack('<BBHII', VERSION, itemsize, 0, p, len(keys))
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(keys.astype(f'<i{itemsize}').tobytes())
+    return len(header) + keys.size * itemsize
+
+
+def read_key_table(path):
+    """(p, doubled keys) from a .hwzk key table"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a Hurwitz key table")
+    version, itemsize, _, p, count = struct.unpack_from('<BBHII', data, 4)
+    if version != VERSION:
+        raise ValueError(f"Unsupported key table version {version}")
+    keys = np.frombuffer(data, dtype=f'<i{itemsize}', count=count * 4, offset=16)
+    return p, keys.reshape(count, 4).astype(np.int64)
+
+
+def main(argv=None):
+    """Write key tables for the seed primes"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('primes', nargs='*', type=int, default=list(SEED_PRIMES))
+    parser.add_argument('--output-dir', default=TABLE_DIR)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for p in args.primes:
+        start = time.perf_counter()
+        keys = hurwitz_keys(p)
+        representatives, _ = associate_classes(keys)
+        path = os.path.join(args.output_dir, f'p{p}.hwzk')
+        size = write_key_table(path, p, keys)
+        print(f"✅ p={p}: {len(keys):,} keys, {len(representatives):,} associate classes, "
+              f"{size:,} bytes -> {path} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Job Fetcher
+Concurrent download of IBM Quantum job results into a local counts cache
+
+Every record in hardware_validations.json names the job it was measured
+in (jobId), but the counts behind its fidelity were copied in by hand.
+This fetches the result payload of each job, at most --concurrency at a
+time, retrying rate limits, server errors and dropped connections with
+exponential backoff. Each job's counts are stored once, content-addressed:
+
+    data/jobs/index.json                 jobId -> digest, qubits, shots
+    data/jobs/objects/<dd>/<digest>.npz  packed counts (packed_counts.save_counts)
+
+The digest is the SHA-256 of the packed outcomes and counts, so identical
+results share one object. Jobs already in the index are not fetched again
+unless --refresh is given. The figure generators read counts from the
+cache through cached_counts().
+
+Results are requested from --url-template with {job_id} substituted. The
+default is the IBM Quantum runtime API, authenticated with the
+QISKIT_IBM_TOKEN environment variable. Any server that returns the same
+JSON works, so a directory of canned <jobId>.json files served by
+`python3 -m http.server` can stand in for it offline.
+
+Usage:
+    python3 job_fetcher.py [--records qkd-1,ghz-12] [--concurrency 8] [--refresh]
+    python3 job_fetcher.py --url-template 'http://127.0.0.1:8000/{job_id}.json'
+"""
+
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import random
+import sys
+import urllib.error
+import urllib.request
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import packed_counts
+import validation_index
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(REPO_DIR, 'data', 'jobs')
+INDEX_PATH = os.path.join(CACHE_DIR, 'index.json')
+INDEX_VERSION = 1
+
+# Result endpoint of the IBM Quantum runtime API
+DEFAULT_URL_TEMPLATE = 'https://api.quantum.ibm.com/runtime/jobs/{job_id}/results'
+
+# Requests in flight at once
+CONCURRENCY = 8
+
+# Attempts after the first, and the delay before the first retry (doubled
+# each time, with +-50% jitter)
+RETRIES = 4
+BACKOFF_SECONDS = 0.5
+
+# Seconds to wait for one response
+TIMEOUT_SECONDS = 30
+
+# HTTP statuses worth retrying; any other error status fails the job
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+# Failures of the connection itself, always retried
+TRANSIENT_ERRORS = (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError)
+
+# Malformed payloads (bad JSON, unexpected nesting or bitstrings); they
+# fail their own job instead of aborting the whole batch
+PAYLOAD_ERRORS = (ValueError, TypeError, AttributeError, KeyError, IndexError)
+
+# job_id - IBM Quantum job id
+# status - 'cached', 'fetched' or 'failed'
+# digest - content digest of the stored counts (None if failed)
+# error  - failure message (None otherwise)
+FetchResult = namedtuple('FetchResult', 'job_id status digest error')
+
+
+def load_index(path=INDEX_PATH):
+    """{jobId: entry} of the cache index ({} if there is none yet)"""
+    try:
+        with open(path) as f:
+            return json.load(f)['jobs']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def write_index(jobs, path=INDEX_PATH):
+    """Write the cache index, replacing the old one in one step"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    text = json.dumps({'version': INDEX_VERSION, 'jobs': jobs}, indent=2, sort_keys=True) + '\n'
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+def object_path(digest, cache_dir=CACHE_DIR):
+    """Path of the counts object with this digest"""
+    return os.path.join(cache_dir, 'objects', digest[:2], digest + '.npz')
+
+
+def counts_digest(packed):
+    """SHA-256 of a PackedCounts' qubit count, outcomes and counts"""
+    digest = hashlib.sha256(str(packed.num_qubits).encode('ascii'))
+    digest.update(packed.outcomes.dtype.str.encode('ascii'))
+    digest.update(packed.outcomes.tobytes())
+    digest.update(packed.counts.astype('<i8').tobytes())
+    return digest.hexdigest()
+
+
+def store_counts(packed, cache_dir=CACHE_DIR):
+    """Write a PackedCounts object into the cache (once per content) and return its digest"""
+    digest = counts_digest(packed)
+    path = object_path(digest, cache_dir)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = path[:-len('.npz')] + '.tmp.npz'
+        packed_counts.save_counts(temporary, packed)
+        os.replace(temporary, path)
+    return digest
+
+
+def cached_counts_path(job_id, index_path=INDEX_PATH):
+    """Path of a job's cached counts, or None when it has not been fetched"""
+    entry = load_index(index_path).get(job_id)
+    if entry is None:
+        return None
+    path = object_path(entry['digest'], os.path.dirname(index_path))
+    return path if os.path.exists(path) else None
+
+
+def cached_counts(job_id, index_path=INDEX_PATH):
+    """PackedCounts of a fetched job, or None"""
+    path = cached_counts_path(job_id, index_path)
+    return packed_counts.load_counts(path) if path else None
+
+
+def counts_from_payload(payload, num_qubits=None):
+    """PackedCounts of the first circuit in a job result payload
+
+    Accepts a bare {"counts": {...}}, backend.run results
+    ({"results": [{"data": {"counts": {hex: count}}, "header": {...}}]}) and
+    Sampler results whose classical register holds per-shot hex
+    "samples" (with "num_bits").
+    """
+    if not isinstance(payload, dict):
+        raise ValueError(f"Job payload is a JSON {type(payload).__name__}, not an object")
+    if isinstance(payload.get('counts'), dict):
+        return packed_counts.from_counts(payload['counts'], payload.get('num_qubits', num_qubits))
+    results = payload.get('results')
+    if not results:
+        raise ValueError("No counts or results in the job payload")
+    result = results[0]
+    data = result.get('data', {})
+    if isinstance(data.get('counts'), dict):
+        header = result.get('header', {})
+        return packed_counts.from_counts(data['counts'], header.get('memory_slots', num_qubits))
+    for register in data.values():
+        if isinstance(register, dict) and 'samples' in register:
+            return packed_counts.from_counts(Counter(register['samples']),
+                                             register.get('num_bits', num_qubits))
+    raise ValueError("No counts found in the first result of the job payload")
+
+
+def _request_headers():
+    """Headers of every result request (a bearer token when one is set)"""
+    headers = {'Accept': 'application/json'}
+    token = os.environ.get('QISKIT_IBM_TOKEN')
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    instance = os.environ.get('QISKIT_IBM_INSTANCE')
+    if instance:
+        headers['Service-CRN'] = instance
+    return headers
+
+
+def _download(url, timeout):
+    """GET url and decode its JSON body (runs in a worker thread)"""
+    request = urllib.request.Request(url, headers=_request_headers())
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def _retry_delay(attempt, error):
+    """Seconds to wait before retry number attempt (0-based)"""
+    retry_after = getattr(error, 'headers', None) and error.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5)
+
+
+async def _fetch_payload(url, semaphore, executor, retries, timeout):
+    """JSON payload at url, retrying transient failures"""
+    loop = asyncio.get_running_loop()
+    for attempt in range(retries + 1):
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(executor, _download, url, timeout)
+            except urllib.error.HTTPError as e:
+                if e.code not in RETRY_STATUSES or attempt == retries:
+                    raise
+                error = e
+            except TRANSIENT_ERRORS as e:
+                if attempt == retries:
+                    raise
+                error = e
+        # Back off outside the semaphore so other jobs keep its slot busy
+        await asyncio.sleep(_retry_delay(attempt, error))
+
+
+async def _fetch_job(job_id, num_qubits, url_template, semaphore, executor, retries, timeout,
+                     cache_dir):
+    """Fetch and store one job; returns (FetchResult, index entry or None)"""
+    try:
+        payload = await _fetch_payload(url_template.format(job_id=job_id), semaphore, executor,
+                                       retries, timeout)
+        packed = counts_from_payload(payload, num_qubits)
+        digest = await asyncio.get_running_loop().run_in_executor(executor, store_counts,
+                                                                  packed, cache_dir)
+    except TRANSIENT_ERRORS + PAYLOAD_ERRORS as e:
+        return FetchResult(job_id, 'failed', None, str(e) or type(e).__name__), None
+    entry = {
+        'digest': digest,
+        'qubits': packed.num_qubits,
+        'shots': packed_counts.total_shots(packed),
+        'fetched': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }
+    return FetchResult(job_id, 'fetched', digest, None), entry
+
+
+async def fetch_jobs(jobs, url_template=DEFAULT_URL_TEMPLATE, index_path=INDEX_PATH,
+                     concurrency=CONCURRENCY, retries=RETRIES, timeout=TIMEOUT_SECONDS,
+                     refresh=False):
+    """Fetch the results of {jobId: num_qubits} into the cache
+
+    Jobs already cached are skipped unless refresh is set. The index is
+    written once, after every fetch has finished. Returns FetchResults in
+    the order of jobs.
+    """
+    cache_dir = os.path.dirname(index_path)
+    index = load_index(index_path)
+    results = {}
+    pending = []
+    for job_id, num_qubits in jobs.items():
+        if not refresh and cached_counts_path(job_id, index_path):
+            results[job_id] = FetchResult(job_id, 'cached', index[job_id]['digest'], None)
+        else:
+            pending.append((job_id, num_qubits))
+
+    if pending:
+        semaphore = asyncio.Semaphore(concurrency)
+        # Blocking urllib calls run here, one thread per request slot (the
+        # loop's default executor may have fewer)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            fetched = await asyncio.gather(*(
+                _fetch_job(job_id, num_qubits, url_template, semaphore, executor, retries,
+                           timeout, cache_dir)
+                for job_id, num_qubits in pending))
+        changed = False
+        for result, entry in fetched:
+            results[result.job_id] = result
+            if entry is not None:
+                index[result.job_id] = entry
+                changed = True
+        if changed:
+            write_index(index, index_path)
+    return [results[job_id] for job_id in jobs]
+
+
+def validation_jobs(records):
+    """{jobId: qubits} of validation records (the widest record wins for shared jobs)"""
+    jobs = {}
+    for record in records:
+        jobs[record['jobId']] = max(jobs.get(record['jobId'], 0), record['qubits'])
+    return jobs
+
+
+def main(argv=None):
+    """Fetch the job results of the hardware validation records"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', help='comma-separated record ids (default: all)')
+    parser.add_argument('--url-template', default=DEFAULT_URL_TEMPLATE,
+                        help='result URL with {job_id} (default: IBM Quantum runtime API)')
+    parser.add_argument('--index', default=INDEX_PATH, help='cache index path')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--retries', type=int, default=RETRIES)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_SECONDS)
+    parser.add_argument('--refresh', action='store_true', help='fetch jobs that are already cached')
+    args = parser.parse_args(argv)
+
+    validations = validation_index.load_validations()
+    records = validations.records
+    if args.records:
+        wanted = set(args.records.split(','))
+        records = [record for record in records if record['id'] in wanted]
+        missing = wanted - {record['id'] for record in records}
+        if missing:
+            print(f"❌ Unknown record ids: {', '.join(sorted(missing))}")
+            return 1
+
+    results = asyncio.run(fetch_jobs(validation_jobs(records), args.url_template, args.index,
+                                     args.concurrency, args.retries, args.timeout, args.refresh))
+    statuses = Counter(result.status for result in results)
+    for result in results:
+        if result.status == 'failed':
+            print(f"❌ {result.job_id}: {result.error}")
+    status = "✅" if not statuses['failed'] else "⚠️ "
+    print(f"{status} {len(results)} jobs: {statuses['fetched']} fetched, "
+          f"{statuses['cached']} cached, {statuses['failed']} failed")
+    print(f"   Cache: {os.path.dirname(os.path.abspath(args.index))}")
+    return 1 if statuses['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
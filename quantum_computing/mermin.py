@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Mermin Expectation Engine
+Vectorized Mermin polynomial, expectation values and bootstrap error bars
+
+The n-qubit Mermin polynomial is the real part of prod_k (X_k + i Y_k). Its
+2^(n-1) terms are the X/Y strings with an even number of Ys; a term with 2j
+Ys has sign (-1)^j, so for 3 qubits M = XXX - XYY - YXY - YYX. For a GHZ
+state every term's expectation is its sign, giving |M| = 2^(n-1); local
+hidden-variable models are bounded by |M| <= 2^floor(n/2).
+
+Bases are strings with one letter per qubit, letter i for qubit i (the
+convention of circuit_diagrams.ghz_gates). Counts are Qiskit-style
+{bitstring: count} dicts, qubit 0 rightmost. Every step (parsing
+bitstrings, parities, per-basis sums, bootstrap resampling) runs on NumPy
+arrays covering all bases at once, so thousands of observables on 28-qubit
+runs take milliseconds rather than a Python loop per bitstring.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+import readout_mitigation
+from packed_counts import pack_bitstrings, popcount
+
+# Default number of bootstrap resamples for error bars
+BOOTSTRAP_SAMPLES = 2000
+
+# num_qubits       - qubits in the GHZ state
+# bases            - measured Mermin terms, e.g. ['XXX', 'XYY', 'YXY', 'YYX']
+# signs            - +1/-1 coefficient of each term in the Mermin polynomial
+# expectations     - <term> for each basis
+# errors           - bootstrap standard error of each expectation
+# value, error     - Mermin parameter M = sum(signs * expectations) and its error
+# classical_bound  - local hidden-variable bound 2^floor(n/2)
+# quantum_bound    - GHZ maximum 2^(n-1)
+MerminResult = namedtuple('MerminResult', 'num_qubits bases signs expectations errors '
+                                          'value error classical_bound quantum_bound')
+
+
+def mermin_terms(num_qubits):
+    """Y-position masks and signs of the 2^(n-1) Mermin polynomial terms
+
+    Bit i of a mask is set when qubit i is measured in Y. Masks are built by
+    enumerating the first n-1 bits and setting the last one to make the
+    number of Ys even.
+    """
+    if not 2 <= num_qubits <= 64:
+        raise ValueError(f"Mermin terms need 2-64 qubits, got {num_qubits}")
+    free = np.arange(2 ** (num_qubits - 1), dtype=np.uint64)
+    last = (popcount(free) & 1).astype(np.uint64) << np.uint64(num_qubits - 1)
+    y_masks = free | last
+    signs = 1 - 2 * ((popcount(y_masks) // 2) & 1)
+    return y_masks, signs
+
+
+def term_labels(y_masks, num_qubits):
+    """Basis strings ('XYY', ...) for an array of Y-position masks"""
+    y_masks = np.asarray(y_masks, dtype=np.uint64)
+    bits = (y_masks[:, None] >> np.arange(num_qubits, dtype=np.uint64)) & np.uint64(1)
+    letters = np.where(bits.astype(bool), 'Y', 'X')
+    return np.ascontiguousarray(letters).view(f'<U{num_qubits}').ravel().tolist()
+
+
+def basis_masks(bases):
+    """Y-position masks and qubit count for basis strings made of X and Y"""
+    num_qubits = len(bases[0])
+    if any(len(basis) != num_qubits for basis in bases):
+        raise ValueError("All bases must have the same number of qubits")
+    if num_qubits > 64:
+        raise ValueError(f"At most 64 qubits are supported, got {num_qubits}")
+    letters = np.frombuffer(''.join(bases).upper().encode('ascii'), dtype=np.uint8)
+    letters = letters.reshape(len(bases), num_qubits)
+    if np.any((letters != ord('X')) & (letters != ord('Y'))):
+        raise ValueError("Mermin bases may only contain X and Y")
+    weights = np.uint64(1) << np.arange(num_qubits, dtype=np.uint64)
+    return ((letters == ord('Y')).astype(np.uint64) * weights).sum(axis=1), num_qubits
+
+
+def parse_counts(counts_by_basis):
+    """Flatten {basis: {bitstring: count}} into outcome and weight arrays
+
+    Returns (outcomes, weights, basis_index): outcomes as uint64 integers
+    (qubit i in bit i), their counts, and the position of each outcome's
+    basis in counts_by_basis. Spaces between classical registers are ignored.
+    """
+    bases = list(counts_by_basis)
+    keys, weights, basis_index = [], [], []
+    for index, basis in enumerate(bases):
+        counts = counts_by_basis[basis]
+        keys.extend(counts)
+        weights.extend(counts.values())
+        basis_index.append(np.full(len(counts), index))
+
+    outcomes = pack_bitstrings(keys, len(bases[0]), np.uint64)[:, 0]
+    return outcomes, np.asarray(weights, dtype=float), np.concatenate(basis_index)
+
+
+def parity_counts(counts_by_basis):
+    """Shots with even and odd measured parity for every basis
+
+    Returns two float arrays in counts_by_basis order. The product of
+    single-qubit eigenvalues is +1 for even parity outcomes and -1 for odd.
+    """
+    outcomes, weights, basis_index = parse_counts(counts_by_basis)
+    odd = (popcount(outcomes) & 1).astype(bool)
+    num_bases = len(counts_by_basis)
+    even_counts = np.bincount(basis_index, weights=np.where(odd, 0.0, weights), minlength=num_bases)
+    odd_counts = np.bincount(basis_index, weights=np.where(odd, weights, 0.0), minlength=num_bases)
+    return even_counts, odd_counts
+
+
+def expectation_values(counts_by_basis, num_bootstrap=BOOTSTRAP_SAMPLES, seed=0, calibration=None):
+    """Expectation value and bootstrap error for every measured basis
+
+    Resampling the shots of a basis only changes its even/odd split, so each
+    bootstrap replicate draws that split from a binomial over the basis's
+    shot count, for all bases and replicates in one call. Returns
+    (expectations, errors, replicates) where replicates has shape
+    (num_bootstrap, num_bases).
+
+    With a readout_mitigation.ReadoutCalibration the expectations are
+    readout-mitigated and errors are analytic standard errors; replicates
+    is then None.
+    """
+    if calibration is not None:
+        outcomes, weights, basis_index = parse_counts(counts_by_basis)
+        expectations, errors = readout_mitigation.basis_parities(
+            outcomes, weights, basis_index, len(counts_by_basis), calibration)
+        return expectations, errors, None
+
+    even_counts, odd_counts = parity_counts(counts_by_basis)
+    shots = even_counts + odd_counts
+    if np.any(shots <= 0):
+        raise ValueError("Every basis needs at least one shot")
+    p_even = np.clip(even_counts / shots, 0.0, 1.0)
+    expectations = 2 * p_even - 1
+
+    rng = np.random.default_rng(seed)
+    whole_shots = np.maximum(np.rint(shots).astype(np.int64), 1)
+    draws = rng.binomial(whole_shots, p_even, size=(num_bootstrap, len(shots)))
+    replicates = 2 * draws / whole_shots - 1
+    return expectations, replicates.std(axis=0, ddof=1), replicates
+
+
+def mermin_value(counts_by_basis, num_bootstrap=BOOTSTRAP_SAMPLES, seed=0, calibration=None):
+    """Mermin parameter of a GHZ run from counts for every polynomial term
+
+    counts_by_basis must hold all 2^(n-1) Mermin terms; extra bases are
+    ignored. Returns a MerminResult with the terms in the order they appear
+    in counts_by_basis. A calibration applies readout mitigation (see
+    expectation_values).
+    """
+    bases = [basis for basis in counts_by_basis if set(basis.upper()) <= set('XY')]
+    if not bases:
+        raise ValueError("No X/Y bases in counts")
+    y_masks, num_qubits = basis_masks(bases)
+    term_masks, term_signs = mermin_terms(num_qubits)
+    order = np.argsort(term_masks)
+    term_masks, term_signs = term_masks[order], term_signs[order]
+
+    is_term = np.isin(y_masks, term_masks)
+    missing = len(term_masks) - len(np.unique(y_masks[is_term]))
+    if missing:
+        raise ValueError(f"{missing} of the {len(term_masks)} {num_qubits}-qubit Mermin terms have no counts")
+    bases = [basis for basis, keep in zip(bases, is_term) if keep]
+    y_masks = y_masks[is_term]
+    signs = term_signs[np.searchsorted(term_masks, y_masks)]
+
+    expectations, errors, replicates = expectation_values(
+        {basis: counts_by_basis[basis] for basis in bases}, num_bootstrap, seed, calibration)
+    if replicates is None:
+        # Terms are measured independently, so their errors add in quadrature
+        error = float(np.sqrt(np.sum(errors ** 2)))
+    else:
+        error = float((replicates @ signs).std(ddof=1))
+    return MerminResult(
+        num_qubits=num_qubits,
+        bases=bases,
+        signs=signs,
+        expectations=expectations,
+        errors=errors,
+        value=float(signs @ expectations),
+        error=error,
+        classical_bound=2 ** (num_qubits // 2),
+        quantum_bound=2 ** (num_qubits - 1),
+    )
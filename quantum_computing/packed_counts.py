@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Packed Counts
+Bit-packed measurement counts and vectorized GHZ analytics
+
+Qiskit returns counts as {bitstring: count} dicts, which cost a Python
+string and dict entry per outcome and need a Python loop for every
+statistic. PackedCounts stores the same data as two NumPy arrays:
+
+    outcomes  (num_outcomes, num_words) unsigned integers, one row per
+              distinct outcome; qubit i is bit i % W of word i // W, with
+              W = 32 (uint32) up to 32 qubits and 64 (uint64) above
+    counts    (num_outcomes,) int64 shot counts
+
+so a 28-qubit outcome takes 12 bytes, and the analytics below (GHZ
+population fidelity, parities, marginals, Hamming-weight histograms,
+pairwise correlations) run as array operations over all outcomes.
+
+Bitstrings follow Qiskit: qubit 0 is the rightmost character, and spaces
+between classical registers are ignored. Integer and '0x..' hex keys, as
+in Qiskit's int/hex counts, are accepted when num_qubits is given.
+"""
+
+import json
+from collections import namedtuple
+
+import numpy as np
+
+# num_qubits - measured qubits
+# outcomes   - (num_outcomes, num_words) packed outcomes, unique rows
+# counts     - shots of each outcome
+PackedCounts = namedtuple('PackedCounts', 'num_qubits outcomes counts')
+
+
+def word_layout(num_qubits):
+    """Word dtype, bits per word and words per outcome for num_qubits"""
+    if num_qubits < 1:
+        raise ValueError(f"Need at least one qubit, got {num_qubits}")
+    dtype = np.dtype(np.uint32 if num_qubits <= 32 else np.uint64)
+    width = dtype.itemsize * 8
+    return dtype, width, -(-num_qubits // width)
+
+
+def popcount(values):
+    """Number of set bits in each element of an unsigned integer array"""
+    values = np.asarray(values)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+    # SWAR popcount for NumPy < 2.0
+    values = values.astype(np.uint64)
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((values * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def pack_bits(bits, dtype=None):
+    """Pack a (rows, num_qubits) boolean array, column i = qubit i, into words
+
+    dtype defaults to the word_layout of num_qubits.
+    """
+    bits = np.asarray(bits, dtype=bool)
+    rows, num_qubits = bits.shape
+    if dtype is None:
+        dtype, width, words = word_layout(num_qubits)
+    else:
+        dtype = np.dtype(dtype)
+        width = dtype.itemsize * 8
+        words = -(-num_qubits // width)
+    padded = np.zeros((rows, words, width), dtype=bool)
+    padded.reshape(rows, words * width)[:, :num_qubits] = bits
+    # packbits writes the most significant bit first, so reverse each word's
+    # columns to put qubit 0 in its least significant bit
+    packed = np.packbits(padded[:, :, ::-1], axis=2)
+    return np.ascontiguousarray(packed).view(f'>u{width // 8}').reshape(rows, words).astype(dtype)
+
+
+def unpack_bits(outcomes, num_qubits):
+    """Inverse of pack_bits: (rows, num_qubits) booleans, column i = qubit i"""
+    outcomes = np.asarray(outcomes)
+    little = outcomes.astype(outcomes.dtype.newbyteorder('<'))
+    bits = np.unpackbits(np.ascontiguousarray(little).view(np.uint8).reshape(len(outcomes), -1),
+                         axis=1, bitorder='little')
+    return bits[:, :num_qubits].astype(bool)
+
+
+def pack_bitstrings(bitstrings, num_qubits=None, dtype=None):
+    """Pack Qiskit bitstrings (qubit 0 rightmost) into a (rows, num_words) array"""
+    text = ''.join(bitstrings).replace(' ', '')
+    rows = len(bitstrings)
+    if num_qubits is None:
+        num_qubits = len(text) // rows if rows else 0
+    if len(text) != num_qubits * rows:
+        raise ValueError(f"Every bitstring must have {num_qubits} bits")
+    chars = np.frombuffer(text.encode('ascii'), dtype=np.uint8).reshape(rows, num_qubits)
+    if np.any((chars != ord('0')) & (chars != ord('1'))):
+        raise ValueError("Bitstrings may only contain 0, 1 and spaces")
+    return pack_bits(chars[:, ::-1] == ord('1'), dtype)
+
+
+def _pack_integers(values, num_qubits):
+    """Pack Python integers (qubit i = bit i) into a (rows, num_words) array"""
+    dtype, width, words = word_layout(num_qubits)
+    word_mask = (1 << width) - 1
+    if any(value < 0 or value >> num_qubits for value in values):
+        raise ValueError(f"Outcomes must fit in {num_qubits} bits")
+    return np.array([[(value >> (width * word)) & word_mask for word in range(words)]
+                     for value in values], dtype=dtype).reshape(len(values), words)
+
+
+def _aggregate(num_qubits, outcomes, weights):
+    """PackedCounts with duplicate outcome rows merged, rows sorted"""
+    weights = np.asarray(weights, dtype=np.int64)
+    if np.any(weights < 0):
+        raise ValueError("Counts must be non-negative")
+    if outcomes.shape[1] == 1:
+        unique, inverse = np.unique(outcomes[:, 0], return_inverse=True)
+        unique = unique[:, None]
+    else:
+        unique, inverse = np.unique(outcomes, axis=0, return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=weights, minlength=len(unique)).astype(np.int64)
+    return PackedCounts(num_qubits, unique, counts)
+
+
+def from_counts(counts, num_qubits=None):
+    """PackedCounts from a Qiskit counts dict
+
+    Keys may be bitstrings, '0x..' hex strings or integers; the last two
+    need num_qubits. Repeated outcomes (e.g. '01 1' and '011') are merged.
+    """
+    keys = list(counts)
+    weights = np.fromiter(counts.values(), dtype=np.int64, count=len(keys))
+    if not keys:
+        if num_qubits is None:
+            raise ValueError("num_qubits is needed for empty counts")
+        dtype, _, words = word_layout(num_qubits)
+        return PackedCounts(num_qubits, np.zeros((0, words), dtype=dtype), np.zeros(0, dtype=np.int64))
+    if all(isinstance(key, str) and not key.startswith('0x') for key in keys):
+        outcomes = pack_bitstrings(keys, num_qubits)
+        num_qubits = num_qubits or len(keys[0].replace(' ', ''))
+    else:
+        if num_qubits is None:
+            raise ValueError("num_qubits is needed for integer or hex counts")
+        values = [int(key, 16) if isinstance(key, str) else int(key) for key in keys]
+        outcomes = _pack_integers(values, num_qubits)
+    return _aggregate(num_qubits, outcomes, weights)
+
+
+def from_memory(memory, num_qubits=None):
+    """PackedCounts from per-shot bitstrings (Qiskit memory)"""
+    if not memory:
+        raise ValueError("No shots in memory")
+    outcomes = pack_bitstrings(memory, num_qubits)
+    num_qubits = num_qubits or len(memory[0].replace(' ', ''))
+    return _aggregate(num_qubits, outcomes, np.ones(len(memory), dtype=np.int64))
+
+
+def to_counts(packed):
+    """Qiskit-style {bitstring: count} dict of a PackedCounts"""
+    if not len(packed.counts):
+        return {}
+    bits = unpack_bits(packed.outcomes, packed.num_qubits)[:, ::-1]
+    chars = np.where(bits, '1', '0')
+    labels = np.ascontiguousarray(chars).view(f'<U{packed.num_qubits}').ravel().tolist()
+    return dict(zip(labels, packed.counts.tolist()))
+
+
+def load_counts(path, num_qubits=None):
+    """PackedCounts from a .npz written by save_counts or a JSON counts dict
+
+    JSON files may hold the counts dict itself or {"counts": {...}, ...}.
+    """
+    if str(path).endswith('.npz'):
+        with np.load(path) as data:
+            return PackedCounts(int(data['num_qubits']), data['outcomes'], data['counts'])
+    with open(path) as f:
+        counts = json.load(f)
+    if isinstance(counts.get('counts'), dict):
+        num_qubits = num_qubits or counts.get('num_qubits')
+        counts = counts['counts']
+    return from_counts(counts, num_qubits)
+
+
+def save_counts(path, packed):
+    """Write a PackedCounts as a compressed .npz"""
+    np.savez_compressed(path, num_qubits=packed.num_qubits, outcomes=packed.outcomes,
+                        counts=packed.counts)
+
+
+def total_shots(packed):
+    """Number of shots in a PackedCounts"""
+    return int(packed.counts.sum())
+
+
+def _qubit_mask(packed, qubits):
+    """Packed row selecting qubits (all qubits when None)"""
+    bits = np.zeros((1, packed.num_qubits), dtype=bool)
+    bits[0, list(range(packed.num_qubits)) if qubits is None else list(qubits)] = True
+    return pack_bits(bits, packed.outcomes.dtype)
+
+
+def ghz_outcome_shots(packed):
+    """Shots measured as |0...0> and as |1...1>"""
+    all_ones = _qubit_mask(packed, None)
+    zeros = packed.counts[np.all(packed.outcomes == 0, axis=1)].sum()
+    ones = packed.counts[np.all(packed.outcomes == all_ones, axis=1)].sum()
+    return int(zeros), int(ones)
+
+
+def ghz_populations(packed):
+    """Fractions of shots in |0...0> and |1...1>
+
+    Their sum is the GHZ population fidelity.
+    """
+    zeros, ones = ghz_outcome_shots(packed)
+    shots = total_shots(packed)
+    return zeros / shots, ones / shots
+
+
+def parity_expectation(packed, qubits=None):
+    """<Z...Z> over the given qubits (all by default): P(even) - P(odd)"""
+    parity = popcount(packed.outcomes & _qubit_mask(packed, qubits)).sum(axis=1) & 1
+    return float(((1 - 2 * parity) * packed.counts).sum() / total_shots(packed))
+
+
+def hamming_weights(packed):
+    """Number of qubits measured as 1 in each outcome"""
+    return popcount(packed.outcomes).sum(axis=1)
+
+
+def hamming_weight_histogram(packed):
+    """Shots with 0, 1, ..., num_qubits ones"""
+    return np.bincount(hamming_weights(packed), weights=packed.counts,
+                       minlength=packed.num_qubits + 1).astype(np.int64)
+
+
+def marginals(packed):
+    """Probability of measuring 1 on each qubit"""
+    bits = unpack_bits(packed.outcomes, packed.num_qubits)
+    return (packed.counts @ bits) / total_shots(packed)
+
+
+def correlations(packed, connected=False):
+    """num_qubits x num_qubits matrix of <Z_i Z_j>
+
+    With connected=True the product of single-qubit expectations is
+    subtracted, leaving <Z_i Z_j> - <Z_i><Z_j>.
+    """
+    z = 1.0 - 2.0 * unpack_bits(packed.outcomes, packed.num_qubits)
+    p = packed.counts / total_shots(packed)
+    zz = (z * p[:, None]).T @ z
+    if connected:
+        mean = p @ z
+        zz -= np.outer(mean, mean)
+    return zz
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+QKD Paths
+Cached, incrementally updated path index for trusted-node QKD networks
+
+The network API finds routes again for every path query and every key
+distribution. Here the routes of each (source, destination) pair are
+computed once and kept in memory:
+
+    - the k cheapest simple paths (Yen's algorithm)
+    - edge-disjoint paths, picked greedily cheapest first
+
+A link costs 1 / (1 - 2 h(QBER)), the raw bits spent per secret bit,
+plus a penalty that grows as its key pool runs dry. Links at or above the
+BB84 QBER limit carry no key and are left out of the graph.
+
+An inverted index maps every link and node to the cached pairs whose
+paths use it. When the topology changes, only the affected pairs are
+invalidated:
+    - link gets more expensive, link down, node down:
+        the pairs whose paths use it (no other path got cheaper)
+    - link gets cheaper, link added:
+        the pairs using it, plus the pairs a path through it could now
+        beat; that lower bound is d(s, u) + w + d(v, t), from one Dijkstra
+        run on each endpoint
+Invalidated pairs are recomputed on their next query, or all at once by
+refresh(). A query for a cached pair is a dictionary lookup.
+
+Usage:
+    python3 qkd_paths.py [--sizes 100,500,1000,5000] [--pairs 100] [--updates 50]
+"""
+
+import argparse
+import math
+import sys
+import time
+from collections import namedtuple
+from itertools import islice
+
+import networkx as nx
+import numpy as np
+
+from qkd_engine import QBER_ABORT, binary_entropy
+
+# Paths kept per pair
+K_PATHS = 4
+
+# Edge-disjoint paths kept per pair
+DISJOINT_PATHS = 3
+
+# Key pool at which the pool penalty equals one unit of link cost
+POOL_REFERENCE_BITS = 1 << 20
+
+# source, target     - the pair
+# paths, costs       - the k cheapest simple paths (node tuples), cheapest first
+# disjoint, disjoint_costs - edge-disjoint paths, cheapest first
+PathSet = namedtuple('PathSet', 'source target paths costs disjoint disjoint_costs')
+
+
+def link_weight(qber, key_pool_bits):
+    """Routing cost of a link, or inf when its QBER leaves no secret key"""
+    if qber >= QBER_ABORT:
+        return math.inf
+    fraction = 1 - 2 * float(binary_entropy(qber))
+    if fraction <= 0:
+        return math.inf
+    return 1 / fraction + POOL_REFERENCE_BITS / max(key_pool_bits, 1)
+
+
+def _edge(u, v):
+    """Key of an undirected link"""
+    return frozenset((u, v))
+
+
+def path_cost(graph, path):
+    """Sum of the link weights along a path"""
+    return sum(graph[u][v]['weight'] for u, v in zip(path, path[1:]))
+
+
+def k_shortest_paths(graph, source, target, k=K_PATHS):
+    """Up to k cheapest simple paths as node tuples"""
+    try:
+        return [tuple(path) for path in
+                islice(nx.shortest_simple_paths(graph, source, target, weight='weight'), k)]
+    except nx.NetworkXNoPath:
+        return []
+
+
+def disjoint_paths(graph, source, target, count=DISJOINT_PATHS):
+    """Up to count edge-disjoint paths, each the cheapest avoiding earlier ones"""
+    used = set()
+
+    def weight(u, v, data):
+        # None hides the link from Dijkstra
+        return None if _edge(u, v) in used else data['weight']
+
+    paths = []
+    for _ in range(count):
+        try:
+            path = nx.dijkstra_path(graph, source, target, weight=weight)
+        except nx.NetworkXNoPath:
+            break
+        paths.append(tuple(path))
+        used.update(_edge(u, v) for u, v in zip(path, path[1:]))
+    return paths
+
+
+class PathIndex:
+    """Path sets of (source, target) pairs, kept valid as the network changes"""
+
+    def __init__(self, graph, k=K_PATHS, disjoint=DISJOINT_PATHS):
+        self.graph = graph
+        self.k, self.disjoint = k, disjoint
+        self.entries = {}
+        # link -> pairs whose paths use it; node -> pairs whose paths visit it
+        self.by_edge = {}
+        self.by_node = {}
+        self.stale = set()
+        self.stats = dict(hits=0, computed=0, invalidated=0)
+
+    # --- queries ---------------------------------------------------------
+
+    def paths(self, source, target):
+        """PathSet of a pair, computed on first use"""
+        entry = self.entries.get((source, target))
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry
+        return self._compute(source, target)
+
+    def precompute(self, pairs):
+        """Compute the path sets of many pairs up front"""
+        for source, target in pairs:
+            self.paths(source, target)
+
+    def refresh(self):
+        """Recompute every pair invalidated since the last refresh"""
+        pairs, self.stale = self.stale, set()
+        for source, target in pairs:
+            if source in self.graph and target in self.graph:
+                self.paths(source, target)
+        return len(pairs)
+
+    def _compute(self, source, target):
+        paths = k_shortest_paths(self.graph, source, target, self.k)
+        disjoint = disjoint_paths(self.graph, source, target, self.disjoint)
+        entry = PathSet(source, target, paths, [path_cost(self.graph, p) for p in paths],
+                        disjoint, [path_cost(self.graph, p) for p in disjoint])
+        pair = (source, target)
+        self.entries[pair] = entry
+        self.stale.discard(pair)
+        for path in paths + disjoint:
+            for node in path:
+                self.by_node.setdefault(node, set()).add(pair)
+            for u, v in zip(path, path[1:]):
+                self.by_edge.setdefault(_edge(u, v), set()).add(pair)
+        self.stats['computed'] += 1
+        return entry
+
+    def _bound(self, entry):
+        """Cost below which a new path would change the entry (inf if it is not full)"""
+        if len(entry.paths) < self.k or len(entry.disjoint) < self.disjoint:
+            return math.inf
+        return max(entry.costs[-1], entry.disjoint_costs[-1])
+
+    # --- invalidation ----------------------------------------------------
+
+    def _invalidate(self, pairs):
+        for pair in list(pairs):
+            entry = self.entries.pop(pair, None)
+            if entry is None:
+                continue
+            for path in entry.paths + entry.disjoint:
+                for node in path:
+                    self.by_node.get(node, set()).discard(pair)
+                for u, v in zip(path, path[1:]):
+                    self.by_edge.get(_edge(u, v), set()).discard(pair)
+            self.stale.add(pair)
+            self.stats['invalidated'] += 1
+
+    def _invalidate_cheaper(self, u, v, weight):
+        """Invalidate the pairs a path through the cheaper link (u, v) could improve"""
+        if not self.entries:
+            return
+        bounds = {pair: self._bound(entry) for pair, entry in self.entries.items()}
+        cutoff = max(bounds.values())
+        cutoff = None if math.isinf(cutoff) else cutoff
+        from_u = nx.single_source_dijkstra_path_length(self.graph, u, cutoff=cutoff)
+        from_v = nx.single_source_dijkstra_path_length(self.graph, v, cutoff=cutoff)
+        inf = math.inf
+        self._invalidate([
+            (s, t) for (s, t), bound in bounds.items()
+            if min(from_u.get(s, inf) + from_v.get(t, inf),
+                   from_v.get(s, inf) + from_u.get(t, inf)) + weight < bound])
+
+    # --- topology updates ------------------------------------------------
+
+    def set_link(self, u, v, qber, key_pool_bits):
+        """Add a link or change its QBER and key pool"""
+        weight = link_weight(qber, key_pool_bits)
+        if math.isinf(weight):
+            self.remove_link(u, v)
+            return
+        old = self.graph[u][v]['weight'] if self.graph.has_edge(u, v) else math.inf
+        self.graph.add_edge(u, v, weight=weight, qber=qber, key_pool_bits=key_pool_bits)
+        if weight != old:
+            self._invalidate(self.by_edge.get(_edge(u, v), ()))
+        if weight < old:
+            self._invalidate_cheaper(u, v, weight)
+
+    def remove_link(self, u, v):
+        """Take a link down"""
+        if self.graph.has_edge(u, v):
+            self.graph.remove_edge(u, v)
+            self._invalidate(self.by_edge.pop(_edge(u, v), ()))
+
+    def remove_node(self, node):
+        """Take a node and its links down; its own pairs are forgotten"""
+        if node not in self.graph:
+            return
+        self.graph.remove_node(node)
+        self._invalidate(self.by_node.pop(node, ()))
+        self.stale = {pair for pair in self.stale if node not in pair}
+        for edge in [edge for edge in self.by_edge if node in edge]:
+            del self.by_edge[edge]
+
+
+def graph_from_topology(topology, default_qber=0.02, default_key_pool_bits=POOL_REFERENCE_BITS):
+    """Weighted graph from a /api/qkd/network/topology response
+
+    Links may carry 'qber' and 'key_pool_bits'; missing values use the
+    defaults. Links above the QBER limit are left out.
+    """
+    topology = topology.get('topology', topology)
+    graph = nx.Graph()
+    graph.add_nodes_from(topology.get('nodes', {}))
+    for link in topology.get('edges', []):
+        qber = link.get('qber', default_qber)
+        pool = link.get('key_pool_bits', default_key_pool_bits)
+        weight = link_weight(qber, pool)
+        if not math.isinf(weight):
+            graph.add_edge(link['source'], link['target'], weight=weight, qber=qber,
+                           key_pool_bits=pool)
+    return graph
+
+
+def synthetic_network(num_nodes, degree=4, seed=None):
+    """Connected small-world network with random link QBERs and key pools"""
+    rng = np.random.default_rng(seed)
+    graph = nx.connected_watts_strogatz_graph(num_nodes, degree, 0.1, seed=int(rng.integers(2 ** 31)))
+    for u, v in graph.edges:
+        qber = float(rng.uniform(0.005, 0.06))
+        pool = int(rng.integers(1 << 14, 1 << 24))
+        graph.add_edge(u, v, weight=link_weight(qber, pool), qber=qber, key_pool_bits=pool)
+    return graph
+
+
+def benchmark(num_nodes, num_pairs, num_updates, seed=0):
+    """Time precompute, cached queries and incremental updates on one network
+
+    Returns a dict of timings, with the cost of recomputing every pair
+    after each update for comparison.
+    """
+    rng = np.random.default_rng(seed)
+    graph = synthetic_network(num_nodes, seed=seed)
+    nodes = np.array(graph.nodes)
+    pairs = [tuple(int(x) for x in rng.choice(nodes, 2, replace=False)) for _ in range(num_pairs)]
+    index = PathIndex(graph)
+
+    start = time.perf_counter()
+    index.precompute(pairs)
+    build = time.perf_counter() - start
+
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for source, target in pairs:
+            index.paths(source, target)
+    query = (time.perf_counter() - start) / (repeats * len(pairs))
+
+    edges = list(graph.edges)
+    start = time.perf_counter()
+    for _ in range(num_updates):
+        action = rng.random()
+        if action < 0.1:
+            index.remove_node(int(rng.choice(list(graph.nodes))))
+        else:
+            u, v = edges[int(rng.integers(len(edges)))]
+            if not graph.has_edge(u, v):
+                continue
+            data = graph[u][v]
+            # Key pools drain with use and refill as new key is distilled
+            pool = max(1, int(data['key_pool_bits'] * rng.uniform(0.25, 2.0)))
+            index.set_link(u, v, float(np.clip(data['qber'] * rng.uniform(0.8, 1.25), 0, 0.5)), pool)
+        index.refresh()
+    update = (time.perf_counter() - start) / max(num_updates, 1)
+
+    return {
+        'nodes': num_nodes,
+        'edges': graph.number_of_edges(),
+        'build_s': build,
+        'query_us': query * 1e6,
+        'update_ms': update * 1e3,
+        # A full recompute after every update costs the whole build again
+        'full_recompute_ms': build * 1e3,
+        'invalidated_per_update': index.stats['invalidated'] / max(num_updates, 1),
+    }
+
+
+def main(argv=None):
+    """Benchmark the path index on synthetic networks"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,500,1000,5000', help='comma-separated node counts')
+    parser.add_argument('--pairs', type=int, default=100, help='cached pairs per network')
+    parser.add_argument('--updates', type=int, default=50, help='link/node updates per network')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',')]
+    except ValueError:
+        print(f"❌ Invalid --sizes: {args.sizes}")
+        return 1
+
+    for num_nodes in sizes:
+        result = benchmark(num_nodes, args.pairs, args.updates, args.seed)
+        print(f"✅ {result['nodes']:,} nodes, {result['edges']:,} links, {args.pairs} pairs")
+        print(f"   Build: {result['build_s']:.2f}s   Query: {result['query_us']:.2f} µs")
+        print(f"   Update: {result['update_ms']:.1f} ms incremental vs "
+              f"{result['full_recompute_ms']:.0f} ms full recompute "
+              f"({result['invalidated_per_update']:.1f} pairs invalidated per update)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+QRNG Extractor
+Streaming min-entropy estimation and Toeplitz-hashing randomness extraction
+
+Raw QRNG measurement bits are random but not uniform: readout bias and
+drift leave less than one bit of min-entropy per measured bit. A
+Toeplitz extractor hashes every block of n raw bits to m nearly uniform
+bits, y = T x over GF(2), where T is the m x n Toeplitz matrix
+T[i, j] = seed[i - j + n - 1] of a public random seed of n + m - 1 bits.
+By the leftover hash lemma the output is epsilon-close to uniform when
+
+    m <= n * h - 2 * log2(1 / epsilon)
+
+for a min-entropy of h bits per raw bit. h comes from a certification
+(e.g. a Mermin violation) or from estimate_min_entropy, the NIST SP
+800-90B most-common-value estimate on raw bytes.
+
+Streams are read in fixed-size chunks from bytes, NumPy arrays,
+memory-mapped files or any iterable of byte chunks (a generator reading
+a socket or a Qiskit job loop), so memory stays bounded by chunk_bytes
+whatever the stream length. Bits are packed most significant first, as
+np.packbits does; pack_shots converts Qiskit per-shot bitstrings.
+
+T x is the middle of the convolution of the seed with x. Blocks of up to
+TABLE_MAX_BITS bits use a four-Russians table: every byte value of x
+selects a precomputed XOR of 8 shifted seed copies, so a block costs one
+table lookup and m/64 word XORs per input byte: ~25-37 MB/s per core at
+1024 bits, ~11 MB/s at 8192 and ~1.5 MB/s at 32768. Larger blocks use a
+batched real FFT convolution. Its cost per byte does not grow with m, but
+NumPy's float64 FFT over one value per bit tops out around 2 MB/s per core
+at any size, so it is only the faster method above TABLE_MAX_BITS.
+Blocks are independent, so extract hashes whole chunks of them in a
+spawned process pool that holds the extractor tables once per worker;
+throughput grows with the number of cores.
+
+Usage:
+    python3 qrng_extractor.py raw.bin extracted.bin [--min-entropy H] [--block-bits N] [--jobs N]
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Raw bits hashed together; the table method is fastest at this size
+BLOCK_BITS = 1024
+
+# Extractor security parameter (output distance from uniform per block)
+EPSILON = 2.0 ** -32
+
+# Bytes read from the source at a time, which bounds memory use
+CHUNK_BYTES = 1 << 20
+
+# Largest block hashed with the byte-table method; FFT above this. The
+# table's cost per input byte grows with m and the FFT's does not, but the
+# FFT runs at ~2 MB/s per core at every size, so it only wins from ~32k bits
+TABLE_MAX_BITS = 32768
+
+# 99% upper confidence bound used by the NIST most-common-value estimate
+CONFIDENCE_Z = 2.576
+
+# Bit-reversed value of every byte, to convert between bit orders
+_REVERSED_BYTES = np.packbits(np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1),
+                              axis=1, bitorder='little').ravel()
+
+# samples            - bytes examined
+# most_common        - the most frequent byte value
+# p_upper            - 99% upper bound on its probability
+# min_entropy        - -log2(p_upper) / 8, min-entropy per raw bit
+EntropyEstimate = namedtuple('EntropyEstimate', 'samples most_common p_upper min_entropy')
+
+# block_bits, output_bits - n and m of the m x n Toeplitz matrix
+# seed                    - its n + m - 1 seed bits (uint8 0/1)
+# method                  - 'table' or 'fft'
+# kernel                  - precomputed byte tables or seed spectrum
+ToeplitzExtractor = namedtuple('ToeplitzExtractor', 'block_bits output_bits seed method kernel')
+
+
+def iter_chunks(source, chunk_bytes=CHUNK_BYTES):
+    """Yield uint8 arrays of at most chunk_bytes from a byte source
+
+    source may be bytes-like, a NumPy array, a file path (memory-mapped,
+    read chunk by chunk) or an iterable of bytes-like chunks of any size.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.getsize(source) == 0:
+            return
+        source = np.memmap(source, dtype=np.uint8, mode='r')
+    if isinstance(source, (bytes, bytearray, memoryview, np.ndarray)):
+        data = np.frombuffer(source, dtype=np.uint8) if not isinstance(source, np.ndarray) \
+            else source.reshape(-1).view(np.uint8)
+        for start in range(0, len(data), chunk_bytes):
+            yield np.asarray(data[start:start + chunk_bytes])
+        return
+    for chunk in source:
+        data = np.frombuffer(chunk, dtype=np.uint8) if not isinstance(chunk, np.ndarray) \
+            else chunk.reshape(-1).view(np.uint8)
+        for start in range(0, len(data), chunk_bytes):
+            yield data[start:start + chunk_bytes]
+
+
+def pack_shots(memory):
+    """Pack Qiskit per-shot bitstrings into bytes, shot after shot
+
+    Bits are taken as printed in each bitstring. Trailing bits that do not
+    fill a byte are dropped rather than padded.
+    """
+    text = ''.join(memory).replace(' ', '')
+    chars = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    if np.any((chars != ord('0')) & (chars != ord('1'))):
+        raise ValueError("Bitstrings may only contain 0, 1 and spaces")
+    usable = len(chars) - len(chars) % 8
+    return np.packbits(chars[:usable] == ord('1')).tobytes()
+
+
+def estimate_min_entropy(source, chunk_bytes=CHUNK_BYTES):
+    """Most-common-value min-entropy estimate of a byte stream
+
+    Streams the source once, keeping only a 256-bin histogram. Follows
+    NIST SP 800-90B section 6.3.1 on 8-bit samples and returns the
+    per-bit rate.
+    """
+    histogram = np.zeros(256, dtype=np.int64)
+    for chunk in iter_chunks(source, chunk_bytes):
+        histogram += np.bincount(chunk, minlength=256)
+    samples = int(histogram.sum())
+    if samples < 2:
+        raise ValueError("Need at least two bytes to estimate min-entropy")
+    most_common = int(histogram.argmax())
+    p_hat = float(histogram[most_common] / samples)
+    p_upper = min(1.0, p_hat + CONFIDENCE_Z * math.sqrt(p_hat * (1 - p_hat) / (samples - 1)))
+    return EntropyEstimate(samples, most_common, p_upper, -math.log2(p_upper) / 8)
+
+
+def output_length(block_bits, min_entropy, epsilon=EPSILON):
+    """Extractable whole bytes' worth of bits per block, by the leftover hash lemma"""
+    bits = int(block_bits * min_entropy - 2 * math.log2(1 / epsilon)) // 8 * 8
+    if bits <= 0:
+        raise ValueError(f"A {block_bits}-bit block at {min_entropy:.4f} bits/bit cannot reach "
+                         f"epsilon = {epsilon:g}; use larger blocks")
+    return min(bits, block_bits)
+
+
+def _byte_tables(seed, block_bits, output_bits):
+    """Four-Russians tables for the Toeplitz product, one per byte alignment
+
+    With x' the block reversed, y_i = XOR_j seed[i + j] x'_j. comb[v] is the
+    XOR of seed shifted by each set bit b of v (bit b = x'_{8p + b}), so
+    byte p of x' contributes comb[v] starting at bit 8p. tables[r] holds
+    comb shifted by r bytes as uint64 words, making the window for byte p
+    tables[p % 8][v, p // 8 : p // 8 + words].
+    """
+    words = -(-output_bits // 64)
+    span = 8 * (block_bits // 64 + words + 1)
+    padded = np.zeros(8 * span + 8, dtype=np.uint8)
+    padded[:len(seed)] = seed
+    shifted = np.stack([padded[b:b + 8 * span] for b in range(8)]).astype(np.int32)
+    value_bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little')
+    comb = np.packbits(((value_bits.astype(np.int32) @ shifted) & 1).astype(np.uint8),
+                       axis=1, bitorder='little')
+    return [np.ascontiguousarray(comb[:, r:r + span - 8]).view('<u8') for r in range(8)]
+
+
+def toeplitz_extractor(block_bits=BLOCK_BITS, output_bits=None, seed=None, min_entropy=None,
+                       epsilon=EPSILON, method=None):
+    """Build a Toeplitz extractor hashing block_bits raw bits to output_bits
+
+    output_bits defaults to output_length(block_bits, min_entropy, epsilon).
+    seed is an int for np.random.default_rng, or n + m - 1 bits; method
+    defaults to 'table' up to TABLE_MAX_BITS and 'fft' above.
+    """
+    if block_bits <= 0 or block_bits % 64:
+        raise ValueError(f"block_bits must be a positive multiple of 64, got {block_bits}")
+    if output_bits is None:
+        if min_entropy is None:
+            raise ValueError("Give output_bits or min_entropy")
+        output_bits = output_length(block_bits, min_entropy, epsilon)
+    if not 0 < output_bits <= block_bits or output_bits % 8:
+        raise ValueError(f"output_bits must be a multiple of 8 in 8..{block_bits}, got {output_bits}")
+    seed_length = block_bits + output_bits - 1
+    if seed is None or isinstance(seed, (int, np.integer)):
+        seed = np.random.default_rng(seed).integers(0, 2, seed_length, dtype=np.uint8)
+    seed = np.asarray(seed, dtype=np.uint8)
+    if seed.shape != (seed_length,):
+        raise ValueError(f"Seed must have {seed_length} bits, got {seed.shape}")
+    method = method or ('table' if block_bits <= TABLE_MAX_BITS else 'fft')
+
+    if method == 'table':
+        kernel = _byte_tables(seed, block_bits, output_bits)
+    elif method == 'fft':
+        kernel = np.fft.rfft(seed.astype(np.float64), _fft_size(block_bits, output_bits))
+    else:
+        raise ValueError(f"Unknown method {method!r}")
+    return ToeplitzExtractor(block_bits, output_bits, seed, method, kernel)
+
+
+def _fft_size(block_bits, output_bits):
+    """Power-of-two length that holds the convolution terms y depends on"""
+    return 1 << (block_bits + output_bits - 2).bit_length()
+
+
+def hash_blocks(extractor, blocks):
+    """Toeplitz hash of raw blocks: (batch, n/8) uint8 -> (batch, m/8) uint8"""
+    blocks = np.asarray(blocks, dtype=np.uint8).reshape(-1, extractor.block_bits // 8)
+    n, m = extractor.block_bits, extractor.output_bits
+    if extractor.method == 'fft':
+        # y_i = sum_j seed[i + n - 1 - j] x_j is term i + n - 1 of seed * x;
+        # the sums are integers below n, so rounding recovers them exactly
+        size = _fft_size(n, m)
+        spectrum = np.fft.rfft(np.unpackbits(blocks, axis=1).astype(np.float64), size, axis=1)
+        sums = np.fft.irfft(spectrum * extractor.kernel, size, axis=1)[:, n - 1:n - 1 + m]
+        return np.packbits(np.rint(sums).astype(np.int64) & 1, axis=1).astype(np.uint8)
+
+    # Reversing the byte order of a block packed most significant bit
+    # first gives x' packed least significant bit first
+    reversed_blocks = blocks[:, ::-1]
+    words = -(-m // 64)
+    out = np.zeros((len(blocks), words), dtype=np.uint64)
+    tables = extractor.kernel
+    for p in range(reversed_blocks.shape[1]):
+        out ^= tables[p % 8][reversed_blocks[:, p], p // 8:p // 8 + words]
+    little = out.view(np.uint8)[:, :m // 8]
+    return _REVERSED_BYTES[little]
+
+
+def _whole_blocks(source, block_bytes, chunk_bytes):
+    """Yield chunks of a byte stream holding whole blocks only
+
+    Bytes that do not fill a block are carried into the next chunk; a
+    final partial block is discarded.
+    """
+    chunk_bytes = max(block_bytes, chunk_bytes // block_bytes * block_bytes)
+    carry = np.zeros(0, dtype=np.uint8)
+    for chunk in iter_chunks(source, chunk_bytes):
+        if len(carry):
+            chunk = np.concatenate([carry, chunk])
+        whole = len(chunk) // block_bytes * block_bytes
+        carry = chunk[whole:].copy()
+        if whole:
+            yield chunk[:whole]
+
+
+# Extractor of this worker process, set once by _init_worker
+_worker_extractor = None
+
+
+def _init_worker(extractor):
+    """Keep the extractor (and its tables) in the worker instead of sending it per chunk"""
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _hash_task(blocks):
+    """Worker entry point for one chunk of whole blocks"""
+    return hash_blocks(_worker_extractor, blocks).tobytes()
+
+
+def extract(source, extractor, chunk_bytes=CHUNK_BYTES, jobs=None):
+    """Yield extracted bytes for each chunk of a raw byte stream, in order
+
+    Whole blocks are hashed as they arrive; a final partial block is
+    discarded. Blocks are hashed independently, so chunks are spread over
+    a process pool. jobs defaults to the number of CPUs; jobs=1 runs in
+    this process. Memory stays O(jobs * chunk_bytes).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    chunks = _whole_blocks(source, extractor.block_bits // 8, chunk_bytes)
+    if jobs == 1:
+        for blocks in chunks:
+            yield hash_blocks(extractor, blocks).tobytes()
+        return
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                             initializer=_init_worker, initargs=(extractor,)) as pool:
+        in_flight = deque()
+        for blocks in chunks:
+            in_flight.append(pool.submit(_hash_task, blocks))
+            # Bound memory: wait for the oldest chunk once enough are queued
+            while len(in_flight) > 2 * jobs:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def extract_file(input_path, output_path, min_entropy=None, block_bits=BLOCK_BITS,
+                 epsilon=EPSILON, seed=0, chunk_bytes=CHUNK_BYTES, jobs=None):
+    """Extract a raw file to output_path, estimating min-entropy if not given
+
+    Returns (extractor, estimate or None, bytes written).
+    """
+    estimate = None
+    if min_entropy is None:
+        estimate = estimate_min_entropy(input_path, chunk_bytes)
+        min_entropy = estimate.min_entropy
+    extractor = toeplitz_extractor(block_bits, seed=seed, min_entropy=min_entropy, epsilon=epsilon)
+    written = 0
+    with open(output_path, 'wb') as f:
+        for data in extract(input_path, extractor, chunk_bytes, jobs):
+            f.write(data)
+            written += len(data)
+    return extractor, estimate, written
+
+
+def main(argv=None):
+    """Extract uniform random bytes from a raw QRNG bit file"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input_path')
+    parser.add_argument('output_path')
+    parser.add_argument('--min-entropy', type=float,
+                        help='certified min-entropy per raw bit (default: estimate from the input)')
+    parser.add_argument('--block-bits', type=int, default=BLOCK_BITS,
+                        help=f'raw bits per Toeplitz block (default: {BLOCK_BITS})')
+    parser.add_argument('--epsilon', type=float, default=EPSILON,
+                        help=f'distance from uniform per block (default: {EPSILON:g})')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for the public Toeplitz seed bits (default: 0)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    args = parser.parse_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    try:
+        extractor, estimate, written = extract_file(args.input_path, args.output_path,
+                                                    args.min_entropy, args.block_bits,
+                                                    args.epsilon, args.seed, jobs=jobs)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.input_path)
+    if estimate is not None:
+        print(f"   Min-entropy estimate: {estimate.min_entropy:.4f} bits/bit "
+              f"(most common byte 0x{estimate.most_common:02x}, p <= {estimate.p_upper:.5f})")
+    print(f"✅ Wrote {args.output_path}: {written:,} bytes from {size:,} raw bytes")
+    print(f"   Toeplitz {extractor.output_bits} x {extractor.block_bits} ({extractor.method}), "
+          f"{size / max(elapsed, 1e-9) / 1e6:.1f} MB/s on {jobs} "
+          f"{'process' if jobs == 1 else 'processes'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
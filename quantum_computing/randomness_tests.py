@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Randomness Tests
+NIST SP 800-22 statistical test battery for QRNG bit streams
+
+The stream is cut into sequences of sequence_bits bits (10^6 by default,
+as SP 800-22 recommends) and every test runs on each sequence, vectorized
+across a batch of sequences at a time:
+
+    frequency, block_frequency, runs, longest_run, dft (spectral),
+    serial, approximate_entropy, cumulative_sums
+
+Each test reports a p-value per sequence. As in the NIST STS final
+analysis report, a test passes when the proportion of sequences with
+p >= alpha lies inside p_hat +/- 3 sqrt(p_hat (1 - p_hat) / N) and, for
+55 or more sequences, its p-values are uniform (chi-square over ten
+bins, p >= 0.0001).
+
+Input is anything qrng_extractor.iter_chunks reads: bytes, arrays,
+generators of chunks, or a file path. Batches of sequences are handed
+to a process pool, one task per (batch, test); for files the workers
+memory-map their slice themselves instead of receiving a copy, and at
+most a few batches are in flight, so memory stays bounded for streams of
+any length.
+
+Usage:
+    python3 randomness_tests.py raw.bin [--output ../data/qrng_nist_sts.json] [--jobs N]
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from packed_counts import popcount
+from qrng_extractor import iter_chunks
+
+# Bits per tested sequence
+SEQUENCE_BITS = 1_000_000
+
+# Sequences handed to a worker per task
+SEQUENCES_PER_TASK = 8
+
+# Significance level of each per-sequence test
+ALPHA = 0.01
+
+# Smallest uniformity p-value accepted, and the sequences needed to test it
+UNIFORMITY_ALPHA = 0.0001
+UNIFORMITY_MIN_SEQUENCES = 55
+
+# Test parameters (SP 800-22 section 2 and the STS defaults)
+BLOCK_FREQUENCY_BITS = 128
+SERIAL_BLOCK_BITS = 16
+APEN_BLOCK_BITS = 10
+DFT_THRESHOLD_FRACTION = 0.95
+
+# Default report, read by comparison.html
+REPORT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'data', 'qrng_nist_sts.json')
+
+# Longest run of ones (section 2.4): (minimum n, block bits M, smallest
+# class, class probabilities); runs below the smallest class or above the
+# largest are counted in the end classes
+LONGEST_RUN_TABLES = (
+    (750_000, 10_000, 10, (0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727)),
+    (6_272, 128, 4, (0.1174035788, 0.242955959, 0.249363483, 0.17517706, 0.102701071, 0.112398847)),
+    (128, 8, 1, (0.21484375, 0.3671875, 0.23046875, 0.1875)),
+)
+
+# Continued fraction / series limits for igamc
+_GAMMA_EPSILON = 1e-15
+_GAMMA_MAX_ITERATIONS = 100_000
+_FLOAT_MIN = 1e-300
+
+# name      - test[/subtest] label in reports, e.g. 'cumulative_sums/forward'
+# p_values  - p-value of every sequence
+# proportion, proportion_range - share with p >= alpha and the accepted range
+# uniformity_p - p-value of the ten-bin chi-square, None below 55 sequences
+# passed    - both criteria met
+TestResult = namedtuple('TestResult', 'name p_values proportion proportion_range uniformity_p passed')
+
+
+def _gamma_series(a, x):
+    """Regularized lower incomplete gamma P(a, x) by its power series"""
+    term = total = 1.0 / a
+    denominator = a
+    for _ in range(_GAMMA_MAX_ITERATIONS):
+        denominator += 1
+        term *= x / denominator
+        total += term
+        if abs(term) < abs(total) * _GAMMA_EPSILON:
+            break
+    return total * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def _gamma_fraction(a, x):
+    """Regularized upper incomplete gamma Q(a, x) by Lentz's continued fraction"""
+    b = x + 1 - a
+    c = 1 / _FLOAT_MIN
+    d = 1 / b
+    h = d
+    for i in range(1, _GAMMA_MAX_ITERATIONS):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = _FLOAT_MIN if abs(d) < _FLOAT_MIN else d
+        c = b + an / c
+        c = _FLOAT_MIN if abs(c) < _FLOAT_MIN else c
+        d = 1 / d
+        step = d * c
+        h *= step
+        if abs(step - 1) < _GAMMA_EPSILON:
+            break
+    return math.exp(-x + a * math.log(x) - math.lgamma(a)) * h
+
+
+def igamc(a, x):
+    """Regularized upper incomplete gamma function Q(a, x), as in the NIST STS"""
+    if x <= 0:
+        return 1.0
+    if x < a + 1:
+        return max(0.0, 1.0 - _gamma_series(a, x))
+    return _gamma_fraction(a, x)
+
+
+_igamc = np.vectorize(igamc, otypes=[float])
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def _unpack(packed, num_bits):
+    """(sequences, num_bits) uint8 0/1 array from packed rows"""
+    return np.unpackbits(np.atleast_2d(packed), axis=1, count=num_bits)
+
+
+def _ones(packed, num_bits):
+    """Number of ones in the first num_bits bits of each row"""
+    packed = np.atleast_2d(packed)
+    if num_bits % 8 == 0:
+        return popcount(packed[:, :num_bits // 8]).sum(axis=1)
+    return _unpack(packed, num_bits).sum(axis=1, dtype=np.int64)
+
+
+def frequency(packed, num_bits):
+    """Frequency (monobit) test"""
+    s_obs = np.abs(2 * _ones(packed, num_bits) - num_bits) / math.sqrt(num_bits)
+    return _erfc(s_obs / math.sqrt(2))
+
+
+def block_frequency(packed, num_bits, block_bits=BLOCK_FREQUENCY_BITS):
+    """Frequency within blocks of block_bits bits"""
+    blocks = num_bits // block_bits
+    if block_bits % 8 == 0:
+        rows = np.atleast_2d(packed)[:, :blocks * block_bits // 8]
+        ones = popcount(rows.reshape(len(rows), blocks, block_bits // 8)).sum(axis=2)
+    else:
+        bits = _unpack(packed, blocks * block_bits)
+        ones = bits.reshape(len(bits), blocks, block_bits).sum(axis=2)
+    chi_squared = 4 * block_bits * ((ones / block_bits - 0.5) ** 2).sum(axis=1)
+    return _igamc(blocks / 2, chi_squared / 2)
+
+
+def runs(packed, num_bits):
+    """Runs test: number of uninterrupted runs of identical bits"""
+    bits = _unpack(packed, num_bits)
+    pi = bits.sum(axis=1) / num_bits
+    changes = np.count_nonzero(bits[:, 1:] != bits[:, :-1], axis=1)
+    v_obs = 1 + changes
+    spread = 2 * math.sqrt(2 * num_bits) * pi * (1 - pi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_values = _erfc(np.abs(v_obs - 2 * num_bits * pi * (1 - pi)) / spread)
+    # The frequency prerequisite: the runs test is not applicable otherwise
+    return np.where(np.abs(pi - 0.5) >= 2 / math.sqrt(num_bits), 0.0, p_values)
+
+
+def _longest_runs(bits):
+    """Longest run of ones in each row of a 2-D 0/1 array"""
+    rows, width = bits.shape
+    padded = np.zeros((rows, width + 2), dtype=np.uint8)
+    padded[:, 1:-1] = bits
+    zeros = np.flatnonzero(padded.ravel() == 0)
+    # Consecutive zeros of one row bracket a run; pairs spanning two rows
+    # are the adjacent sentinels and give a run of 0
+    gaps = np.diff(zeros) - 1
+    longest = np.zeros(rows, dtype=np.int64)
+    np.maximum.at(longest, zeros[:-1] // (width + 2), gaps)
+    return longest
+
+
+def longest_run(packed, num_bits):
+    """Longest run of ones in a block"""
+    for min_bits, block_bits, first_class, probabilities in LONGEST_RUN_TABLES:
+        if num_bits >= min_bits:
+            break
+    else:
+        raise ValueError(f"The longest run test needs at least 128 bits, got {num_bits}")
+    blocks = num_bits // block_bits
+    bits = _unpack(packed, blocks * block_bits)
+    longest = _longest_runs(bits.reshape(-1, block_bits)).reshape(len(bits), blocks)
+    classes = np.clip(longest - first_class, 0, len(probabilities) - 1)
+    observed = np.stack([np.bincount(row, minlength=len(probabilities)) for row in classes])
+    expected = blocks * np.asarray(probabilities)
+    chi_squared = ((observed - expected) ** 2 / expected).sum(axis=1)
+    return _igamc((len(probabilities) - 1) / 2, chi_squared / 2)
+
+
+def dft(packed, num_bits):
+    """Discrete Fourier transform (spectral) test, one FFT per sequence"""
+    threshold = math.sqrt(math.log(1 / 0.05) * num_bits)
+    expected = DFT_THRESHOLD_FRACTION * num_bits / 2
+    below = []
+    for row in np.atleast_2d(packed):
+        x = 2.0 * _unpack(row, num_bits)[0] - 1.0
+        # Moduli |S_0| .. |S_{n/2-1}|, as in the NIST reference code
+        # (m[0..n/2-1]). The SP 800-22 §2.6.8 worked example lists N1 = 46
+        # (p = 0.168669), but this count gives 48 (p = 0.646355) on its own
+        # sequence; we follow the reference code, see test_randomness_tests.py.
+        below.append(np.count_nonzero(np.abs(np.fft.rfft(x)[:num_bits // 2]) < threshold))
+    d = (np.asarray(below) - expected) / math.sqrt(num_bits * 0.95 * 0.05 / 4)
+    return _erfc(np.abs(d) / math.sqrt(2))
+
+
+def _pattern_counts(packed, num_bits, block_bits):
+    """Counts of every overlapping block_bits pattern, wrapping at the end
+
+    Returns (sequences, 2^block_bits) counts. Counts of shorter patterns
+    are sums over the trailing bits, see _shorter.
+    """
+    bits = _unpack(packed, num_bits).astype(np.int32)
+    wrapped = np.concatenate([bits, bits[:, :block_bits - 1]], axis=1)
+    values = np.zeros_like(bits)
+    for k in range(block_bits):
+        values = (values << 1) | wrapped[:, k:k + num_bits]
+    size = 1 << block_bits
+    offsets = (np.arange(len(bits), dtype=np.int64) * size)[:, None]
+    return np.bincount((values + offsets).ravel(), minlength=len(bits) * size).reshape(len(bits), size)
+
+
+def _shorter(counts, drop_bits):
+    """Pattern counts with the last drop_bits bits of each pattern summed out"""
+    return counts.reshape(len(counts), -1, 1 << drop_bits).sum(axis=2)
+
+
+def serial(packed, num_bits, block_bits=SERIAL_BLOCK_BITS):
+    """Serial test: two p-values per sequence (del psi^2 and del^2 psi^2)"""
+    counts = _pattern_counts(packed, num_bits, block_bits)
+
+    def psi_squared(drop):
+        m = block_bits - drop
+        if m <= 0:
+            return np.zeros(len(counts))
+        c = _shorter(counts, drop).astype(np.float64)
+        return (2 ** m / num_bits) * (c ** 2).sum(axis=1) - num_bits
+
+    psi_m, psi_m1, psi_m2 = psi_squared(0), psi_squared(1), psi_squared(2)
+    p1 = _igamc(2 ** (block_bits - 2), (psi_m - psi_m1) / 2)
+    p2 = _igamc(2 ** (block_bits - 3), (psi_m - 2 * psi_m1 + psi_m2) / 2)
+    return np.stack([p1, p2], axis=1)
+
+
+def approximate_entropy(packed, num_bits, block_bits=APEN_BLOCK_BITS):
+    """Approximate entropy test for blocks of block_bits and block_bits + 1"""
+    counts = _pattern_counts(packed, num_bits, block_bits + 1)
+
+    def phi(c):
+        p = c / num_bits
+        return np.where(p > 0, p * np.log(np.where(p > 0, p, 1)), 0.0).sum(axis=1)
+
+    apen = phi(_shorter(counts, 1)) - phi(counts)
+    chi_squared = 2 * num_bits * (math.log(2) - apen)
+    return _igamc(2 ** (block_bits - 1), chi_squared / 2)
+
+
+def _cusum_p_value(n, z):
+    """p-value of a maximum partial-sum excursion z (section 2.13)"""
+    if z == 0:
+        return 1.0
+    sqrt_n = math.sqrt(n)
+
+    def phi(x):
+        return 0.5 * _erfc(-x / math.sqrt(2))
+
+    k = np.arange(int((-n / z + 1) / 4), int((n / z - 1) / 4) + 1)
+    sum1 = (phi((4 * k + 1) * z / sqrt_n) - phi((4 * k - 1) * z / sqrt_n)).sum()
+    k = np.arange(int((-n / z - 3) / 4), int((n / z - 1) / 4) + 1)
+    sum2 = (phi((4 * k + 3) * z / sqrt_n) - phi((4 * k + 1) * z / sqrt_n)).sum()
+    return min(1.0, max(0.0, 1.0 - sum1 + sum2))
+
+
+def cumulative_sums(packed, num_bits):
+    """Cumulative sums test: forward and backward p-values per sequence"""
+    steps = 2 * _unpack(packed, num_bits).astype(np.int32) - 1
+    forward = np.abs(np.cumsum(steps, axis=1)).max(axis=1)
+    backward = np.abs(np.cumsum(steps[:, ::-1], axis=1)).max(axis=1)
+    return np.array([[_cusum_p_value(num_bits, int(f)), _cusum_p_value(num_bits, int(b))]
+                     for f, b in zip(forward, backward)]).reshape(-1, 2)
+
+
+# Test name -> (function, subtest names when it returns several p-values)
+TESTS = {
+    'frequency': (frequency, None),
+    'block_frequency': (block_frequency, None),
+    'runs': (runs, None),
+    'longest_run': (longest_run, None),
+    'dft': (dft, None),
+    'serial': (serial, ('p1', 'p2')),
+    'approximate_entropy': (approximate_entropy, None),
+    'cumulative_sums': (cumulative_sums, ('forward', 'backward')),
+}
+
+
+def _sequence_batches(source, sequence_bits, per_task):
+    """Yield batches of whole sequences: (path, first, count) for files, arrays otherwise"""
+    sequence_bytes = sequence_bits // 8
+    if isinstance(source, (str, os.PathLike)):
+        total = os.path.getsize(source) // sequence_bytes
+        for first in range(0, total, per_task):
+            yield (os.fspath(source), first, min(per_task, total - first))
+        return
+    batch_bytes = sequence_bytes * per_task
+    pending, size = [], 0
+    for chunk in iter_chunks(source, batch_bytes):
+        pending.append(chunk)
+        size += len(chunk)
+        while size >= batch_bytes:
+            data = np.concatenate(pending)
+            yield data[:batch_bytes].reshape(per_task, sequence_bytes)
+            pending, size = [data[batch_bytes:]], size - batch_bytes
+    whole = size // sequence_bytes
+    if whole:
+        yield np.concatenate(pending)[:whole * sequence_bytes].reshape(whole, sequence_bytes)
+
+
+def _run_test(name, batch, sequence_bits):
+    """Worker task: p-values of one test on one batch of sequences"""
+    if isinstance(batch, tuple):
+        path, first, count = batch
+        sequence_bytes = sequence_bits // 8
+        data = np.memmap(path, dtype=np.uint8, mode='r', offset=first * sequence_bytes,
+                         shape=(count, sequence_bytes))
+        batch = np.asarray(data)
+    p_values = np.asarray(TESTS[name][0](batch, sequence_bits), dtype=float)
+    return p_values.reshape(len(batch), -1)
+
+
+def _assess(name, p_values, alpha):
+    """Proportion and uniformity verdict of one (sub)test"""
+    count = len(p_values)
+    proportion = float(np.mean(p_values >= alpha))
+    p_hat = 1 - alpha
+    margin = 3 * math.sqrt(p_hat * alpha / count)
+    proportion_range = (p_hat - margin, min(1.0, p_hat + margin))
+    uniformity_p = None
+    if count >= UNIFORMITY_MIN_SEQUENCES:
+        bins = np.histogram(p_values, bins=10, range=(0, 1))[0]
+        expected = count / 10
+        uniformity_p = igamc(4.5, float(((bins - expected) ** 2 / expected).sum()) / 2)
+    passed = proportion >= proportion_range[0] and (uniformity_p is None
+                                                    or uniformity_p >= UNIFORMITY_ALPHA)
+    return TestResult(name, p_values, proportion, proportion_range, uniformity_p, bool(passed))
+
+
+def run_battery(source, sequence_bits=SEQUENCE_BITS, tests=None, jobs=None,
+                alpha=ALPHA, per_task=SEQUENCES_PER_TASK):
+    """Run the test battery over every whole sequence of a byte stream
+
+    Returns a list of TestResult, one per test or subtest. jobs defaults to
+    the number of CPUs; jobs=1 runs in this process.
+    """
+    if sequence_bits % 8:
+        raise ValueError(f"sequence_bits must be a multiple of 8, got {sequence_bits}")
+    names = list(tests or TESTS)
+    unknown = [name for name in names if name not in TESTS]
+    if unknown:
+        raise ValueError(f"Unknown tests: {', '.join(unknown)}")
+    jobs = jobs or os.cpu_count() or 1
+    batches = _sequence_batches(source, sequence_bits, per_task)
+    collected = {name: [] for name in names}
+
+    if jobs == 1:
+        for batch in batches:
+            for name in names:
+                collected[name].append(_run_test(name, batch, sequence_bits))
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            in_flight = deque()
+            for batch in batches:
+                in_flight.append([(name, pool.submit(_run_test, name, batch, sequence_bits))
+                                  for name in names])
+                # Bound memory: wait for the oldest batch once enough are queued
+                while len(in_flight) > 2 * jobs:
+                    for name, future in in_flight.popleft():
+                        collected[name].append(future.result())
+            for futures in in_flight:
+                for name, future in futures:
+                    collected[name].append(future.result())
+
+    if not collected[names[0]]:
+        raise ValueError(f"The stream holds less than one {sequence_bits}-bit sequence")
+    results = []
+    for name in names:
+        p_values = np.concatenate(collected[name])
+        subtests = TESTS[name][1] or (None,)
+        for column, subtest in enumerate(subtests):
+            label = f'{name}/{subtest}' if subtest else name
+            results.append(_assess(label, p_values[:, column], alpha))
+    return results
+
+
+def write_report(path, results, sequence_bits, alpha=ALPHA, source=None):
+    """Write results as the JSON report read by the comparison page"""
+    report = {
+        'source': source,
+        'sequence_bits': sequence_bits,
+        'num_sequences': len(results[0].p_values),
+        'alpha': alpha,
+        'summary': {'passed': sum(r.passed for r in results), 'total': len(results)},
+        'tests': [{
+            'name': r.name,
+            'passed': r.passed,
+            'proportion': round(r.proportion, 6),
+            'proportion_range': [round(v, 6) for v in r.proportion_range],
+            'uniformity_p': None if r.uniformity_p is None else round(r.uniformity_p, 6),
+            'p_values': np.round(r.p_values, 6).tolist(),
+        } for r in results],
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    return report
+
+
+def main(argv=None):
+    """Run the battery on a raw or extracted QRNG file and write the report"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input_path')
+    parser.add_argument('--output', default=REPORT_PATH,
+                        help='JSON report path (default: data/qrng_nist_sts.json)')
+    parser.add_argument('--sequence-bits', type=int, default=SEQUENCE_BITS,
+                        help=f'bits per tested sequence (default: {SEQUENCE_BITS})')
+    parser.add_argument('--tests', help='comma-separated subset of: ' + ', '.join(TESTS))
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        results = run_battery(args.input_path, args.sequence_bits,
+                              args.tests.split(',') if args.tests else None, args.jobs, args.alpha)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    report = write_report(args.output, results, args.sequence_bits, args.alpha,
+                          os.path.basename(args.input_path))
+    elapsed = time.perf_counter() - start
+
+    print(f"NIST SP 800-22: {report['num_sequences']} sequences of {args.sequence_bits:,} bits "
+          f"in {elapsed:.1f}s")
+    for r in results:
+        uniformity = '' if r.uniformity_p is None else f", uniformity p = {r.uniformity_p:.4f}"
+        print(f"  {'✅' if r.passed else '❌'} {r.name:<30} proportion {r.proportion:.4f}{uniformity}")
+    print(f"✅ Wrote {args.output}: {report['summary']['passed']}/{report['summary']['total']} passed")
+    return 0 if report['summary']['passed'] == report['summary']['total'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Readout Mitigation
+Tensored readout-error mitigation that only touches the observed bitstrings
+
+Readout errors are described by assignment matrices A[measured, prepared]
+for independent blocks of qubits: one 2x2 matrix per qubit, or a 2^k x 2^k
+matrix for a block of k qubits whose errors are correlated. The full
+2^n x 2^n matrix is their tensor product, which is never built. Instead:
+
+  - parity (Z...Z) expectations and the mitigated probability of chosen
+    bitstrings (e.g. |0...0> and |1...1> for GHZ fidelity) are linear in
+    the measured distribution. Each observed outcome contributes a product
+    of one inverse-matrix entry per block, so any number of observables
+    costs O(observables x outcomes x blocks) and no matrix is inverted
+    beyond 2^k x 2^k.
+  - a full mitigated quasi-distribution is solved M3-style on the
+    observed bitstrings only. The assignment matrix is restricted to
+    outcomes within `distance` bit flips of each other, its columns are
+    renormalised, and the sparse system is solved with Jacobi-
+    preconditioned BiCGSTAB. Cost is linear in the number of unique
+    outcomes for a fixed distance.
+
+Outcomes are packed_counts arrays, with qubit i in bit i. X/Y-basis
+measurements are mitigated the same way, since the readout error acts on
+the bits after the basis rotation.
+"""
+
+import itertools
+import json
+from collections import namedtuple
+
+import numpy as np
+
+import packed_counts
+
+# Largest Hamming distance between outcomes coupled by the M3 solve
+DEFAULT_DISTANCE = 2
+
+# BiCGSTAB stopping rule for quasi_probabilities
+SOLVER_TOLERANCE = 1e-10
+SOLVER_MAX_ITERATIONS = 200
+
+# Observable x outcome elements evaluated per chunk of a batched product
+CHUNK_ELEMENTS = 1 << 22
+
+# num_qubits - qubits covered by the calibration
+# blocks     - tuple of qubit tuples partitioning range(num_qubits); bit j
+#              of a block's state index is qubit blocks[b][j]
+# matrices   - assignment matrix of each block, columns = prepared state
+ReadoutCalibration = namedtuple('ReadoutCalibration', 'num_qubits blocks matrices')
+
+# outcomes      - observed outcomes the distribution is defined on
+# probabilities - mitigated quasi-probabilities (may be slightly negative)
+# iterations    - BiCGSTAB iterations used
+# residual      - final max |A x - p|
+QuasiDistribution = namedtuple('QuasiDistribution', 'num_qubits outcomes probabilities '
+                                                    'iterations residual')
+
+
+def _check_calibration(num_qubits, blocks, matrices):
+    """Validate a block partition and its column-stochastic matrices"""
+    qubits = sorted(q for block in blocks for q in block)
+    if qubits != list(range(num_qubits)):
+        raise ValueError(f"Blocks must partition qubits 0-{num_qubits - 1}, got {blocks}")
+    for block, matrix in zip(blocks, matrices):
+        size = 2 ** len(block)
+        if matrix.shape != (size, size):
+            raise ValueError(f"Block {block} needs a {size}x{size} matrix, got {matrix.shape}")
+        if np.any(matrix < 0) or not np.allclose(matrix.sum(axis=0), 1.0, atol=1e-6):
+            raise ValueError(f"Columns of the block {block} matrix must be probabilities")
+
+
+def calibration(blocks, matrices):
+    """ReadoutCalibration from qubit blocks and their assignment matrices"""
+    blocks = tuple(tuple(int(q) for q in block) for block in blocks)
+    matrices = tuple(np.asarray(matrix, dtype=float) for matrix in matrices)
+    num_qubits = sum(len(block) for block in blocks)
+    _check_calibration(num_qubits, blocks, matrices)
+    return ReadoutCalibration(num_qubits, blocks, matrices)
+
+
+def from_error_rates(p01, p10):
+    """Per-qubit calibration from P(read 1 | prepared 0) and P(read 0 | prepared 1)"""
+    p01, p10 = np.atleast_1d(np.asarray(p01, dtype=float)), np.atleast_1d(np.asarray(p10, dtype=float))
+    if p01.shape != p10.shape:
+        raise ValueError("p01 and p10 need one rate per qubit each")
+    matrices = [np.array([[1 - e0, e1], [e0, 1 - e1]]) for e0, e1 in zip(p01, p10)]
+    return calibration([(q,) for q in range(len(p01))], matrices)
+
+
+def from_calibration_counts(counts_by_preparation, blocks=None):
+    """Calibration from counts of circuits that prepare known basis states
+
+    counts_by_preparation maps prepared bitstrings to counts dicts (or
+    PackedCounts). With blocks=None every qubit is its own block, and the
+    usual two circuits, all-zeros and all-ones, are enough. For correlated
+    blocks every block state must be prepared in at least one circuit; the
+    standard tensored scheme prepares all 2^k states of every block in
+    parallel over 2^k circuits.
+    """
+    prepared = list(counts_by_preparation)
+    num_qubits = len(prepared[0].replace(' ', ''))
+    blocks = tuple((q,) for q in range(num_qubits)) if blocks is None \
+        else tuple(tuple(block) for block in blocks)
+    totals = [np.zeros((2 ** len(block), 2 ** len(block))) for block in blocks]
+    for label in prepared:
+        counts = counts_by_preparation[label]
+        if not isinstance(counts, packed_counts.PackedCounts):
+            counts = packed_counts.from_counts(counts, num_qubits)
+        measured = block_states(counts.outcomes, num_qubits, blocks)
+        target = block_states(packed_counts.pack_bitstrings([label], num_qubits), num_qubits, blocks)[0]
+        for b, total in enumerate(totals):
+            total[:, target[b]] += np.bincount(measured[:, b], weights=counts.counts,
+                                               minlength=len(total))
+    missing = [(block, np.flatnonzero(total.sum(axis=0) == 0).tolist())
+               for block, total in zip(blocks, totals) if np.any(total.sum(axis=0) == 0)]
+    if missing:
+        raise ValueError(f"Block states never prepared: {missing}")
+    return calibration(blocks, [total / total.sum(axis=0) for total in totals])
+
+
+def load_calibration(source):
+    """Calibration from JSON data (a dict or a path)
+
+    Accepts {"p01": [...], "p10": [...]} per-qubit error rates, or
+    {"blocks": [[0, 1], [2]], "matrices": [...]} correlated blocks.
+    """
+    if not isinstance(source, dict):
+        with open(source) as f:
+            source = json.load(f)
+    if 'p01' in source:
+        return from_error_rates(source['p01'], source['p10'])
+    return calibration(source['blocks'], source['matrices'])
+
+
+def block_states(outcomes, num_qubits, blocks):
+    """(num_outcomes, num_blocks) state index of every block in every outcome"""
+    bits = packed_counts.unpack_bits(outcomes, num_qubits)
+    states = np.zeros((len(bits), len(blocks)), dtype=np.int64)
+    for b, block in enumerate(blocks):
+        weights = 1 << np.arange(len(block), dtype=np.int64)
+        states[:, b] = bits[:, list(block)].astype(np.int64) @ weights
+    return states
+
+
+def _block_offsets(blocks):
+    """Start of each block's states in the concatenated one-hot layout"""
+    sizes = [2 ** len(block) for block in blocks]
+    return np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64), sum(sizes)
+
+
+def _block_products(row_states, col_states, tables, blocks):
+    """(rows, cols) matrix of prod_b tables[b][row_states[:, b], col_states[:, b]]
+
+    The product is taken in the log domain as one matrix product over
+    one-hot block states, so it runs at BLAS speed instead of a gather per
+    block. Signs and exact zeros are tracked by two more products.
+    """
+    offsets, width = _block_offsets(blocks)
+    rows = np.zeros((len(row_states), width))
+    rows[np.arange(len(row_states))[:, None], offsets + row_states] = 1.0
+    cols = np.zeros((len(col_states), width))
+    cols[np.arange(len(col_states))[:, None], offsets + col_states] = 1.0
+
+    magnitude = np.zeros((width, width))
+    negative = np.zeros((width, width))
+    zero = np.zeros((width, width))
+    for offset, table in zip(offsets, tables):
+        size = len(table)
+        window = (slice(offset, offset + size), slice(offset, offset + size))
+        with np.errstate(divide='ignore'):
+            magnitude[window] = np.where(table != 0, np.log(np.abs(table)), 0.0)
+        negative[window] = table < 0
+        zero[window] = table == 0
+
+    log_abs = (rows @ magnitude) @ cols.T
+    sign = 1.0 - 2.0 * (np.rint((rows @ negative) @ cols.T) % 2)
+    nonzero = np.rint((rows @ zero) @ cols.T) == 0
+    return np.where(nonzero, sign * np.exp(log_abs), 0.0)
+
+
+def _chunked_sums(row_states, col_states, tables, blocks, weights):
+    """prod_b tables[...] summed over columns with weights, in bounded-size chunks"""
+    step = max(1, CHUNK_ELEMENTS // max(1, len(col_states)))
+    return np.concatenate([
+        _block_products(row_states[start:start + step], col_states, tables, blocks) @ weights
+        for start in range(0, len(row_states), step)
+    ]) if len(row_states) else np.zeros(0)
+
+
+def _parity_tables(cal):
+    """Per block: T[mask, state] = sum_b A^-1[b, state] (-1)^popcount(b & mask)"""
+    tables = []
+    for block, matrix in zip(cal.blocks, cal.matrices):
+        size = 2 ** len(block)
+        states = np.arange(size)
+        signs = 1 - 2 * (packed_counts.popcount((states[:, None] & states[None, :]).astype(np.uint64)) & 1)
+        tables.append(signs @ np.linalg.inv(matrix))
+    return tables
+
+
+def _mask_states(masks, num_qubits, blocks):
+    """Block state indices of observable masks given as qubit lists or packed rows"""
+    if isinstance(masks, np.ndarray) and masks.ndim == 2 and masks.dtype.kind == 'u':
+        packed = masks
+    else:
+        bits = np.zeros((len(masks), num_qubits), dtype=bool)
+        for row, qubits in enumerate(masks):
+            bits[row, list(qubits)] = True
+        packed = packed_counts.pack_bits(bits)
+    return block_states(packed, num_qubits, blocks)
+
+
+def mitigated_parities(counts, cal, masks=None):
+    """Readout-mitigated <Z...Z> for each mask (default: all qubits)
+
+    counts is a PackedCounts; masks is a list of qubit lists or a packed
+    (num_masks, num_words) array. Thousands of masks are evaluated as one
+    batched product over the observed outcomes.
+    """
+    masks = [range(counts.num_qubits)] if masks is None else masks
+    weights = counts.counts / packed_counts.total_shots(counts)
+    return _chunked_sums(_mask_states(masks, cal.num_qubits, cal.blocks),
+                         block_states(counts.outcomes, cal.num_qubits, cal.blocks),
+                         _parity_tables(cal), cal.blocks, weights)
+
+
+def mitigated_probabilities(counts, cal, targets):
+    """Mitigated quasi-probability of each target bitstring (exact tensored inverse)"""
+    if not isinstance(targets, np.ndarray):
+        targets = packed_counts.pack_bitstrings(list(targets), counts.num_qubits)
+    weights = counts.counts / packed_counts.total_shots(counts)
+    inverses = [np.linalg.inv(matrix) for matrix in cal.matrices]
+    return _chunked_sums(block_states(targets, cal.num_qubits, cal.blocks),
+                         block_states(counts.outcomes, cal.num_qubits, cal.blocks),
+                         inverses, cal.blocks, weights)
+
+
+def mitigated_ghz_populations(counts, cal):
+    """Mitigated (P(0...0), P(1...1)); their sum is the GHZ population fidelity"""
+    n = counts.num_qubits
+    zeros, ones = mitigated_probabilities(counts, cal, ['0' * n, '1' * n])
+    return float(zeros), float(ones)
+
+
+def basis_parities(outcomes, weights, basis_index, num_bases, cal):
+    """Mitigated full parity and its standard error for counts of many bases
+
+    outcomes, weights and basis_index are flattened over all bases (as from
+    mermin.parse_counts). Each basis's expectation is a weighted mean of
+    per-outcome factors, so its standard error follows from their spread.
+    """
+    outcomes = np.asarray(outcomes)
+    if outcomes.ndim == 1:
+        outcomes = outcomes[:, None]
+    states = block_states(outcomes, cal.num_qubits, cal.blocks)
+    full = [2 ** len(block) - 1 for block in cal.blocks]
+    factors = np.ones(len(states))
+    for b, table in enumerate(_parity_tables(cal)):
+        factors *= table[full[b], states[:, b]]
+
+    shots = np.bincount(basis_index, weights=weights, minlength=num_bases)
+    if np.any(shots <= 0):
+        raise ValueError("Every basis needs at least one shot")
+    mean = np.bincount(basis_index, weights=weights * factors, minlength=num_bases) / shots
+    second = np.bincount(basis_index, weights=weights * factors ** 2, minlength=num_bases) / shots
+    return mean, np.sqrt(np.maximum(second - mean ** 2, 0.0) / shots)
+
+
+def _sort_keys(outcomes):
+    """Byte keys whose order is the numeric order of packed outcome rows"""
+    big_endian = np.ascontiguousarray(outcomes[:, ::-1]).astype(outcomes.dtype.newbyteorder('>'))
+    return big_endian.view(np.dtype((np.void, big_endian.itemsize * outcomes.shape[1]))).ravel()
+
+
+def _flip_masks(num_qubits, distance, dtype):
+    """Packed masks of every set of at most `distance` qubits"""
+    rows = [()] + [combo for d in range(1, distance + 1)
+                   for combo in itertools.combinations(range(num_qubits), d)]
+    bits = np.zeros((len(rows), num_qubits), dtype=bool)
+    for row, qubits in enumerate(rows):
+        bits[row, list(qubits)] = True
+    return packed_counts.pack_bits(bits, dtype)
+
+
+def reduced_matrix(counts, cal, distance=DEFAULT_DISTANCE):
+    """Sparse assignment matrix restricted to the observed outcomes
+
+    Returns (rows, cols, values, diagonal) in coordinate form, columns
+    renormalised to sum to one. Only outcome pairs within `distance` bit
+    flips are coupled, found by looking up every flip of every outcome.
+    """
+    outcomes = counts.outcomes
+    keys = _sort_keys(outcomes)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    flips = _flip_masks(cal.num_qubits, distance, outcomes.dtype)
+    states = block_states(outcomes, cal.num_qubits, cal.blocks)
+
+    rows, cols = [], []
+    step = max(1, CHUNK_ELEMENTS // len(flips))
+    for start in range(0, len(outcomes), step):
+        chunk = outcomes[start:start + step]
+        neighbours = (chunk[:, None, :] ^ flips[None, :, :]).reshape(-1, outcomes.shape[1])
+        neighbour_keys = _sort_keys(neighbours)
+        position = np.minimum(np.searchsorted(sorted_keys, neighbour_keys), len(keys) - 1)
+        found = sorted_keys[position] == neighbour_keys
+        rows.append(order[position[found]])
+        cols.append(start + np.flatnonzero(found) // len(flips))
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+
+    values = np.ones(len(rows))
+    for b, matrix in enumerate(cal.matrices):
+        values *= matrix[states[rows, b], states[cols, b]]
+    values /= np.bincount(cols, weights=values, minlength=len(outcomes))[cols]
+    diagonal = np.zeros(len(outcomes))
+    on_diagonal = rows == cols
+    diagonal[cols[on_diagonal]] = values[on_diagonal]
+    return rows, cols, values, diagonal
+
+
+def _bicgstab(matvec, rhs, diagonal, tolerance, max_iterations):
+    """Jacobi-preconditioned BiCGSTAB; returns (x, iterations, residual)"""
+    x = rhs / diagonal
+    r = rhs - matvec(x)
+    r_hat = r.copy()
+    rho = alpha = omega = 1.0
+    v = p = np.zeros_like(rhs)
+    for iteration in range(1, max_iterations + 1):
+        rho_next = r_hat @ r
+        if rho_next == 0:
+            break
+        beta = (rho_next / rho) * (alpha / omega)
+        p = r + beta * (p - omega * v)
+        y = p / diagonal
+        v = matvec(y)
+        alpha = rho_next / (r_hat @ v)
+        x = x + alpha * y
+        s = r - alpha * v
+        if np.abs(s).max() < tolerance:
+            return x, iteration, np.abs(s).max()
+        z = s / diagonal
+        t = matvec(z)
+        omega = (t @ s) / (t @ t)
+        x = x + omega * z
+        r = s - omega * t
+        rho = rho_next
+        if np.abs(r).max() < tolerance:
+            break
+    return x, iteration, np.abs(rhs - matvec(x)).max()
+
+
+def quasi_probabilities(counts, cal, distance=DEFAULT_DISTANCE,
+                        tolerance=SOLVER_TOLERANCE, max_iterations=SOLVER_MAX_ITERATIONS):
+    """M3-style mitigated quasi-distribution over the observed outcomes"""
+    rows, cols, values, diagonal = reduced_matrix(counts, cal, distance)
+    size = len(counts.counts)
+    probabilities = counts.counts / packed_counts.total_shots(counts)
+
+    def matvec(x):
+        return np.bincount(rows, weights=values * x[cols], minlength=size)
+
+    x, iterations, residual = _bicgstab(matvec, probabilities, diagonal, tolerance, max_iterations)
+    return QuasiDistribution(counts.num_qubits, counts.outcomes, x, iterations, residual)
+
+
+def nearest_probabilities(quasi):
+    """Closest probability distribution (L2) to a quasi-distribution
+
+    Negative mass is removed from the smallest entries upward and spread
+    evenly over the rest (Smolin, Gambetta and Smith, PRL 108, 070502).
+    """
+    quasi = np.asarray(quasi, dtype=float)
+    order = np.argsort(quasi)
+    values = quasi[order]
+    result = np.zeros_like(values)
+    deficit = 0.0
+    remaining = len(values)
+    for i, value in enumerate(values):
+        if value + deficit / remaining >= 0:
+            result[i:] = values[i:] + deficit / remaining
+            break
+        deficit += value
+        remaining -= 1
+    probabilities = np.empty_like(result)
+    probabilities[order] = result
+    return probabilities / probabilities.sum()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Schrödinger Tunneling
+1D Gamow-style tunneling through a rectangular barrier (hbar = m = 1)
+
+Wave packets are evolved with the FFT split-operator method,
+    psi <- e^{-iV dt/2} IFFT[ e^{-ik^2 dt/2} FFT[ e^{-iV dt/2} psi ] ],
+on a periodic grid with absorbing layers at both ends. Many packets are
+evolved at once as one (batch, n_grid) array, one row per parameter set
+(barrier height V0, packet momentum k, ...), so a whole V0 x packet_k
+transmission grid costs one batched FFT per time step. Densities are only
+kept at the requested snapshot steps, so memory stays at a few rows of
+the batch no matter how many steps are taken.
+
+The transmission coefficient is the right-moving probability beyond the
+barrier at the end of the run, plus whatever the right absorbing layer
+took out of right-moving flux. The grid is periodic, so anything that
+leaks through the left layer re-enters at the right edge moving left.
+Sorting by the direction of the probability current keeps that wrapped
+density out of the transmission.
+
+The split-operator step is only accurate while the barrier's phase per
+step, V0 * dt, stays small; evolutions beyond MAX_POTENTIAL_PHASE raise
+ValueError rather than return meaningless coefficients.
+
+Usage:
+    python3 schrodinger_tunneling.py [export.json|export.swtn]
+    python3 schrodinger_tunneling.py --sweep sweep.json [--v0 8] [--k-min 1 --k-max 8 --k-points 300]
+                                     [--dt 0.001]
+"""
+
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from tunneling_container import CONTAINER_PATH, JSON_EXPORT_PATH, write_container
+
+# Parameters of the layers-336 export (also its metadata.params)
+DEFAULT_PARAMS = {
+    'n_grid': 512,
+    'x_min': -4.0,
+    'x_max': 8.0,
+    'V0': 8.0,
+    'x_barrier_left': 0.0,
+    'x_barrier_right': 2.0,
+    'packet_center': -2.0,
+    'packet_sigma': 0.5,
+    'packet_k': 4.0,
+    'dt': 0.005,
+    'num_steps': 800,
+}
+
+# Snapshots written to the export, evenly spaced over the run
+EXPORT_SNAPSHOTS = 11
+
+# The layers-336 front end samples at most this many grid points
+EXPORT_MAX_POINTS = 500
+
+# Width of the absorbing layer at each end of the grid
+ABSORB_WIDTH = 1.0
+
+# Largest potential phase per time step, max|V| * dt, in radians. The
+# split-operator step at the barrier edges leaks spurious high-k density
+# over it, growing with this phase: an opaque V0 = 50 barrier shows
+# T ~ 5e-3 at 0.25 rad but under 1e-3 at 0.1 rad
+MAX_POTENTIAL_PHASE = 0.1
+
+# Rows evolved together by sweep_transmission; bounds memory to about
+# 3 x SWEEP_BATCH x n_grid complex values
+SWEEP_BATCH = 256
+
+# psi             - (batch, n_grid) wave functions at the end of the run
+# snapshot_steps  - steps at which densities were kept
+# snapshots       - (num_snapshots, batch, n_grid) |psi|^2 at those steps
+# absorbed_left   - (batch,) left-moving probability taken out by the left boundary
+# absorbed_right  - (batch,) right-moving probability taken out by the right boundary
+Evolution = namedtuple('Evolution', 'psi snapshot_steps snapshots absorbed_left absorbed_right')
+
+
+def make_grid(n_grid, x_min, x_max):
+    """Periodic grid points and FFT wave numbers"""
+    x = np.linspace(x_min, x_max, n_grid, endpoint=False)
+    k = 2 * np.pi * np.fft.fftfreq(n_grid, d=x[1] - x[0])
+    return x, k
+
+
+def barrier_potential(x, V0, x_left, x_right):
+    """Rectangular barriers, one row per entry of V0"""
+    V0 = np.atleast_1d(np.asarray(V0, dtype=float))
+    inside = (x >= x_left) & (x <= x_right)
+    return V0[:, None] * inside[None, :]
+
+
+def gaussian_packet(x, center, sigma, k0):
+    """Normalised Gaussian packets, one row per entry of the broadcast arguments"""
+    center, sigma, k0 = (np.atleast_1d(np.asarray(a, dtype=float)) for a in (center, sigma, k0))
+    center, sigma, k0 = np.broadcast_arrays(center, sigma, k0)
+    offset = x[None, :] - center[:, None]
+    psi = np.exp(-offset ** 2 / (4 * sigma[:, None] ** 2) + 1j * k0[:, None] * x[None, :])
+    dx = x[1] - x[0]
+    return psi / np.sqrt((np.abs(psi) ** 2).sum(axis=1, keepdims=True) * dx)
+
+
+def absorbing_mask(x, width=ABSORB_WIDTH):
+    """cos^(1/8) mask that is 1 inside the grid and fades to 0 at both ends"""
+    mask = np.ones_like(x)
+    if width <= 0:
+        return mask
+    left = x < x[0] + width
+    right = x > x[-1] - width
+    mask[left] = np.cos(0.5 * np.pi * (x[0] + width - x[left]) / width) ** 0.125
+    mask[right] = np.cos(0.5 * np.pi * (x[right] - x[-1] + width) / width) ** 0.125
+    return mask
+
+
+def probability_current(psi, dx):
+    """j = Im(psi* dpsi/dx) per grid point (periodic central difference)"""
+    dpsi = (np.roll(psi, -1, axis=-1) - np.roll(psi, 1, axis=-1)) / (2 * dx)
+    return (np.conj(psi) * dpsi).imag
+
+
+def check_time_step(potential, dt):
+    """Raise ValueError when dt cannot resolve the potential's phase"""
+    phase = float(np.max(np.abs(potential))) * dt
+    if phase > MAX_POTENTIAL_PHASE:
+        raise ValueError(f"max|V| * dt = {phase:.3g} exceeds {MAX_POTENTIAL_PHASE}; "
+                         f"use dt <= {MAX_POTENTIAL_PHASE / float(np.max(np.abs(potential))):.3g}")
+
+
+def iter_evolution(x, potential, psi0, dt, num_steps, absorb_width=ABSORB_WIDTH):
+    """Yield (step, psi, absorbed_left, absorbed_right) from step 0 to num_steps
+
+    The yielded arrays are the live state of the evolution; copy anything
+    that must outlive the next step. Nothing is kept between steps, so an
+    animation can draw every step without storing any of them.
+    """
+    check_time_step(potential, dt)
+    dx = x[1] - x[0]
+    k = 2 * np.pi * np.fft.fftfreq(len(x), d=dx)
+    psi = np.array(np.broadcast_to(psi0, np.broadcast_shapes(np.shape(psi0), np.shape(potential))),
+                   dtype=complex)
+    half_potential = np.exp(-0.5j * dt * np.asarray(potential))
+    kinetic = np.exp(-0.5j * dt * k ** 2)[None, :]
+    mask = absorbing_mask(x, absorb_width)
+    centre = len(x) // 2
+    loss = 1 - mask ** 2
+    absorbed_left = np.zeros(len(psi))
+    absorbed_right = np.zeros(len(psi))
+
+    for step in range(num_steps + 1):
+        yield step, psi, absorbed_left, absorbed_right
+        if step == num_steps:
+            break
+        psi *= half_potential
+        psi = np.fft.ifft(kinetic * np.fft.fft(psi, axis=1), axis=1)
+        psi *= half_potential
+        # Account for what the absorbing layers remove from outgoing flux;
+        # incoming flux at either edge has wrapped around from the other
+        density = np.abs(psi) ** 2 * loss
+        rightward = probability_current(psi, dx) > 0
+        absorbed_left += np.where(rightward, 0, density)[:, :centre].sum(axis=1) * dx
+        absorbed_right += np.where(rightward, density, 0)[:, centre:].sum(axis=1) * dx
+        psi *= mask
+
+
+def evolve(x, potential, psi0, dt, num_steps, snapshot_steps=(), absorb_width=ABSORB_WIDTH):
+    """Split-operator evolution of a batch of wave packets
+
+    potential and psi0 are (batch, n_grid) arrays (or broadcastable to it).
+    Densities are recorded after each step listed in snapshot_steps (0 is
+    the initial state).
+    """
+    wanted = sorted(set(int(step) for step in snapshot_steps))
+    snapshots = None
+    taken = 0
+    for step, psi, absorbed_left, absorbed_right in iter_evolution(x, potential, psi0, dt,
+                                                                   num_steps, absorb_width):
+        if snapshots is None:
+            snapshots = np.empty((len(wanted),) + psi.shape)
+        if taken < len(wanted) and wanted[taken] == step:
+            snapshots[taken] = np.abs(psi) ** 2
+            taken += 1
+
+    return Evolution(psi, wanted[:taken], snapshots[:taken], absorbed_left, absorbed_right)
+
+
+def transmitted(x, psi, absorbed_right, x_right):
+    """Right-moving probability beyond x_right plus what the right layer absorbed"""
+    dx = x[1] - x[0]
+    outgoing = probability_current(psi, dx) > 0
+    density = np.where(outgoing, np.abs(psi) ** 2, 0)
+    return density[..., x > x_right].sum(axis=-1) * dx + absorbed_right
+
+
+def transmission(x, evolution, x_right):
+    """Probability that ended up beyond the barrier, per batch row"""
+    return transmitted(x, evolution.psi, evolution.absorbed_right, x_right)
+
+
+def sweep_transmission(V0_values, k_values, batch_size=SWEEP_BATCH, **params):
+    """Transmission coefficients for every (V0, packet_k) pair
+
+    Returns a (len(V0_values), len(k_values)) array. Pairs are evolved
+    batch_size rows at a time; other parameters default to DEFAULT_PARAMS.
+    """
+    p = dict(DEFAULT_PARAMS, **params)
+    V0_grid, k_grid = np.meshgrid(np.asarray(V0_values, dtype=float),
+                                  np.asarray(k_values, dtype=float), indexing='ij')
+    x, _ = make_grid(p['n_grid'], p['x_min'], p['x_max'])
+    result = np.empty(V0_grid.size)
+    flat_V0, flat_k = V0_grid.ravel(), k_grid.ravel()
+    for start in range(0, len(result), batch_size):
+        rows = slice(start, start + batch_size)
+        potential = barrier_potential(x, flat_V0[rows], p['x_barrier_left'], p['x_barrier_right'])
+        psi0 = gaussian_packet(x, p['packet_center'], p['packet_sigma'], flat_k[rows])
+        evolution = evolve(x, potential, psi0, p['dt'], p['num_steps'])
+        result[rows] = transmission(x, evolution, p['x_barrier_right'])
+    return result.reshape(V0_grid.shape)
+
+
+def run_simulation(num_snapshots=EXPORT_SNAPSHOTS, **params):
+    """Evolve one packet and return (x, potential, times, densities, params)"""
+    p = dict(DEFAULT_PARAMS, **params)
+    x, _ = make_grid(p['n_grid'], p['x_min'], p['x_max'])
+    potential = barrier_potential(x, p['V0'], p['x_barrier_left'], p['x_barrier_right'])
+    psi0 = gaussian_packet(x, p['packet_center'], p['packet_sigma'], p['packet_k'])
+    steps = np.linspace(0, p['num_steps'], num_snapshots).round().astype(int)
+    evolution = evolve(x, potential, psi0, p['dt'], p['num_steps'], steps)
+    p['transmission'] = float(transmission(x, evolution, p['x_barrier_right'])[0])
+    times = [float(step * p['dt']) for step in evolution.snapshot_steps]
+    return x, potential[0], times, evolution.snapshots[:, 0], p
+
+
+def export_for_layers_336(output_path=JSON_EXPORT_PATH, max_points=EXPORT_MAX_POINTS, **params):
+    """Run the default simulation and write the layers-336 export
+
+    A path ending in .swtn writes the binary container instead of JSON.
+    Returns the export's metadata.params.
+    """
+    x, potential, times, densities, p = run_simulation(**params)
+    if len(x) > max_points:
+        # Resample onto at most max_points for the front end
+        x_out = np.linspace(x[0], x[-1], max_points)
+        potential = np.interp(x_out, x, potential)
+        densities = np.array([np.interp(x_out, x, density) for density in densities])
+        x = x_out
+
+    metadata = {
+        'description': '1D Schrödinger tunneling (Gamow-style) for layers-336 visual',
+        'units': 'hbar=1, m=1',
+        'params': p,
+    }
+    if output_path.endswith('.swtn'):
+        write_container(output_path, x, potential, densities, times, metadata)
+        return p
+
+    export = {
+        'metadata': metadata,
+        'x': x.tolist(),
+        'potential': potential.tolist(),
+        'probability_density': densities.tolist(),
+        'times': times,
+    }
+    with open(output_path, 'w') as f:
+        json.dump(export, f, indent=2)
+    return p
+
+
+def main(argv=None):
+    """Write the layers-336 export, or a transmission sweep with --sweep"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('output_path', nargs='?', default=JSON_EXPORT_PATH,
+                        help=f'export path; .swtn writes the binary container (e.g. {CONTAINER_PATH})')
+    parser.add_argument('--sweep', metavar='PATH',
+                        help='write transmission vs packet energy for a V0 x packet_k grid as JSON')
+    parser.add_argument('--v0', type=float, nargs='+', default=[DEFAULT_PARAMS['V0']],
+                        help='barrier heights for --sweep')
+    parser.add_argument('--k-min', type=float, default=1.0)
+    parser.add_argument('--k-max', type=float, default=8.0)
+    parser.add_argument('--k-points', type=int, default=300)
+    parser.add_argument('--dt', type=float,
+                        help='time step for --sweep (same total time); tall barriers need '
+                             f'max(V0) * dt <= {MAX_POTENTIAL_PHASE}')
+    args = parser.parse_args(argv)
+
+    if args.sweep:
+        params = dict(DEFAULT_PARAMS)
+        if args.dt:
+            duration = params['dt'] * params['num_steps']
+            params.update(dt=args.dt, num_steps=int(round(duration / args.dt)))
+        k_values = np.linspace(args.k_min, args.k_max, args.k_points)
+        try:
+            curves = sweep_transmission(args.v0, k_values, **params)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        with open(args.sweep, 'w') as f:
+            json.dump({
+                'params': params,
+                'V0': args.v0,
+                'packet_k': k_values.tolist(),
+                'energy': (k_values ** 2 / 2).tolist(),
+                'transmission': curves.tolist(),
+            }, f, indent=2)
+        print(f"✅ Wrote {args.sweep} ({curves.size} transmission coefficients)")
+        return 0
+
+    params = export_for_layers_336(args.output_path)
+    print(f"✅ Wrote {args.output_path}")
+    print(f"   Transmission: {params['transmission']:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
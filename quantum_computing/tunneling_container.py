@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tunneling Container
+Compact binary export of the Schrödinger tunneling data for layers-336
+
+The JSON export repeats every density frame as a pretty-printed float list,
+so its size and parse time grow with the number of snapshots. The
+container stores the same data as typed arrays behind a small JSON header:
+
+    offset 0   4 bytes   magic b'SWTN'
+    offset 4   uint32    header length H (little endian)
+    offset 8   H bytes   UTF-8 JSON header, space padded to a multiple of 8
+    ...        arrays    x and potential (float32), then all density frames
+
+The header keeps the JSON export's `metadata` block unchanged and records
+`times`, the dtype/shape/byte offset of each array, and the frame chunks:
+byte ranges of `chunk_frames` consecutive frames that a client can fetch
+with HTTP Range requests and view as Float32Array/Float16 data without
+copying. Every array starts on an 8-byte boundary and frames are stored
+back to back (float16 or float32, little endian), so the Python reader
+maps the whole frame block as one np.memmap.
+
+Usage:
+    python3 tunneling_container.py [export.json] [output.swtn] [--dtype float16|float32]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b'SWTN'
+VERSION = 1
+
+# Frame dtypes the container (and the JS decoder) understand
+FRAME_DTYPES = ('float16', 'float32')
+
+# Frames per chunk; a chunk is the unit a streaming client fetches
+CHUNK_FRAMES = 4
+
+# Default input and output, next to each other in data/
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+JSON_EXPORT_PATH = os.path.join(DATA_DIR, 'schrodinger_tunneling_export.json')
+CONTAINER_PATH = os.path.join(DATA_DIR, 'schrodinger_tunneling_export.swtn')
+
+# header - parsed JSON header
+# x, potential - float32 arrays (memory-mapped)
+# times  - float array of frame times
+# frames - (num_frames, num_points) memory-mapped density frames
+TunnelingData = namedtuple('TunnelingData', 'header x potential times frames')
+
+
+def _align(offset, alignment=8):
+    """Round offset up to a multiple of alignment"""
+    return -(-offset // alignment) * alignment
+
+
+def write_container(path, x, potential, frames, times, metadata, dtype='float16',
+                    chunk_frames=CHUNK_FRAMES):
+    """Write a tunneling container, returning its size in bytes"""
+    if dtype not in FRAME_DTYPES:
+        raise ValueError(f"Frame dtype must be one of {FRAME_DTYPES}, got {dtype!r}")
+    x = np.ascontiguousarray(x, dtype='<f4')
+    potential = np.ascontiguousarray(potential, dtype='<f4')
+    frames = np.ascontiguousarray(frames, dtype='<f2' if dtype == 'float16' else '<f4')
+    if frames.ndim != 2 or frames.shape[1] != len(x) or len(potential) != len(x):
+        raise ValueError(f"Frames must be (num_frames, {len(x)}), got {frames.shape}")
+    if len(times) != len(frames):
+        raise ValueError(f"Got {len(times)} times for {len(frames)} frames")
+
+    arrays = (('x', x), ('potential', potential), ('frames', frames))
+    frame_bytes = frames.shape[1] * frames.itemsize
+    # The header records absolute offsets, which depend on the header's own
+    # length; grow the data start until the encoded header fits before it
+    data_start = 8
+    while True:
+        layout, offset = {}, data_start
+        for name, array in arrays:
+            layout[name] = {'dtype': array.dtype.name, 'shape': list(array.shape), 'offset': offset}
+            offset = _align(offset + array.nbytes)
+        chunks = []
+        for start in range(0, len(frames), chunk_frames):
+            stop = min(start + chunk_frames, len(frames))
+            chunks.append({'frames': [start, stop],
+                           'offset': layout['frames']['offset'] + start * frame_bytes,
+                           'length': (stop - start) * frame_bytes})
+        header = {
+            'version': VERSION,
+            'metadata': metadata,
+            'times': [float(t) for t in times],
+            'arrays': layout,
+            'chunks': chunks,
+        }
+        encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        if 8 + len(encoded) <= data_start:
+            break
+        data_start = _align(8 + len(encoded))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', data_start - 8))
+        f.write(encoded.ljust(data_start - 8, b' '))
+        for name, array in arrays:
+            f.seek(layout[name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def read_header(path):
+    """Parse a container's JSON header without touching the arrays"""
+    with open(path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) != 8 or prefix[:4] != MAGIC:
+            raise ValueError(f"{path} is not a tunneling container")
+        (length,) = struct.unpack('<I', prefix[4:])
+        header = json.loads(f.read(length))
+    if header.get('version') != VERSION:
+        raise ValueError(f"Unsupported container version {header.get('version')}")
+    return header
+
+
+def read_container(path):
+    """Memory-map a container; frames are read from disk only when indexed"""
+    header = read_header(path)
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        arrays[name] = np.memmap(path, dtype=np.dtype(spec['dtype']).newbyteorder('<'),
+                                 mode='r', offset=spec['offset'], shape=tuple(spec['shape']))
+    return TunnelingData(header, arrays['x'], arrays['potential'],
+                         np.asarray(header['times']), arrays['frames'])
+
+
+def convert_json(json_path=JSON_EXPORT_PATH, output_path=CONTAINER_PATH, dtype='float16',
+                 chunk_frames=CHUNK_FRAMES):
+    """Convert a JSON tunneling export to a container, returning its size"""
+    with open(json_path) as f:
+        export = json.load(f)
+    return write_container(output_path, export['x'], export['potential'],
+                           export['probability_density'], export['times'],
+                           export.get('metadata', {}), dtype, chunk_frames)
+
+
+def main(argv=None):
+    """Convert the JSON export to the binary container"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('json_path', nargs='?', default=JSON_EXPORT_PATH)
+    parser.add_argument('output_path', nargs='?', default=CONTAINER_PATH)
+    parser.add_argument('--dtype', choices=FRAME_DTYPES, default='float16',
+                        help='density frame precision (default: float16)')
+    parser.add_argument('--chunk-frames', type=int, default=CHUNK_FRAMES,
+                        help=f'frames per streamable chunk (default: {CHUNK_FRAMES})')
+    args = parser.parse_args(argv)
+
+    size = convert_json(args.json_path, args.output_path, args.dtype, args.chunk_frames)
+    data = read_container(args.output_path)
+    print(f"✅ Wrote {args.output_path}")
+    print(f"   {len(data.frames)} frames x {len(data.x)} points ({args.dtype}), "
+          f"{len(data.header['chunks'])} chunks, {size:,} bytes "
+          f"(JSON: {os.path.getsize(args.json_path):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
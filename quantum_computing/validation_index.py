@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Validation Index
+Checked, sharded and summarized build of hardware_validations.json
+
+hardware_validations.json is maintained by hand, one record per IBM Quantum
+run, and grows with every run. This build step:
+  - checks every record against SCHEMA (types, required fields, ISO dates,
+    unique ids, parseable fidelity and execution time)
+  - parses fidelity ("84%", "70-75%") and executionTime ("~8s", "~30-40s")
+    into numbers, stored next to the original strings
+  - writes one shard per category and per backend, and a small summary
+    index (counts, best fidelity per qubit count, date histograms) that
+    hardware-validation.html loads instead of the whole file
+
+    data/validations/index.json
+    data/validations/category/<category>.json
+    data/validations/backend/<backend>.json
+
+Shard records keep every original field, plus `index` (position in the
+source file), `fidelityValue` (lower end of the quoted range, in percent),
+`fidelityRange` and `executionSeconds` ([low, high]). Files are only
+rewritten when their content changes.
+
+Usage:
+    python3 validation_index.py            # check, write shards, draw charts
+    python3 validation_index.py --check    # check only, exit 1 on errors
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter, namedtuple
+from datetime import date
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VALIDATIONS_PATH = os.path.join(REPO_DIR, 'hardware_validations.json')
+INDEX_DIR = os.path.join(REPO_DIR, 'data', 'validations')
+INDEX_VERSION = 1
+
+# Shard dimensions: record field -> directory under INDEX_DIR
+SHARD_KEYS = {'category': 'category', 'backend': 'backend'}
+
+# Field -> (expected type, required)
+SCHEMA = {
+    'id': (str, True),
+    'category': (str, True),
+    'title': (str, True),
+    'backend': (str, True),
+    'qubits': (int, True),
+    'fidelity': (str, True),
+    'jobId': (str, True),
+    'date': (str, True),
+    'executionTime': (str, True),
+    'description': (str, True),
+    'isImportant': (bool, False),
+    'media': (dict, False),
+    'video': (dict, False),
+    'links': (list, False),
+    'shots': (int, False),
+    'mermin': (dict, False),
+    'ghzCounts': (dict, False),
+    'countsPath': (str, False),
+    'calibrationPath': (str, False),
+    'jobIds': (dict, False),
+    'notes': (str, False),
+}
+
+# Nested objects: field -> {key: type}, all keys required
+NESTED_SCHEMA = {
+    'media': {'type': str, 'path': str},
+    'video': {'path': str, 'available': bool},
+    'ghzCounts': {'allZeros': int, 'allOnes': int, 'shots': int},
+}
+
+# Largest allowed gap between a record's fidelity and its ghzCounts, in percent
+COUNTS_TOLERANCE = 1.0
+
+# Summary charts drawn by images/generate_images.py from this index
+CHART_FIGURES = ('fidelity-chart', 'validation-summary')
+
+# Parsed form of hardware_validations.json:
+#   records  - records in file order, with the parsed fields added
+#   errors   - schema violations (the build refuses to write with any)
+#   warnings - problems that do not block the build, e.g. missing media
+#   digest   - SHA-256 prefix of the source file
+ValidationSet = namedtuple('ValidationSet', 'records errors warnings digest')
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_FIDELITY_RE = re.compile(rf'^{_NUMBER}(?:\s*-\s*{_NUMBER})?\s*%$')
+_SECONDS_RE = re.compile(rf'^~?\s*{_NUMBER}(?:\s*-\s*{_NUMBER})?\s*s\b')
+
+
+def parse_fidelity(text):
+    """Parse '84%' or '70-75%' into a (low, high) percentage pair"""
+    match = _FIDELITY_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"Unrecognised fidelity {text!r}")
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    if not 0 <= low <= high <= 100:
+        raise ValueError(f"Fidelity {text!r} is not a range within 0-100%")
+    return low, high
+
+
+def parse_seconds(text):
+    """Parse '~8s', '~30-40s' or '~8s per batch' into a (low, high) pair of seconds"""
+    match = _SECONDS_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"Unrecognised execution time {text!r}")
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    if high < low:
+        raise ValueError(f"Execution time {text!r} has its range reversed")
+    return low, high
+
+
+def check_record(record, position):
+    """Return the schema errors of one record as strings"""
+    label = f"record {position} ({record.get('id', '?')})" if isinstance(record, dict) \
+        else f"record {position}"
+    if not isinstance(record, dict):
+        return [f"{label}: expected an object, got {type(record).__name__}"]
+
+    errors = []
+    for field, (types, required) in SCHEMA.items():
+        if field not in record:
+            if required:
+                errors.append(f"{label}: missing '{field}'")
+            continue
+        value = record[field]
+        # bool is an int subclass; qubits/shots must be real integers
+        if not isinstance(value, types) or (types is int and isinstance(value, bool)):
+            errors.append(f"{label}: '{field}' should be {types.__name__}, "
+                          f"got {type(value).__name__}")
+    for field in sorted(set(record) - set(SCHEMA)):
+        errors.append(f"{label}: unknown field '{field}'")
+    for field, keys in NESTED_SCHEMA.items():
+        if not isinstance(record.get(field), dict):
+            continue
+        for key, types in keys.items():
+            if not isinstance(record[field].get(key), types):
+                errors.append(f"{label}: '{field}.{key}' should be {types.__name__}")
+    if errors:
+        return errors
+
+    if record['qubits'] < 1:
+        errors.append(f"{label}: 'qubits' must be positive")
+    try:
+        date.fromisoformat(record['date'])
+    except ValueError:
+        errors.append(f"{label}: 'date' {record['date']!r} is not YYYY-MM-DD")
+    for field, parse in (('fidelity', parse_fidelity), ('executionTime', parse_seconds)):
+        try:
+            parse(record[field])
+        except ValueError as e:
+            errors.append(f"{label}: {e}")
+    if 'ghzCounts' in record and not errors:
+        counts = record['ghzCounts']
+        if counts['allZeros'] + counts['allOnes'] > counts['shots']:
+            errors.append(f"{label}: ghzCounts exceed their shots")
+        else:
+            measured = 100 * (counts['allZeros'] + counts['allOnes']) / counts['shots']
+            low, high = parse_fidelity(record['fidelity'])
+            if not low - COUNTS_TOLERANCE <= measured <= high + COUNTS_TOLERANCE:
+                errors.append(f"{label}: ghzCounts give {measured:.1f}% fidelity, "
+                              f"record says {record['fidelity']}")
+    return errors
+
+
+def load_validations(path=VALIDATIONS_PATH):
+    """Read, check and parse the validation records"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    records = json.loads(raw)
+    if not isinstance(records, list):
+        raise ValueError(f"{path} must hold a JSON array of records")
+
+    errors, warnings, parsed = [], [], []
+    seen = {}
+    for position, record in enumerate(records):
+        record_errors = check_record(record, position)
+        errors += record_errors
+        if record_errors:
+            continue
+        if record['id'] in seen:
+            errors.append(f"record {position} ({record['id']}): id already used by "
+                          f"record {seen[record['id']]}")
+            continue
+        seen[record['id']] = position
+        media = record.get('media')
+        if media and not os.path.exists(os.path.join(REPO_DIR, media['path'])):
+            warnings.append(f"record {position} ({record['id']}): media "
+                            f"{media['path']} not found")
+        if 'countsPath' in record and not os.path.exists(os.path.join(REPO_DIR, record['countsPath'])):
+            warnings.append(f"record {position} ({record['id']}): counts "
+                            f"{record['countsPath']} not found")
+        if 'calibrationPath' in record and not os.path.exists(os.path.join(REPO_DIR, record['calibrationPath'])):
+            warnings.append(f"record {position} ({record['id']}): calibration "
+                            f"{record['calibrationPath']} not found")
+        fidelity = parse_fidelity(record['fidelity'])
+        parsed.append(dict(record,
+                           index=position,
+                           fidelityValue=fidelity[0],
+                           fidelityRange=list(fidelity),
+                           executionSeconds=list(parse_seconds(record['executionTime']))))
+    return ValidationSet(parsed, errors, warnings, hashlib.sha256(raw).hexdigest()[:16])
+
+
+def _shard_name(value):
+    """File-safe shard name for a category or backend"""
+    return re.sub(r'[^a-z0-9_-]+', '-', value.lower()).strip('-') or 'unnamed'
+
+
+def _site_path(path):
+    """Path relative to the repository root, as the web pages fetch it"""
+    return os.path.relpath(path, REPO_DIR).replace(os.sep, '/')
+
+
+def _median(values):
+    """Median of a non-empty list"""
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def summarize(records):
+    """Summary statistics of parsed records (no shard paths)"""
+    measured = [record for record in records if record['category'] != 'seed']
+    best = {}
+    for record in measured:
+        current = best.get(record['qubits'])
+        if current is None or record['fidelityValue'] > current['fidelity']:
+            best[record['qubits']] = {'qubits': record['qubits'], 'fidelity': record['fidelityValue'],
+                                      'id': record['id'], 'backend': record['backend'],
+                                      'date': record['date']}
+    seconds = [sum(record['executionSeconds']) / 2 for record in records]
+    return {
+        'total': len(records),
+        'uniqueJobs': len({record['jobId'] for record in records}),
+        # Seed-generation runs report a nominal 1%/100% and are left out of
+        # the fidelity statistics, as on the validation page
+        'averageFidelity': round(sum(r['fidelityValue'] for r in measured) / len(measured), 2)
+        if measured else None,
+        'bestFidelityByQubits': [best[qubits] for qubits in sorted(best)],
+        'qubitCounts': {str(q): n for q, n in sorted(Counter(r['qubits'] for r in records).items())},
+        'dates': dict(sorted(Counter(r['date'] for r in records).items())),
+        'months': dict(sorted(Counter(r['date'][:7] for r in records).items())),
+        'executionSeconds': {'min': min(seconds), 'median': _median(seconds),
+                             'max': max(seconds)} if seconds else None,
+    }
+
+
+def build_index(validations, index_dir=INDEX_DIR):
+    """Return {path: JSON document} for the summary index and every shard"""
+    documents = {}
+    shards = {}
+    for field, directory in SHARD_KEYS.items():
+        groups = {}
+        for record in validations.records:
+            groups.setdefault(record[field], []).append(record)
+        shards[field] = {}
+        for value in sorted(groups):
+            path = os.path.join(index_dir, directory, _shard_name(value) + '.json')
+            documents[path] = {'version': INDEX_VERSION, 'key': field, 'value': value,
+                               'records': groups[value]}
+            shards[field][value] = {'count': len(groups[value]), 'shard': _site_path(path)}
+
+    index = {'version': INDEX_VERSION, 'source': _site_path(VALIDATIONS_PATH),
+             'sourceDigest': validations.digest}
+    index.update(summarize(validations.records))
+    index['categories'] = shards['category']
+    index['backends'] = shards['backend']
+    documents[os.path.join(index_dir, 'index.json')] = index
+    return documents
+
+
+def _encode(document):
+    """Compact, deterministic JSON bytes"""
+    return (json.dumps(document, separators=(',', ':'), sort_keys=True,
+                       ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def write_index(documents, index_dir=INDEX_DIR):
+    """Write changed documents, delete stale shards; return (written, removed)"""
+    written = []
+    for path, document in documents.items():
+        data = _encode(document)
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    continue
+        except OSError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        written.append(path)
+
+    removed = []
+    for directory in SHARD_KEYS.values():
+        shard_dir = os.path.join(index_dir, directory)
+        if not os.path.isdir(shard_dir):
+            continue
+        for name in sorted(os.listdir(shard_dir)):
+            path = os.path.join(shard_dir, name)
+            if name.endswith('.json') and path not in documents:
+                os.remove(path)
+                removed.append(path)
+    return written, removed
+
+
+def draw_charts():
+    """Render the summary charts with the figure generator (cached when unchanged)"""
+    generator = os.path.join(REPO_DIR, 'images', 'generate_images.py')
+    command = [sys.executable, generator]
+    for name in CHART_FIGURES:
+        command += ['--only', name]
+    return subprocess.run(command).returncode == 0
+
+
+def main(argv=None):
+    """Check hardware_validations.json and rebuild its index, shards and charts"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--check', action='store_true',
+                        help='only check the records; exit 1 if any is invalid')
+    parser.add_argument('--no-charts', action='store_true',
+                        help='skip rendering the summary charts')
+    args = parser.parse_args(argv)
+
+    validations = load_validations()
+    for warning in validations.warnings:
+        print(f"⚠️  {warning}")
+    for error in validations.errors:
+        print(f"❌ {error}")
+    if validations.errors:
+        print(f"❌ {len(validations.errors)} invalid records; index not written")
+        return 1
+    print(f"✅ {len(validations.records)} records valid")
+    if args.check:
+        return 0
+
+    documents = build_index(validations)
+    written, removed = write_index(documents)
+    index = documents[os.path.join(INDEX_DIR, 'index.json')]
+    print(f"✅ Index: {len(index['categories'])} category and {len(index['backends'])} "
+          f"backend shards in {_site_path(INDEX_DIR)} "
+          f"({len(written)} updated, {len(removed)} removed)")
+    print(f"   index.json {len(_encode(index)):,} bytes "
+          f"(source: {os.path.getsize(VALIDATIONS_PATH):,} bytes)")
+    if args.no_charts:
+        return 0
+    print()
+    return 0 if draw_charts() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())